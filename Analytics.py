@@ -1,7 +1,6 @@
 import numpy as np
 import pandas as pd
 from itertools import groupby, chain
-from xbbg import blp
 
 class Core():
     def __init__(self):
@@ -201,6 +200,8 @@ class Performance(Core, Tail):
         return result
     
 if __name__ == "__main__":
+    from xbbg import blp
+
     # Import Data from Bloomberg API
     Tickers = ['SPX Index', 'VIX Index', 'H15T3M Index']
     Start = '19900102'
@@ -1,14 +1,36 @@
 import datetime
 import QuantExt as qe
-from FX_CURVE import GET_QUOTE, USDIRS_CURVE, KRWCCS_CURVE
+import QuantLib as ql
+from FX_CURVE import GET_QUOTE, USDIRS_CURVE, KRWCCS_CURVE, LIVE_USDIRS_CURVE, LIVE_KRWCCS_CURVE
+from KEY_RATE import DELTA_LADDER
+from ANALYTIC_DELTA import ANALYTIC_LADDER
+from LAZY_RESULTS import LAZY_RESULTS
+from RELINK import RELINKED
+from RISK_GRID import NPV_CUBE, GRID_FRAME, GRID_GREEKS
 
-class CCS():
-    def __init__(self, todays_date, effective_date, maturity_date, ccs_rate, fx_spot, usd_notional, position):
+class CCS(LAZY_RESULTS):
+    # Pricing Results (computed on first access, see LAZY_RESULTS)
+    RESULTS = {'npv': lambda self: self.PRICING(self.usd_curve, self.krw_curve, self.fx_spot),
+               'fx_delta': lambda self: self.FX_DELTA(),
+               'usd_curve_delta': lambda self: self.USD_CURVE_DELTA(),
+               'krw_curve_delta': lambda self: self.KRW_CURVE_DELTA(),
+               'theta': lambda self: self.THETA()}
+    MARKET = ('date', 'usd_curve', 'krw_curve', 'fx_spot')
+    # Curves, handles and engine shared by the trades of a book group (see PORTFOLIO/BOOK)
+    SHARED = ('usd_curve', 'krw_curve', 'usd_curve_handle', 'krw_curve_handle', 'fx_spot_handle', 'engine')
+    
+    def __init__(self, todays_date, effective_date, maturity_date, ccs_rate, fx_spot, usd_notional, position, market=None):
+        # Constructor Arguments (to rebuild the trade in worker processes)
+        self.args = (todays_date, effective_date, maturity_date, ccs_rate, fx_spot, usd_notional, position)
+        
         # Initial Setup 1 - Date, Curves, FX Spot
         self.date = todays_date
         
-        self.usd_curve = self.USD_CURVE(self.date)
-        self.krw_curve = self.KRW_CURVE(self.date)
+        if market is None:
+            self.usd_curve = self.USD_CURVE(self.date)
+            self.krw_curve = self.KRW_CURVE(self.date)
+        else:
+            self.usd_curve, self.krw_curve = market.usd_curve, market.krw_curve
         
         self.fx_spot = fx_spot
         
@@ -37,12 +59,21 @@ class CCS():
         self.float_day_count = qe.Actual360()
         self.dateGeneration = qe.DateGeneration.Backward
         
-        # Pricing Results
-        self.npv = self.PRICING(self.usd_curve, self.krw_curve, self.fx_spot)
-        self.fx_delta = self.FX_DELTA()
-        self.usd_curve_delta = self.USD_CURVE_DELTA()
-        self.krw_curve_delta = self.KRW_CURVE_DELTA()
-        self.theta = self.THETA()
+        # Instrument built once on relinkable handles, scenarios only relink them
+        # (market objects and their handles are QuantLib, only the instrument and engine are QuantExt, see RELINK)
+        if market is None:
+            self.usd_curve_handle = ql.RelinkableYieldTermStructureHandle(self.usd_curve)
+            self.krw_curve_handle = ql.RelinkableYieldTermStructureHandle(self.krw_curve)
+            self.fx_spot_handle = ql.RelinkableQuoteHandle(ql.SimpleQuote(self.fx_spot))
+            self.engine = qe.CrossCcySwapEngine(self.krw,
+                                                self.krw_curve_handle,
+                                                self.usd,
+                                                self.usd_curve_handle,
+                                                self.fx_spot_handle)
+        else:
+            self.usd_curve_handle, self.krw_curve_handle = market.usd_curve_handle, market.krw_curve_handle
+            self.fx_spot_handle, self.engine = market.fx_spot_handle, market.engine
+        self.instrument = self.INSTRUMENT(self.usd_curve_handle, self.krw_curve_handle, self.fx_spot_handle)
         
     def USD_CURVE(self, date):
         return USDIRS_CURVE(date, GET_QUOTE(date, 'USD'))
@@ -50,11 +81,10 @@ class CCS():
     def KRW_CURVE(self, date):
         return KRWCCS_CURVE(date, GET_QUOTE(date, 'KRW'))
     
-    def PRICING(self, usd_curve, krw_curve, fx_spot):     
-        usd_curve_handle = qe.YieldTermStructureHandle(usd_curve)
-        krw_curve_handle = qe.YieldTermStructureHandle(krw_curve)
-        fx_spot_handle = qe.QuoteHandle(qe.SimpleQuote(fx_spot))
-        
+    def LIVE_CURVES(self, date):
+        return LIVE_USDIRS_CURVE(date, GET_QUOTE(date, 'USD')), LIVE_KRWCCS_CURVE(date, GET_QUOTE(date, 'KRW'))
+    
+    def INSTRUMENT(self, usd_curve_handle, krw_curve_handle, fx_spot_handle):
         usd_6m_libor = qe.USDLibor(qe.Period(6, qe.Months), usd_curve_handle)
         usd_6m_libor.addFixing(qe.Date(21, 5, 2020), 0.0009)
         
@@ -94,17 +124,23 @@ class CCS():
                                       self.length,
                                       self.calendar)
 
-        engine = qe.CrossCcySwapEngine(self.krw,
-                                       krw_curve_handle,
-                                       self.usd,
-                                       usd_curve_handle,
-                                       fx_spot_handle)
-        
-        ccs.setPricingEngine(engine)
+        ccs.setPricingEngine(self.engine)
         
-        npv = ccs.NPV()
+        return ccs
+    
+    def PRICING(self, usd_curve, krw_curve, fx_spot):     
+        # Relink to the scenario curves / spot, only the NPV is recalculated
+        with RELINKED((self.usd_curve_handle, usd_curve),
+                      (self.krw_curve_handle, krw_curve),
+                      (self.fx_spot_handle, ql.SimpleQuote(fx_spot))):
+            npv = self.instrument.NPV()
         
         return npv
+    
+    def LINKS(self):
+        # Relinkable handles with the curves they price on (see ROLL_DOWN.BOOK_THETA)
+        return [(self.usd_curve_handle, self.usd_curve),
+                (self.krw_curve_handle, self.krw_curve)]
         
     def FX_DELTA(self):
         
@@ -123,17 +159,17 @@ class CCS():
         return fx_delta
     
     def USD_CURVE_DELTA(self):
-        curve_handle = qe.YieldTermStructureHandle(self.usd_curve)
+        curve_handle = ql.YieldTermStructureHandle(self.usd_curve)
         
         # 1bp
         basis_point = 0.0001
         
         # FRA price when 1bp up
-        up_curve = qe.ZeroSpreadedTermStructure(curve_handle, qe.QuoteHandle(qe.SimpleQuote(basis_point)))
+        up_curve = ql.ZeroSpreadedTermStructure(curve_handle, ql.QuoteHandle(ql.SimpleQuote(basis_point)))
         up_ccs = self.PRICING(up_curve, self.krw_curve, self.fx_spot)
         
         # FRA price when 1bp down
-        down_curve = qe.ZeroSpreadedTermStructure(curve_handle, qe.QuoteHandle(qe.SimpleQuote(-basis_point)))
+        down_curve = ql.ZeroSpreadedTermStructure(curve_handle, ql.QuoteHandle(ql.SimpleQuote(-basis_point)))
         down_ccs = self.PRICING(down_curve, self.krw_curve, self.fx_spot)
 
         # USD Curve Delta
@@ -142,17 +178,17 @@ class CCS():
         return usd_curve_delta
     
     def KRW_CURVE_DELTA(self):
-        curve_handle = qe.YieldTermStructureHandle(self.krw_curve)
+        curve_handle = ql.YieldTermStructureHandle(self.krw_curve)
         
         # 1bp
         basis_point = 0.0001
         
         # FRA price when 1bp up
-        up_curve = qe.ZeroSpreadedTermStructure(curve_handle, qe.QuoteHandle(qe.SimpleQuote(basis_point)))
+        up_curve = ql.ZeroSpreadedTermStructure(curve_handle, ql.QuoteHandle(ql.SimpleQuote(basis_point)))
         up_ccs = self.PRICING(self.usd_curve, up_curve, self.fx_spot)
         
         # FRA price when 1bp down
-        down_curve = qe.ZeroSpreadedTermStructure(curve_handle, qe.QuoteHandle(qe.SimpleQuote(-basis_point)))
+        down_curve = ql.ZeroSpreadedTermStructure(curve_handle, ql.QuoteHandle(ql.SimpleQuote(-basis_point)))
         down_ccs = self.PRICING(self.usd_curve, down_curve, self.fx_spot)
 
         # KRW Curve Delta
@@ -160,6 +196,35 @@ class CCS():
         
         return krw_curve_delta
     
+    def KEY_RATE_DELTA(self):
+        # Swap built once on both live curves, each pillar bumped in place
+        usd_curve, krw_curve = self.LIVE_CURVES(self.date)
+        with RELINKED((self.usd_curve_handle, usd_curve.curve),
+                      (self.krw_curve_handle, krw_curve.curve)):
+            ladder = DELTA_LADDER(self.instrument.NPV, {'USD': usd_curve, 'KRW': krw_curve})
+        
+        return ladder
+    
+    def ANALYTIC_DELTA(self):
+        # Cashflow zero exposures of the KRW fixed / USD floating legs (notional exchanges included),
+        # bucketed to each curve's pillars; the USD leg is converted to KRW at spot like the engine
+        usd_curve, krw_curve = self.LIVE_CURVES(self.date)
+        
+        # Payer pays the fixed leg (leg 0) and receives the floating leg (leg 1)
+        sign = 1 if self.position == qe.VanillaSwap.Payer else -1
+        legs = [(self.instrument.leg(0), -sign, 'KRW'),
+                (self.instrument.leg(1), sign * self.fx_spot, 'USD')]
+        
+        with RELINKED((self.usd_curve_handle, usd_curve.curve),
+                      (self.krw_curve_handle, krw_curve.curve)):
+            ladder = ANALYTIC_LADDER(legs, {'USD': usd_curve, 'KRW': krw_curve})
+        
+        return ladder
+    
+    def RISK_GRID(self, fx_shocks, usd_shifts, krw_shifts, processes=1):
+        # NPV cube over FX spot shocks x USD shifts x KRW shifts on the built instrument
+        return NPV_CUBE(self, fx_shocks, usd_shifts, krw_shifts, processes)
+    
     def THETA(self):
         price_t0 = self.PRICING(self.usd_curve, self.krw_curve, self.fx_spot)
         
@@ -200,4 +265,17 @@ if __name__ == "__main__":
     print("FX Delta = {}".format(round(ccs.fx_delta, 4)))
     print("USD Curve Delta = {}".format(round(ccs.usd_curve_delta, 4)))
     print("KRW Curve Delta = {}".format(round(ccs.krw_curve_delta, 4)))
-    print("Theta = {}".format(round(ccs.theta, 4)))
\ No newline at end of file
+    print("Theta = {}".format(round(ccs.theta, 4)))
+    
+    # Key-rate Delta Ladder : Bump-and-reprice vs Analytic
+    ladder = ccs.KEY_RATE_DELTA()
+    ladder['analytic'] = ccs.ANALYTIC_DELTA()['delta']
+    print(ladder[['quote', 'delta', 'analytic']])
+    print("Max Difference = {:.3e}".format((ladder['delta'] - ladder['analytic']).abs().max()))
+    
+    # Joint FX / Rates Risk Grid
+    fx_shocks = [-0.1, -0.05, -0.01, 0, 0.01, 0.05, 0.1]
+    ir_shifts = [-0.005, -0.001, -0.0001, 0, 0.0001, 0.001, 0.005]
+    cube = ccs.RISK_GRID(fx_shocks, ir_shifts, ir_shifts)
+    print(GRID_GREEKS(cube, fx_shocks, ir_shifts, ir_shifts))
+    print(GRID_FRAME(cube, fx_shocks, ir_shifts, ir_shifts).xs(0, level='krw shift')['pnl'].unstack())
\ No newline at end of file
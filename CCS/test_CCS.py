@@ -0,0 +1,81 @@
+import os
+import sys
+import datetime
+import pandas as pd
+import pytest
+import QuantLib as ql
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'CURVE'))
+
+from QUOTE_SOURCE import COLUMNAR_SOURCE, QUOTE_SOURCES, SET_QUOTE_SOURCES
+from KEY_RATE import DELTA_LADDER
+from ANALYTIC_DELTA import ANALYTIC_LADDER
+import FX_CURVE
+
+TODAY = datetime.date(2020, 10, 8)
+EFFECTIVE_DATE = datetime.date(2020, 11, 26)
+MATURITY_DATE = datetime.date(2025, 11, 26)
+FX_SPOT = 1133.85
+CCS_RATE = 0.0009746
+USD_NOTIONAL = 10000000
+
+# Largest gap between the analytic and bumped ladders, relative to the largest delta
+TOLERANCE = 1e-6
+
+# Columnar Store with the CSV Exports of the Excel Quotes (no Excel needed)
+@pytest.fixture(scope='module')
+def source(tmp_path_factory):
+    source = COLUMNAR_SOURCE(str(tmp_path_factory.mktemp('QUOTES')))
+    source.WRITE(TODAY, 'USD', pd.read_csv(os.path.join(HERE, '..', 'CURVE', 'Data.csv'), index_col=0, usecols=range(4)))
+    source.WRITE(TODAY, 'KRW', pd.read_csv(os.path.join(HERE, '..', 'CURVE', 'KRWCCS.csv'), index_col=0))
+
+    saved = QUOTE_SOURCES()
+    SET_QUOTE_SOURCES({'FX_CURVE': source})
+    yield source
+    SET_QUOTE_SOURCES(saved)
+
+def LADDER_GAP(ladder, analytic):
+    return (ladder['delta'] - analytic['delta']).abs().max() / ladder['delta'].abs().max()
+
+# QuantLib Replica of the CCS Legs : KRW fixed / USD 6M Libor with notional exchanges, the USD leg at spot in KRW
+@pytest.mark.parametrize('sign', [1, -1])
+def test_replica_ladder_matches_bumps(source, sign):
+    usd_curve = FX_CURVE.LIVE_USDIRS_CURVE(TODAY, FX_CURVE.GET_QUOTE(TODAY, 'USD'))
+    krw_curve = FX_CURVE.LIVE_KRWCCS_CURVE(TODAY, FX_CURVE.GET_QUOTE(TODAY, 'KRW'))
+
+    calendar = ql.JointCalendar(ql.SouthKorea(), ql.UnitedStates())
+    start = ql.Date(EFFECTIVE_DATE.day, EFFECTIVE_DATE.month, EFFECTIVE_DATE.year)
+    end = ql.Date(MATURITY_DATE.day, MATURITY_DATE.month, MATURITY_DATE.year)
+    schedule = ql.Schedule(start, end, ql.Period(6, ql.Months), calendar, ql.ModifiedFollowing, ql.ModifiedFollowing,
+                           ql.DateGeneration.Backward, False)
+
+    def EXCHANGED(leg, notional):
+        return [ql.SimpleCashFlow(-notional, start)] + list(leg) + [ql.SimpleCashFlow(notional, end)]
+
+    krw_notional = USD_NOTIONAL * FX_SPOT
+    index = ql.USDLibor(ql.Period(6, ql.Months), ql.YieldTermStructureHandle(usd_curve.curve))
+    fixed_leg = EXCHANGED(ql.FixedRateLeg(schedule, ql.Actual365Fixed(), [krw_notional], [CCS_RATE]), krw_notional)
+    float_leg = EXCHANGED(ql.IborLeg([USD_NOTIONAL], schedule, index, ql.Actual360()), USD_NOTIONAL)
+
+    # Payer of the fixed leg : receives the USD leg at spot in KRW and pays the KRW leg, as the engine prices it
+    def PV(leg, curve):
+        return sum(cashflow.amount() * curve.curve.discount(cashflow.date()) for cashflow in leg)
+
+    def NPV():
+        return sign * (FX_SPOT * PV(float_leg, usd_curve) - PV(fixed_leg, krw_curve))
+
+    # Same leg signs and spot conversion as CCS.ANALYTIC_DELTA (sign : +1 Payer)
+    legs = [(fixed_leg, -sign, 'KRW'), (float_leg, sign * FX_SPOT, 'USD')]
+
+    curves = {'USD': usd_curve, 'KRW': krw_curve}
+    assert LADDER_GAP(DELTA_LADDER(NPV, curves), ANALYTIC_LADDER(legs, curves)) < TOLERANCE
+
+# The QuantExt CCS itself : engine leg signs and spot conversion against its own bumped ladder
+@pytest.mark.parametrize('position', ['Long', 'Short'])
+def test_ccs_ladder_matches_bumps(source, position):
+    pytest.importorskip('QuantExt')
+    from CCS import CCS
+
+    ccs = CCS(TODAY, EFFECTIVE_DATE, MATURITY_DATE, CCS_RATE, FX_SPOT, USD_NOTIONAL, position)
+    assert LADDER_GAP(ccs.KEY_RATE_DELTA(), ccs.ANALYTIC_DELTA()) < TOLERANCE
@@ -1,14 +1,38 @@
 import datetime
+import pandas as pd
 import QuantLib as ql
-from CDS_CURVE import GET_IRS_QUOTE, GET_CDS_QUOTE, SWAP_CURVE, CDS_CURVE
+from CDS_CURVE import GET_IRS_QUOTE, GET_CDS_QUOTE, SWAP_CURVE, CDS_CURVE, LIVE_SWAP_CURVE, LIVE_CDS_CURVE
+from LIVE_CURVE import LIVE_HAZARD_CURVE
+from CURVE_REGISTRY import REGISTRY
+from KEY_RATE import DELTA_LADDER
+from LAZY_RESULTS import LAZY_RESULTS
+from RELINK import RELINKED
+from PRICING_CONTEXT import PRICING_CONTEXT
 
-class CDS():
-    def __init__(self, todays_date, maturity_date, spread, notional, position):
-        # Initial Setup 1 - Date & Curves
+class CDS(LAZY_RESULTS):
+    # Pricing Results (computed on first access, see LAZY_RESULTS)
+    RESULTS = {'npv': lambda self: self.PRICING(self.discount_curve, self.cds_curve),
+               'ir_delta': lambda self: self.IR_DELTA(),
+               'cr_delta': lambda self: self.CREDIT_DELTA(),
+               'theta': lambda self: self.THETA()}
+    MARKET = ('todays_date', 'discount_curve', 'cds_curve')
+    DATE = 'todays_date'
+    # Curves, handles and engine shared by the trades of a book group (see PORTFOLIO/BOOK)
+    SHARED = ('discount_curve', 'cds_curve', 'discount_curve_handle', 'probability_handle', 'engine')
+    
+    def __init__(self, todays_date, maturity_date, spread, notional, position, ticker='ROKCDS', market=None):
+        # Constructor Arguments (to rebuild the trade in worker processes)
+        self.args = (todays_date, maturity_date, spread, notional, position, ticker)
+        
+        # Initial Setup 1 - Date, Reference Name & Curves
         self.todays_date = todays_date
+        self.ticker = ticker
         
-        self.discount_curve = self.DISCOUNT_CURVE(self.todays_date)
-        self.cds_curve = self.CDS_CURVE(self.todays_date)
+        if market is None:
+            self.discount_curve = self.DISCOUNT_CURVE(self.todays_date)
+            self.cds_curve = self.CDS_CURVE(self.todays_date)
+        else:
+            self.discount_curve, self.cds_curve = market.discount_curve, market.cds_curve
         
         # Initial Setup 2 - Instrument Info
         self.maturity_date = ql.Date(maturity_date.day, maturity_date.month, maturity_date.year)
@@ -30,22 +54,38 @@ class CDS():
         self.dayCount = ql.Actual360()
         self.endOfMonth = False
         
-        # Pricing Results
-        self.npv = self.PRICING(self.discount_curve, self.cds_curve)
-        self.ir_delta = self.IR_DELTA()
-        self.cr_delta = self.CREDIT_DELTA()
-        self.theta = self.THETA()
+        # Instrument built once on relinkable handles, scenarios only relink them
+        if market is None:
+            self.discount_curve_handle = ql.RelinkableYieldTermStructureHandle(self.discount_curve)
+            self.probability_handle = ql.RelinkableDefaultProbabilityTermStructureHandle(self.cds_curve)
+            self.engine = ql.MidPointCdsEngine(self.probability_handle, self.recovery_rate, self.discount_curve_handle)
+        else:
+            self.discount_curve_handle, self.probability_handle = market.discount_curve_handle, market.probability_handle
+            self.engine = market.engine
+        self.instrument = self.INSTRUMENT(self.discount_curve_handle, self.probability_handle)
     
     def DISCOUNT_CURVE(self, date):
         return SWAP_CURVE(date, GET_IRS_QUOTE(date))
     
     def CDS_CURVE(self, date):
-        return CDS_CURVE(date, GET_CDS_QUOTE(date), SWAP_CURVE(date, GET_IRS_QUOTE(date)))
+        # Discount curve comes from the shared registry rather than a fresh bootstrap
+        return CDS_CURVE(date, GET_CDS_QUOTE(date, self.ticker), self.DISCOUNT_CURVE(date))
     
-    def PRICING(self, discount_curve, cds_curve):
+    def LIVE_CURVES(self, date):
+        discount_curve = LIVE_SWAP_CURVE(date, GET_IRS_QUOTE(date))
+        return discount_curve, LIVE_CDS_CURVE(date, GET_CDS_QUOTE(date, self.ticker), discount_curve.curve)
+    
+    def OWN_CDS_CURVE(self):
+        # Live curve behind the trade's own hazard curve, its spreads bumped in place ; a private one bootstrapped
+        # on the trade's own discount curve when the hazard curve did not come from the registry
+        live = REGISTRY.LIVE(self.cds_curve)
+        if live is not None:
+            return live[1]
+        return LIVE_HAZARD_CURVE(self.todays_date, GET_CDS_QUOTE(self.todays_date, self.ticker), self.discount_curve)
+    
+    def INSTRUMENT(self, discount_curve_handle, probability):
         # Processing
         todays_date = ql.Date(self.todays_date.day, self.todays_date.month, self.todays_date.year)
-        discount_curve_handle = ql.YieldTermStructureHandle(discount_curve)
         
         schedule = ql.Schedule(todays_date,
                                self.maturity_date,
@@ -63,18 +103,23 @@ class CDS():
                                    self.convention,
                                    self.dayCount)
         
-        probability = ql.DefaultProbabilityTermStructureHandle(cds_curve)
+        cds.setPricingEngine(self.engine)
         
-        engine = ql.MidPointCdsEngine(probability,
-                                      self.recovery_rate,
-                                      discount_curve_handle)
-        
-        cds.setPricingEngine(engine)
-                
-        npv = cds.NPV()
+        return cds
+    
+    def PRICING(self, discount_curve, cds_curve):
+        # Relink to the scenario curves, only the NPV is recalculated
+        with RELINKED((self.discount_curve_handle, discount_curve),
+                      (self.probability_handle, cds_curve)):
+            npv = self.instrument.NPV()
         
         return npv
     
+    def LINKS(self):
+        # Relinkable handles with the curves they price on (see ROLL_DOWN.BOOK_THETA)
+        return [(self.discount_curve_handle, self.discount_curve),
+                (self.probability_handle, self.cds_curve)]
+    
     def IR_DELTA(self):
         curve_handle = ql.YieldTermStructureHandle(self.discount_curve)
         
@@ -95,22 +140,44 @@ class CDS():
         return delta
     
     def CREDIT_DELTA(self):
-        temp_cds_quote = GET_CDS_QUOTE(self.todays_date)
+        cds_curve = self.OWN_CDS_CURVE()
         
-        # CDS Price when 1bp up
-        temp_cds_quote['Market.Mid'] += 1
-        up_curve = CDS_CURVE(self.todays_date, temp_cds_quote, self.discount_curve)
-        up_cds = self.PRICING(self.discount_curve, up_curve)
-
-        # CDS Price when 1bp down        
-        temp_cds_quote['Market.Mid'] -= 2
-        down_curve = CDS_CURVE(self.todays_date, temp_cds_quote, self.discount_curve)
-        down_cds = self.PRICING(self.discount_curve, down_curve)        
+        # 1bp
+        basis_point = 0.0001
+        
+        with RELINKED((self.discount_curve_handle, self.discount_curve),
+                      (self.probability_handle, cds_curve.curve)):
+            # CDS Price when every spread is 1bp up
+            with cds_curve.BUMP(None, basis_point):
+                up_cds = self.instrument.NPV()
+            
+            # CDS Price when every spread is 1bp down
+            with cds_curve.BUMP(None, -basis_point):
+                down_cds = self.instrument.NPV()
         
         # Delta
         delta = (up_cds - down_cds) / 2
         
         return delta
+    
+    def CS01(self):
+        # Bucketed CS01 : each spread pillar of the trade's own hazard curve bumped 1bp in place
+        cds_curve = self.OWN_CDS_CURVE()
+        with RELINKED((self.discount_curve_handle, self.discount_curve),
+                      (self.probability_handle, cds_curve.curve)):
+            ladder = DELTA_LADDER(self.instrument.NPV, {self.ticker: cds_curve})
+        
+        return ladder
+        
+    def KEY_RATE_DELTA(self):
+        # CDS built once on the live curves, each IR / spread pillar bumped in place
+        # (the hazard curve re-bootstraps on IR bumps, as its helpers discount on the USD curve)
+        discount_curve, cds_curve = self.LIVE_CURVES(self.todays_date)
+        with RELINKED((self.discount_curve_handle, discount_curve.curve),
+                      (self.probability_handle, cds_curve.curve)):
+            ladder = DELTA_LADDER(self.instrument.NPV, {'USD': discount_curve, 'CDS': cds_curve})
+        
+        return ladder
         
     def THETA(self):
         price_t0 = self.PRICING(self.discount_curve, self.cds_curve)
@@ -124,6 +191,26 @@ class CDS():
         
         return theta
 
+# Bucketed CS01 of a Book of CDS : one ladder per hazard curve (reference name and date), each trade on its own curves
+def BOOK_CS01(book):
+    curves = {}
+    for trade in book:
+        cds_curve = trade.OWN_CDS_CURVE()
+        _, trades, links = curves.setdefault(id(cds_curve), (cds_curve, [], []))
+        trades.append(trade)
+        links += [(trade.discount_curve_handle, trade.discount_curve),
+                  (trade.probability_handle, cds_curve.curve)]
+    
+    ladders, keys = [], []
+    for cds_curve, trades, links in curves.values():
+        npv = lambda: sum(trade.instrument.NPV() for trade in trades)
+        # Spread bumps re-bootstrap against the evaluation date : each curve on its own date
+        with PRICING_CONTEXT(cds_curve.todays_date), RELINKED(*links):
+            ladders.append(DELTA_LADDER(npv, {trades[0].ticker: cds_curve}))
+        keys.append(cds_curve.date)
+    
+    return pd.concat(ladders, keys=keys, names=['date'])
+
 if __name__ == "__main__":
     todaysDate = datetime.date(2020, 12, 11)
     notional = 10000000
@@ -132,3 +219,11 @@ if __name__ == "__main__":
     position = 'Long'
     
     cds = CDS(todaysDate, maturity, spread, notional, position)
+    
+    # Key-rate Delta Ladder
+    print(cds.KEY_RATE_DELTA())
+    
+    # Bucketed CS01 of a Book (protection bought and sold on the same name, and a trade of the next day)
+    book = [cds, CDS(todaysDate, datetime.date(2023, 12, 20), 15.0, 5000000, 'Short'),
+            CDS(todaysDate + datetime.timedelta(days=1), maturity, spread, notional, position)]
+    print(BOOK_CS01(book))
@@ -0,0 +1,141 @@
+import datetime
+import numpy as np
+import pandas as pd
+import QuantLib as ql
+from RELINK import OWNER
+
+# Zero-rate Exposures dNPV/dz(t) of a Leg, discounted (and forecast) on one Curve
+def LEG_EXPOSURES(leg, curve):
+    # Returns (times, exposures) : zero rates are continuous on the curve's day counter
+    today = curve.referenceDate()
+    times, exposures = [], []
+
+    def EXPOSURE(date, value):
+        times.append(curve.timeFromReference(date))
+        exposures.append(value)
+
+    for cashflow in leg:
+        if cashflow.hasOccurred(today):
+            continue
+
+        pay_date = cashflow.date()
+        t_pay = curve.timeFromReference(pay_date)
+        df_pay = curve.discount(pay_date)
+
+        # Cast with the module owning the cashflow : QuantExt legs (CCS) need QuantExt's own cast
+        module = OWNER(cashflow)
+        coupon = module.as_floating_rate_coupon(cashflow)
+        if coupon is None or coupon.fixingDate() <= today:
+            # Fixed coupon, notional exchange or an already fixed floating coupon
+            EXPOSURE(pay_date, -t_pay * cashflow.amount() * df_pay)
+            continue
+
+        # Floating coupon : N * tau * (gearing * F + spread) * D(pay), F = (D(a) / D(b) - 1) / tau_f
+        # Forward period as QuantLib's par coupons (fixing value date to next fixing's value date)
+        index = coupon.index()
+        calendar = index.fixingCalendar()
+        fixing_days = index.fixingDays()
+        start = index.valueDate(coupon.fixingDate())
+        end = calendar.advance(calendar.advance(coupon.accrualEndDate(), -fixing_days, module.Days), fixing_days, module.Days)
+        end = max(end, start + 1)
+        tau_f = index.dayCounter().yearFraction(start, end)
+
+        df_start, df_end = curve.discount(start), curve.discount(end)
+        t_start, t_end = curve.timeFromReference(start), curve.timeFromReference(end)
+
+        # Amount per unit forward, and value of a one unit forward move in D(a) / D(b)
+        scale = coupon.nominal() * coupon.accrualPeriod() * coupon.gearing() * df_pay / tau_f
+        ratio = df_start / df_end
+
+        EXPOSURE(pay_date, -t_pay * cashflow.amount() * df_pay)
+        EXPOSURE(start, -t_start * scale * ratio)
+        EXPOSURE(end, t_end * scale * ratio)
+
+    return np.array(times), np.array(exposures)
+
+# Weights of each Curve Node in the (linear, flat-forward extrapolated) Zero Rate at times
+def NODE_WEIGHTS(curve, times):
+    nodes = np.array([curve.timeFromReference(date) for date, _ in curve.nodes()])
+    weights = np.zeros((len(times), len(nodes)))
+
+    for row, t in enumerate(times):
+        if t >= nodes[-1]:
+            # z(t) = (z_n t_n + f_n (t - t_n)) / t with f_n the last segment's forward
+            span = nodes[-1] - nodes[-2]
+            tail = (t - nodes[-1]) / t
+            weights[row, -1] = nodes[-1] / t + (1 + nodes[-1] / span) * tail
+            weights[row, -2] = -nodes[-1] / span * tail
+            continue
+
+        i = max(np.searchsorted(nodes, t, side='right') - 1, 0)
+        w = (t - nodes[i]) / (nodes[i + 1] - nodes[i])
+        weights[row, i] = 1 - w
+        weights[row, i + 1] = w
+
+    return weights
+
+# Curve Jacobian dz(node) / dq(pillar) per 1bp Quote Bump, cached on the Live Curve
+def CURVE_JACOBIAN(live_curve, basis_point=0.0001):
+    cached = getattr(live_curve, 'jacobian', None)
+    if cached is not None and cached[0] == (live_curve.version, basis_point):
+        return cached[1]
+
+    curve = live_curve.curve
+    columns = []
+    for tenor in live_curve.quotes:
+        with live_curve.BUMP(tenor, basis_point):
+            up = np.array([rate for _, rate in curve.nodes()])
+        with live_curve.BUMP(tenor, -basis_point):
+            down = np.array([rate for _, rate in curve.nodes()])
+        columns.append((up - down) / 2)
+
+    jacobian = pd.DataFrame(np.column_stack(columns),
+                            index=[date.to_date() for date, _ in curve.nodes()],
+                            columns=list(live_curve.quotes))
+    live_curve.jacobian = ((live_curve.version, basis_point), jacobian)
+
+    return jacobian
+
+# Analytic Key-rate Delta Ladder : cashflow exposures -> curve nodes -> quote pillars
+def ANALYTIC_LADDER(legs, curves, basis_point=0.0001):
+    # legs : [(leg, sign, curve name)] with sign +1 received / -1 paid (and any FX conversion)
+    # curves : {curve name : LIVE_CURVE}, same layout as DELTA_LADDER
+    ladders = []
+    for name, live_curve in curves.items():
+        curve = live_curve.curve
+        jacobian = CURVE_JACOBIAN(live_curve, basis_point)
+
+        node_delta = np.zeros(len(jacobian.index))
+        for leg, sign, leg_curve in legs:
+            if leg_curve != name:
+                continue
+            times, exposures = LEG_EXPOSURES(leg, curve)
+            node_delta += sign * exposures @ NODE_WEIGHTS(curve, times)
+
+        ladder = pd.DataFrame({'curve': name,
+                               'tenor': jacobian.columns,
+                               'quote': live_curve.VALUES().values,
+                               'delta': node_delta @ jacobian.values})
+        ladders.append(ladder)
+
+    return pd.concat(ladders).set_index(['curve', 'tenor'])
+
+
+if __name__ == "__main__":
+    from SWAP_CURVE import GET_QUOTE, LIVE_SWAP_CURVE
+    from KEY_RATE import DELTA_LADDER
+
+    # Today's Date
+    todays_date = datetime.date(2020, 10, 9)
+
+    # 5Y Fixed Rate Bond on the Live Curve
+    live_curve = LIVE_SWAP_CURVE(todays_date, GET_QUOTE(todays_date))
+    schedule = ql.MakeSchedule(ql.Date(13, 10, 2020), ql.Date(13, 10, 2025), ql.Period('6M'))
+    leg = ql.FixedRateLeg(schedule, ql.Actual360(), [10000000], [0.005])
+    npv = lambda: sum(cashflow.amount() * live_curve.curve.discount(cashflow.date()) for cashflow in leg)
+
+    # Analytic vs Bump-and-reprice Ladder
+    ladder = ANALYTIC_LADDER([(leg, 1, 'USD')], {'USD': live_curve})
+    ladder['bump'] = DELTA_LADDER(npv, {'USD': live_curve})['delta']
+    print(ladder)
+    print("Max Difference = {:.3e}".format((ladder['delta'] - ladder['bump']).abs().max()))
@@ -0,0 +1,117 @@
+import os
+import hashlib
+import threading
+from collections import OrderedDict
+from QUOTE_SOURCE import PREPROCESS
+
+# Bounded Least-Recently-Used Cache with Hit / Miss Counters
+class LRU_CACHE():
+    def __init__(self, maxsize=128, maxbytes=None):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.entries = OrderedDict()
+        self.lock = threading.RLock()
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def SIZE(self, value):
+        return 0
+
+    def GET(self, key, loader, stamp=None):
+        # Hit only when the stored stamp still matches (e.g. file mtime / hash)
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and entry[0] == stamp:
+                self.entries.move_to_end(key)
+                self.hits += 1
+                return entry[1]
+            self.misses += 1
+
+        value = loader()
+        self.PUT(key, value, stamp)
+
+        return value
+
+    def LOOKUP(self, key, default=None):
+        # Value stored under key whatever its stamp (default on a miss), for values updated in place by the caller
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is None:
+                self.misses += 1
+                return default
+            self.entries.move_to_end(key)
+            self.hits += 1
+            return entry[1]
+
+    def PUT(self, key, value, stamp=None):
+        with self.lock:
+            self.DROP(key)
+            size = self.SIZE(value)
+            self.entries[key] = (stamp, value, size)
+            self.nbytes += size
+
+            while len(self.entries) > 1 and (len(self.entries) > self.maxsize or
+                                             (self.maxbytes is not None and self.nbytes > self.maxbytes)):
+                self.DROP(next(iter(self.entries)))
+                self.evictions += 1
+
+    def DROP(self, key):
+        with self.lock:
+            entry = self.entries.pop(key, None)
+            if entry is not None:
+                self.nbytes -= entry[2]
+
+    def INVALIDATE(self, match=None):
+        # match : predicate on the key, None drops everything
+        with self.lock:
+            for key in [key for key in self.entries if match is None or match(key)]:
+                self.DROP(key)
+
+    def STATS(self):
+        with self.lock:
+            return {'hits': self.hits,
+                    'misses': self.misses,
+                    'evictions': self.evictions,
+                    'entries': len(self.entries),
+                    'bytes': self.nbytes}
+
+# File Stamp used to detect a changed quote file
+def FILE_STAMP(path, validate='mtime'):
+    if not os.path.exists(path):
+        return None
+
+    if validate == 'hash':
+        with open(path, 'rb') as f:
+            return hashlib.md5(f.read()).hexdigest()
+
+    stat = os.stat(path)
+    return (stat.st_mtime_ns, stat.st_size)
+
+# Quote Cache keyed by (source file, sheet, date)
+class QUOTE_CACHE(LRU_CACHE):
+    def __init__(self, maxsize=256, maxbytes=None, validate='mtime'):
+        # validate : 'mtime' (cheap) or 'hash' (content hash of the source file)
+        super().__init__(maxsize, maxbytes)
+        self.validate = validate
+
+    def SIZE(self, value):
+        return int(value.memory_usage(deep=True).sum())
+
+    def QUOTE(self, source, today, ticker):
+        path, sheet = source.LOCATION(today, ticker)
+        key = (path, sheet, today)
+        stamp = FILE_STAMP(path, self.validate)
+
+        quote = self.GET(key, lambda: PREPROCESS(source.READ(today, ticker), today), stamp)
+
+        # Defensive copy so callers can edit the quote in place
+        return quote.copy()
+
+    def INVALIDATE_FILE(self, path):
+        path = os.path.abspath(path)
+        self.INVALIDATE(lambda key: key[0] == path)
+
+# Process-wide Quote Cache shared by every GET_*_QUOTE function
+QUOTES = QUOTE_CACHE()
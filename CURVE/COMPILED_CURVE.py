@@ -0,0 +1,196 @@
+import math
+import datetime
+import numpy as np
+import pandas as pd
+import QuantLib as ql
+from PRICING_CONTEXT import PRICING_CONTEXT
+from CURVE_QUERY import SERIALS, DISCOUNT_FACTORS, ZERO_RATES, FORWARD_RATES, SURVIVAL_PROBS, DEFAULT_PROBS, POINTS
+
+# Day Counters with a Linear Year Fraction (days / denominator)
+DENOMINATORS = {'Actual/360': 360.0,
+                'Actual/365 (Fixed)': 365.0}
+
+# Step used by QuantLib for instantaneous forwards and zero rates at t = 0
+DT = 0.0001
+
+def FROZEN(values):
+    values = np.ascontiguousarray(values, dtype=np.float64)
+    values.setflags(write=False)
+    return values
+
+# libm's exp, element by element : QuantLib's discount factors round like it, NumPy's SIMD exp may be an ulp away
+def LIBM_EXP(x):
+    x = np.asarray(x, dtype=np.float64)
+    return np.fromiter(map(math.exp, x.ravel().tolist()), np.float64, x.size).reshape(x.shape)
+
+# Rate implied by a compound factor over time t (InterestRate::impliedRate)
+def IMPLIED_RATE(compound, t, compounding=ql.Continuous, frequency=ql.Annual):
+    if compounding == ql.Continuous:
+        return np.log(compound) / t
+    if compounding == ql.Simple:
+        return (compound - 1.0) / t
+    return (compound ** (1.0 / (frequency * t)) - 1.0) * frequency
+
+# Immutable Node Arrays of a Bootstrapped Curve
+class COMPILED_CURVE():
+    def __init__(self, curve):
+        day_counter = curve.dayCounter().name()
+        if day_counter not in DENOMINATORS:
+            raise ValueError('unsupported day counter for a compiled curve: ' + day_counter)
+
+        dates, values = zip(*curve.nodes())
+
+        self.day_counter = day_counter
+        self.denominator = DENOMINATORS[day_counter]
+        self.reference = curve.referenceDate().serialNumber()
+        self.serials = FROZEN([date.serialNumber() for date in dates])
+        self.times = FROZEN((self.serials - self.reference) / self.denominator)
+        self.values = FROZEN(values)
+
+    def TIMES(self, dates):
+        return (SERIALS(dates) - self.reference) / self.denominator
+
+    def LOCATE(self, t):
+        # Same segment search as QuantLib's Interpolation::locate
+        return np.clip(np.searchsorted(self.times, t, side='right') - 1, 0, len(self.times) - 2)
+
+# Compiled PiecewiseLinearZero : linear interpolation on continuous zero rates
+class COMPILED_YIELD_CURVE(COMPILED_CURVE):
+    def __init__(self, curve):
+        super().__init__(curve)
+        self.slopes = FROZEN(np.diff(self.values) / np.diff(self.times))
+
+    def ZERO(self, t):
+        # Continuous zero rate on the curve's day counter
+        t = np.asarray(t, dtype=np.float64)
+        i = self.LOCATE(t)
+        zero = self.values[i] + (t - self.times[i]) * self.slopes[i]
+
+        # Flat forward extrapolation beyond the last node (InterpolatedZeroCurve)
+        t_max, z_max = self.times[-1], self.values[-1]
+        beyond = t > t_max
+        if np.any(beyond):
+            forward_max = z_max + t_max * self.slopes[-1]
+            zero = np.where(beyond, (z_max * t_max + forward_max * (t - t_max)) / np.where(beyond, t, 1.0), zero)
+
+        return zero
+
+    def DISCOUNT(self, t):
+        t = np.asarray(t, dtype=np.float64)
+        return np.exp(-self.ZERO(t) * t)
+
+    def FORWARD(self, t, compounding=ql.Continuous, frequency=ql.Annual):
+        # Instantaneous forward as QuantLib's forwardRate(t, t) : a ratio of discount factors DT apart divided by DT,
+        # where an ulp on either factor would be ~2e-12, so both are rounded by libm's exp exactly as in QuantLib
+        t1 = np.maximum(np.asarray(t, dtype=np.float64) - DT / 2.0, 0.0)
+        t2 = t1 + DT
+        compound = LIBM_EXP(-self.ZERO(t1) * t1) / LIBM_EXP(-self.ZERO(t2) * t2)
+        return IMPLIED_RATE(compound, DT, compounding, frequency)
+
+    def DISCOUNT_FACTORS(self, dates):
+        return self.DISCOUNT(self.TIMES(dates))
+
+    def ZERO_RATES(self, dates):
+        # Same convention as ZERO_RATE (Actual/360, Compounded, ql.Continuous as frequency)
+        days = SERIALS(dates) - self.reference
+        t = days / self.denominator
+
+        compound = 1.0 / self.DISCOUNT(np.where(days == 0, DT, t))
+        t_rate = np.where(days == 0, DT, days / 360.0)
+
+        return IMPLIED_RATE(compound, t_rate, ql.Compounded, ql.Continuous)
+
+    def FORWARD_RATES(self, dates):
+        # Same convention as FORWARD_RATE
+        return self.FORWARD(self.TIMES(dates), ql.Compounded, ql.Continuous)
+
+# Compiled PiecewiseFlatHazardRate : backward-flat hazard rates
+class COMPILED_HAZARD_CURVE(COMPILED_CURVE):
+    def __init__(self, curve):
+        super().__init__(curve)
+        self.primitive = FROZEN(np.concatenate([[0.0], np.cumsum(np.diff(self.times) * self.values[1:])]))
+
+    def HAZARD(self, t):
+        t = np.asarray(t, dtype=np.float64)
+        i = self.LOCATE(t)
+        on_node = t == self.times[i]
+        hazard = np.where(on_node, self.values[i], self.values[i + 1])
+        return np.where(t <= self.times[0], self.values[0], hazard)
+
+    def SURVIVAL(self, t):
+        t = np.asarray(t, dtype=np.float64)
+        i = self.LOCATE(t)
+        integral = self.primitive[i] + (t - self.times[i]) * self.values[i + 1]
+
+        # Flat hazard extrapolation beyond the last node
+        t_max = self.times[-1]
+        integral = np.where(t > t_max, self.primitive[-1] + self.values[-1] * (t - t_max), integral)
+
+        return np.exp(-integral)
+
+    def DEFAULT(self, t):
+        return 1.0 - self.SURVIVAL(t)
+
+    def SURVIVAL_PROBS(self, dates):
+        return self.SURVIVAL(self.TIMES(dates))
+
+    def DEFAULT_PROBS(self, dates):
+        return self.DEFAULT(self.TIMES(dates))
+
+# Compile a Bootstrapped QuantLib Curve (or a LIVE_CURVE)
+def COMPILE_CURVE(curve):
+    curve = getattr(curve, 'curve', curve)
+
+    # Nodes are read on the curve's own date : queried on another date, it re-bootstraps on moved helpers
+    with PRICING_CONTEXT(curve.referenceDate()):
+        if hasattr(curve, 'survivalProbability'):
+            return COMPILED_HAZARD_CURVE(curve)
+
+        return COMPILED_YIELD_CURVE(curve)
+
+# Agreement with the QuantLib Curve, for every quantity PARITY checks
+TOLERANCE = 1e-12
+
+# Max Error of a Compiled Curve against its QuantLib Curve on a Daily Grid up to the last node
+def PARITY(curve, compiled=None):
+    curve = getattr(curve, 'curve', curve)
+    if compiled is None:
+        compiled = COMPILE_CURVE(curve)
+
+    with PRICING_CONTEXT(curve.referenceDate()):
+        grid = pd.date_range(curve.referenceDate().to_date(), curve.maxDate().to_date(), freq='D')
+
+        if isinstance(compiled, COMPILED_HAZARD_CURVE):
+            points, _ = POINTS(grid)
+            hazard = np.fromiter((curve.hazardRate(point) for point in points), float, len(points))
+            checks = {'survival probability': (compiled.SURVIVAL_PROBS(grid), SURVIVAL_PROBS(grid, curve)),
+                      'default probability': (compiled.DEFAULT_PROBS(grid), DEFAULT_PROBS(grid, curve)),
+                      'hazard rate': (compiled.HAZARD(compiled.TIMES(grid)), hazard)}
+        else:
+            checks = {'discount factor': (compiled.DISCOUNT_FACTORS(grid), DISCOUNT_FACTORS(grid, curve)),
+                      'zero rate': (compiled.ZERO_RATES(grid), ZERO_RATES(grid, curve)),
+                      'forward rate': (compiled.FORWARD_RATES(grid), FORWARD_RATES(grid, curve))}
+
+    return {name: float(np.abs(fast - exact).max()) for name, (fast, exact) in checks.items()}
+
+
+if __name__ == "__main__":
+    from QUOTE_SOURCE import COLUMNAR_SOURCE, CURVE_MODULES, SET_QUOTE_SOURCES
+    from SWAP_CURVE import GET_QUOTE, SWAP_CURVE
+    import CDS_CURVE
+
+    # Quotes from the columnar store written by QUOTE_SOURCE.py (no Excel needed)
+    SET_QUOTE_SOURCES({name: COLUMNAR_SOURCE(r'./QUOTES') for name in CURVE_MODULES})
+
+    # Bootstrapped Swap Curve and CDS Curve
+    todays_date = datetime.date(2020, 10, 9)
+    cds_date = datetime.date(2020, 12, 11)
+    curves = {'Swap Curve': SWAP_CURVE(todays_date, GET_QUOTE(todays_date)),
+              'CDS Curve': CDS_CURVE.CDS_CURVE(cds_date, CDS_CURVE.GET_CDS_QUOTE(cds_date),
+                                               CDS_CURVE.SWAP_CURVE(cds_date, CDS_CURVE.GET_IRS_QUOTE(cds_date)))}
+
+    # Agreement of the Compiled Curves with QuantLib on a Daily Grid
+    for curve_name, curve in curves.items():
+        for name, error in PARITY(curve).items():
+            print("{} : Max {} Error = {:.3e}".format(curve_name, name, error))
+            assert error < TOLERANCE
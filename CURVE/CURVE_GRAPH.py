@@ -0,0 +1,151 @@
+import datetime
+import importlib
+from concurrent.futures import ThreadPoolExecutor
+import QuantLib as ql
+from PRICING_CONTEXT import PRICING_CONTEXT
+from CACHE import QUOTES
+from CURVE_REGISTRY import REGISTRY, CONVENTION_KEY
+from LIVE_CURVE import USD_CONVENTIONS, KRW_CONVENTIONS, CDS_CONVENTIONS, LIVE_YIELD_CURVE, LIVE_HAZARD_CURVE
+
+# Curve Specs : quote ticker, registry name, conventions, parent curves and the curve module whose QUOTE_SOURCE
+# the quotes come from by default (the CDS curve discounts on the USD curve of CDS_CURVE's source, like CDS_CURVE)
+USD_SPEC = {'ticker': 'USD', 'curve': 'USDIRS', 'kind': 'yield', 'conventions': USD_CONVENTIONS, 'parents': (), 'module': 'SWAP_CURVE'}
+KRW_SPEC = {'ticker': 'KRW', 'curve': 'KRWCCS', 'kind': 'yield', 'conventions': KRW_CONVENTIONS, 'parents': (), 'module': 'FX_CURVE'}
+CDS_USD_SPEC = {'ticker': 'USD', 'curve': 'USDIRS', 'kind': 'yield', 'conventions': USD_CONVENTIONS, 'parents': (), 'module': 'CDS_CURVE'}
+CDS_SPEC = {'ticker': 'ROKCDS', 'curve': 'CDS', 'kind': 'hazard', 'conventions': CDS_CONVENTIONS, 'parents': ('CDS_USD',), 'module': 'CDS_CURVE'}
+
+SPECS = {'USD': USD_SPEC, 'KRW': KRW_SPEC, 'CDS_USD': CDS_USD_SPEC, 'ROKCDS': CDS_SPEC}
+
+# Build Levels in Topological Order (curves within a level are independent)
+def LEVELS(specs):
+    for name, spec in specs.items():
+        for parent in spec['parents']:
+            if parent not in specs:
+                raise ValueError('{} depends on unknown curve {}'.format(name, parent))
+
+    levels, done = [], set()
+    while len(done) < len(specs):
+        level = [name for name, spec in specs.items()
+                 if name not in done and all(parent in done for parent in spec['parents'])]
+        if not level:
+            raise ValueError('cyclic curve dependencies: {}'.format(sorted(set(specs) - done)))
+        levels.append(level)
+        done.update(level)
+
+    return levels
+
+# Dependency-aware Multi-curve Builder for one Evaluation Date
+class CURVE_GRAPH():
+    def __init__(self, today, specs=SPECS, source=None, sources=None, max_workers=4):
+        # source : quote source of every curve (default : each spec module's QUOTE_SOURCE), sources : {curve : source} overrides
+        self.today = today
+        self.specs = specs
+        self.source = source
+        self.sources = sources or {}
+        self.max_workers = max_workers
+        self.levels = LEVELS(specs)
+
+        self.quotes = {}
+        self.curves = {}
+        self.dirty = set(specs)
+
+    def DESCENDANTS(self, name):
+        children = {child for child, spec in self.specs.items() if name in spec['parents']}
+        for child in list(children):
+            children |= self.DESCENDANTS(child)
+        return children
+
+    def UPDATE_QUOTE(self, name, quote):
+        # New quotes for one curve : only it and the curves built on it are rebuilt
+        self.quotes[name] = quote
+        self.dirty |= {name} | self.DESCENDANTS(name)
+
+    def REFRESH(self):
+        # Drop cached quotes so the next BUILD rereads every source
+        self.quotes.clear()
+        self.dirty = set(self.specs)
+
+    def SOURCE(self, name):
+        if name in self.sources:
+            return self.sources[name]
+        if self.source is not None:
+            return self.source
+        # Read when loading, so a later SET_QUOTE_SOURCE of the module is followed
+        return importlib.import_module(self.specs[name]['module']).QUOTE_SOURCE
+
+    def LOAD(self, name):
+        return QUOTES.QUOTE(self.SOURCE(name), self.today, self.specs[name]['ticker'])
+
+    def BUILD_NODE(self, name):
+        spec = self.specs[name]
+        parents = [self.curves[parent].curve for parent in spec['parents']]
+        conventions = spec['conventions']
+
+        if spec['kind'] == 'hazard':
+            builder = lambda today, quote, discount_curve: LIVE_HAZARD_CURVE(today, quote, discount_curve, conventions)
+        else:
+            builder = lambda today, quote: LIVE_YIELD_CURVE(today, quote, conventions)
+
+        # Same registry entries as the SWAP_CURVE / USDIRS_CURVE / KRWCCS_CURVE / CDS_CURVE builders,
+        # bootstrapped here on the graph's date rather than on whatever date the first query runs under
+        with PRICING_CONTEXT(self.today):
+            curve = REGISTRY.CURVE(spec['curve'], CONVENTION_KEY(conventions), builder,
+                                   self.today, self.quotes[name], *parents)
+            curve.curve.nodes()
+
+        return curve
+
+    def BUILD(self):
+        if not self.dirty:
+            return self.curves
+
+        # 1. Quotes of all dirty curves are loaded concurrently (I/O bound)
+        missing = [name for name in self.dirty if name not in self.quotes]
+        with ThreadPoolExecutor(self.max_workers) as pool:
+            for name, quote in zip(missing, pool.map(self.LOAD, missing)):
+                self.quotes[name] = quote
+
+        # 2. Bootstrap level by level : QuantLib holds the GIL and the evaluation date is process-wide,
+        #    so curves of a level bootstrap one after the other
+        for level in self.levels:
+            for name in level:
+                if name in self.dirty:
+                    self.curves[name] = self.BUILD_NODE(name)
+
+        self.dirty.clear()
+
+        return self.curves
+
+    def CURVE(self, name):
+        if self.dirty:
+            self.BUILD()
+        return self.curves[name]
+
+    def __getitem__(self, name):
+        return self.CURVE(name).curve
+
+
+if __name__ == "__main__":
+
+    # Today's Date
+    todays_date = datetime.date(2020, 10, 9)
+
+    # USD & KRW Curves
+    graph = CURVE_GRAPH(todays_date, {'USD': USD_SPEC, 'KRW': KRW_SPEC})
+    usd_curve, krw_curve = graph['USD'], graph['KRW']
+
+    # New KRW Quotes : the USD curve is left untouched
+    krw_quote = graph.quotes['KRW'].copy()
+    krw_quote['Market.Mid'] += 0.01
+    graph.UPDATE_QUOTE('KRW', krw_quote)
+    print("Dirty Curves = {}".format(sorted(graph.dirty)))
+    print("USD Curve Reused = {}".format(graph['USD'] is usd_curve))
+
+    # CDS Curve on CDS_CURVE's quotes, discounted on the USD curve of the same source : the registry entry CDS_CURVE builds
+    import CDS_CURVE
+    cds_date = datetime.date(2020, 12, 11)
+    graph = CURVE_GRAPH(cds_date)
+    discount_curve = CDS_CURVE.SWAP_CURVE(cds_date, CDS_CURVE.GET_IRS_QUOTE(cds_date))
+    cds_curve = CDS_CURVE.LIVE_CDS_CURVE(cds_date, CDS_CURVE.GET_CDS_QUOTE(cds_date), discount_curve)
+    print("Same CDS Curve as CDS_CURVE = {}".format(graph.CURVE('ROKCDS') is cds_curve))
+    print("5Y Survival Probability = {:.6f}".format(graph['ROKCDS'].survivalProbability(ql.Date(11, 12, 2025))))
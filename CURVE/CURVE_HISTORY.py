@@ -0,0 +1,89 @@
+import datetime
+import multiprocessing
+import numpy as np
+import pandas as pd
+import QuantLib as ql
+from CURVE_QUERY import ZERO_RATES, SURVIVAL_PROBS
+
+# Output Tenor Grid per Curve (zero rates for USD / KRW, survival probabilities for CDS)
+TENORS = {'USD': ['3M', '6M', '1Y', '2Y', '3Y', '5Y', '7Y', '10Y', '15Y', '20Y', '30Y'],
+          'KRW': ['3M', '6M', '1Y', '2Y', '3Y', '5Y', '7Y', '10Y', '20Y'],
+          'CDS': ['6M', '1Y', '2Y', '3Y', '4Y', '5Y', '7Y', '10Y']}
+
+# Quote Source Modules used by each Curve
+def MODULES(curve):
+    if curve == 'CDS':
+        import CDS_CURVE
+        return [CDS_CURVE]
+
+    import FX_CURVE
+    return [FX_CURVE]
+
+# Worker Start-up : same quote sources as the parent process
+def INIT_WORKER(curve, sources):
+    for module, source in zip(MODULES(curve), sources):
+        module.SET_QUOTE_SOURCE(source)
+
+# Build one Date's Curve in a Worker (each worker process owns its evaluation date)
+def BUILD_ROW(args):
+    i, today, curve, tenors = args
+
+    try:
+        module = MODULES(curve)[0]
+        todays_date = ql.Date(today.day, today.month, today.year)
+        dates = [todays_date + ql.Period(tenor) for tenor in tenors]
+
+        if curve == 'CDS':
+            discount_curve = module.SWAP_CURVE(today, module.GET_IRS_QUOTE(today))
+            hazard_curve = module.CDS_CURVE(today, module.GET_CDS_QUOTE(today), discount_curve)
+            return i, SURVIVAL_PROBS(dates, hazard_curve)
+
+        if curve == 'USD':
+            yield_curve = module.USDIRS_CURVE(today, module.GET_QUOTE(today, 'USD'))
+        else:
+            yield_curve = module.KRWCCS_CURVE(today, module.GET_QUOTE(today, 'KRW'))
+
+        return i, ZERO_RATES(dates, yield_curve)
+
+    # Missing quotes (holidays) or a failed bootstrap leave the row as NaN
+    except (OSError, KeyError, RuntimeError):
+        return i, None
+
+# Backfill a (date x tenor) Curve History over a Process Pool
+def BUILD_CURVE_HISTORY(start, end, curve='USD', path=None, processes=None, dates=None, callback=None):
+    if curve not in TENORS:
+        raise ValueError("curve must be 'USD', 'KRW' or 'CDS'")
+
+    tenors = TENORS[curve]
+    if dates is None:
+        dates = [date.date() for date in pd.bdate_range(start, end)]
+    if path is None:
+        path = r'./{}_HISTORY.npy'.format(curve)
+
+    # Memory-mapped Output, rows are written as soon as a date finishes
+    history = np.lib.format.open_memmap(path, mode='w+', dtype=np.float64, shape=(len(dates), len(tenors)))
+    history[:] = np.nan
+
+    sources = [module.QUOTE_SOURCE for module in MODULES(curve)]
+    tasks = [(i, today, curve, tenors) for i, today in enumerate(dates)]
+
+    with multiprocessing.Pool(processes, initializer=INIT_WORKER, initargs=(curve, sources)) as pool:
+        for i, values in pool.imap_unordered(BUILD_ROW, tasks, chunksize=8):
+            if values is not None:
+                history[i] = values
+            if callback is not None:
+                callback(dates[i], values)
+
+    history.flush()
+
+    return history, dates, tenors
+
+
+if __name__ == "__main__":
+
+    # Rebuild One Month of Daily USD Curves
+    history, dates, tenors = BUILD_CURVE_HISTORY(datetime.date(2020, 9, 1),
+                                                 datetime.date(2020, 9, 30),
+                                                 curve='USD')
+
+    print(pd.DataFrame(history, index=dates, columns=tenors))
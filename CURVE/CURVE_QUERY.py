@@ -0,0 +1,83 @@
+import numpy as np
+import pandas as pd
+import QuantLib as ql
+
+# Serial Number of 1970-01-01 in QuantLib / Excel Date Convention
+EPOCH_SERIAL = 25569
+
+# Convert Dates to QuantLib Serial Numbers in Bulk
+def SERIALS(dates):
+    days = np.asarray(pd.to_datetime(np.asarray(dates).ravel()), dtype='datetime64[D]')
+    return days.astype(np.int64) + EPOCH_SERIAL
+
+# Query Points : ql.Date list for dates, float array for year fractions
+def POINTS(dates):
+    values = np.asarray(dates)
+
+    if np.issubdtype(values.dtype, np.number):
+        return values.astype(float).ravel(), True
+
+    # Already converted (e.g. by CURVE_TABLE)
+    if values.size and isinstance(values.flat[0], ql.Date):
+        return list(values.ravel()), False
+
+    return [ql.Date(int(serial)) for serial in SERIALS(values)], False
+
+def DISCOUNT_FACTORS(dates, curve):
+    points, _ = POINTS(dates)
+    return np.fromiter((curve.discount(point) for point in points), float, len(points))
+
+def ZERO_RATES(dates, curve):
+    # Same convention as ZERO_RATE, year fractions use the curve's day counter
+    points, times = POINTS(dates)
+    day_counter = ql.Actual360()
+    compounding = ql.Compounded
+    freq = ql.Continuous
+
+    if times:
+        rates = (curve.zeroRate(point, compounding, freq).rate() for point in points)
+    else:
+        rates = (curve.zeroRate(point, day_counter, compounding, freq).rate() for point in points)
+
+    return np.fromiter(rates, float, len(points))
+
+def FORWARD_RATES(dates, curve):
+    # Same convention as FORWARD_RATE, year fractions use the curve's day counter
+    points, times = POINTS(dates)
+    day_counter = ql.Actual360()
+    compounding = ql.Compounded
+    freq = ql.Continuous
+
+    if times:
+        rates = (curve.forwardRate(point, point, compounding, freq, True).rate() for point in points)
+    else:
+        rates = (curve.forwardRate(point, point, day_counter, compounding, freq, True).rate() for point in points)
+
+    return np.fromiter(rates, float, len(points))
+
+def DEFAULT_PROBS(dates, curve):
+    points, _ = POINTS(dates)
+    return np.fromiter((curve.defaultProbability(point) for point in points), float, len(points))
+
+def SURVIVAL_PROBS(dates, curve):
+    points, _ = POINTS(dates)
+    return np.fromiter((curve.survivalProbability(point) for point in points), float, len(points))
+
+# Full Curve Table on a Date Grid (yield curve and / or hazard curve)
+def CURVE_TABLE(dates, curve=None, hazard_curve=None):
+    index = dates.index if isinstance(dates, pd.Series) else pd.Index(dates)
+    table = pd.DataFrame(index=index)
+
+    # Convert once for every column
+    dates, _ = POINTS(dates)
+
+    if curve is not None:
+        table['discount factor'] = DISCOUNT_FACTORS(dates, curve)
+        table['zero rate'] = ZERO_RATES(dates, curve)
+        table['forward rate'] = FORWARD_RATES(dates, curve)
+
+    if hazard_curve is not None:
+        table['default prob'] = DEFAULT_PROBS(dates, hazard_curve)
+        table['survival prob'] = SURVIVAL_PROBS(dates, hazard_curve)
+
+    return table
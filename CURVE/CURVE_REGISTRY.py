@@ -0,0 +1,127 @@
+import hashlib
+import functools
+import pandas as pd
+import QuantLib as ql
+from CACHE import LRU_CACHE
+from PRICING_CONTEXT import SET_EVALUATION_DATE
+
+# Hash of a Quote DataFrame (index, columns and values)
+def QUOTE_HASH(quote):
+    digest = hashlib.sha1(pd.util.hash_pandas_object(quote, index=True).values.tobytes())
+    digest.update(repr(tuple(quote.columns)).encode())
+    return digest.hexdigest()
+
+# Hashable Key of a Conventions Dictionary (QuantLib objects keyed by name)
+def CONVENTION_KEY(conventions):
+    def NAME(value):
+        if isinstance(value, (tuple, list)):
+            return tuple(NAME(item) for item in value)
+        if isinstance(value, type):
+            return value.__name__
+        if hasattr(value, 'name'):
+            return value.name()
+        return str(value)
+
+    return tuple((field, NAME(value)) for field, value in sorted(conventions.items()))
+
+# Registry of Bootstrapped Curves keyed by (curve name, date, quote hash, conventions, parent curves)
+class CURVE_REGISTRY(LRU_CACHE):
+    def __init__(self, maxsize=64):
+        super().__init__(maxsize)
+        self.keys = {}
+        self.rebootstraps = 0
+
+    def KEY(self, name, conventions, today, quote, curves):
+        # Parent curves built through the registry are keyed by their own key, others by identity
+        parents = tuple(self.keys.get(id(curve), ('id', id(curve))) for curve in curves)
+        return (name, today, QUOTE_HASH(quote), conventions, parents)
+
+    def CURVE(self, name, conventions, builder, today, quote, *curves):
+        key = self.KEY(name, conventions, today, quote, curves)
+
+        with self.lock:
+            hit = key in self.entries
+
+        # Parent curves are kept alive with the entry so their identity cannot be reused
+        def BUILD():
+            curve = builder(today, quote, *curves)
+            return curve, curves, getattr(curve, 'version', None), self.WATCH(curve)
+
+        curve, _, version, _ = self.GET(key, BUILD)
+
+        # A live curve moved away from its quotes by UPDATE no longer matches the key
+        if getattr(curve, 'version', None) != version:
+            self.INVALIDATE(lambda other: DEPENDS(other, lambda parent: parent == key))
+            hit = False
+            curve = self.GET(key, BUILD)[0]
+
+        with self.lock:
+            self.keys[id(curve)] = key
+            # Live curves are also known by the QuantLib curve they wrap
+            if hasattr(curve, 'curve'):
+                self.keys[id(curve.curve)] = key
+
+        # A cached curve still sets the evaluation date like its builder does
+        if hit:
+            SET_EVALUATION_DATE(today)
+
+        return curve
+
+    def WATCH(self, curve):
+        # A bootstrapped curve notifies once when a date move or quote change invalidates it,
+        # and bootstraps again on its next use : each notification counts one re-bootstrap
+        def INVALIDATED():
+            self.rebootstraps += 1
+
+        observer = ql.Observer(INVALIDATED)
+        observer.registerWith(getattr(curve, 'curve', curve))
+        return observer
+
+    def STATS(self):
+        stats = super().STATS()
+        stats['rebootstraps'] = self.rebootstraps
+        return stats
+
+    def DROP(self, key):
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None:
+                curve = entry[1][0]
+                self.keys.pop(id(curve), None)
+                if hasattr(curve, 'curve'):
+                    self.keys.pop(id(curve.curve), None)
+            super().DROP(key)
+
+    def LIVE(self, curve):
+        # (name, live curve) owning a QuantLib curve built through the registry, None otherwise
+        with self.lock:
+            key = self.keys.get(id(curve))
+            entry = self.entries.get(key)
+        if entry is None:
+            return None
+        return key[0], entry[1][0]
+
+    def INVALIDATE_CURVE(self, name=None, today=None):
+        # Drop matching curves and every curve built on top of them (call on new quotes)
+        self.INVALIDATE(lambda key: DEPENDS(key, lambda parent: (name is None or parent[0] == name) and
+                                                               (today is None or parent[1] == today)))
+
+# True when a registry key, or any of its parent keys, satisfies match
+def DEPENDS(key, match):
+    if key[0] == 'id':
+        return False
+    return match(key) or any(DEPENDS(parent, match) for parent in key[4])
+
+# Process-wide Curve Registry shared by every curve builder
+REGISTRY = CURVE_REGISTRY()
+
+# Route a curve builder through the registry
+def REGISTERED_CURVE(name, conventions):
+    conventions = CONVENTION_KEY(conventions)
+
+    def DECORATOR(builder):
+        @functools.wraps(builder)
+        def WRAPPER(today, quote, *curves):
+            return REGISTRY.CURVE(name, conventions, builder, today, quote, *curves)
+        return WRAPPER
+    return DECORATOR
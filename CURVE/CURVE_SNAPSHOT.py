@@ -0,0 +1,85 @@
+import datetime
+import numpy as np
+import QuantLib as ql
+from QUOTE_SOURCE import RECORDS, FRAME
+from PRICING_CONTEXT import SET_EVALUATION_DATE
+
+# Day Counters a Snapshot can be Restored with
+DAY_COUNTERS = {'Actual/360': ql.Actual360(),
+                'Actual/365 (Fixed)': ql.Actual365Fixed()}
+
+# Arrays of a Bootstrapped Curve (nodes, day counter and interpolation), picklable and savable
+def SNAPSHOT_ARRAYS(curve):
+    # curve : PiecewiseLinearZero / PiecewiseFlatHazardRate or a LIVE_CURVE
+    curve = getattr(curve, 'curve', curve)
+    dates, values = zip(*curve.nodes())
+
+    if hasattr(curve, 'survivalProbability'):
+        kind, interpolation = 'hazard', 'BackwardFlat'
+    else:
+        kind, interpolation = 'zero', 'Linear'
+
+    return {'kind': np.array(kind),
+            'interpolation': np.array(interpolation),
+            'day_counter': np.array(curve.dayCounter().name()),
+            'serials': np.array([date.serialNumber() for date in dates], dtype=np.int32),
+            'values': np.array(values, dtype=np.float64)}
+
+# InterpolatedZeroCurve / HazardRateCurve on the Snapshot Nodes (no bootstrap)
+def RESTORE_CURVE(arrays):
+    kind = str(arrays['kind'])
+    day_counter = DAY_COUNTERS[str(arrays['day_counter'])]
+    dates = [ql.Date(int(serial)) for serial in arrays['serials']]
+    values = [float(value) for value in arrays['values']]
+
+    # Set Evaluation Date (as the curve builders do)
+    SET_EVALUATION_DATE(dates[0])
+
+    if kind == 'hazard':
+        return ql.HazardRateCurve(dates, values, day_counter)
+
+    return ql.ZeroCurve(dates, values, day_counter, ql.NullCalendar(), ql.Linear(), ql.Continuous, ql.Annual)
+
+# Save a Bootstrapped Curve with its quotes
+def SAVE_SNAPSHOT(path, curve, quote=None):
+    arrays = SNAPSHOT_ARRAYS(curve)
+
+    if quote is not None:
+        arrays['quote'] = RECORDS(quote)
+
+    with open(path, 'wb') as f:
+        np.savez(f, **arrays)
+
+    return path
+
+# Load a Snapshot as an InterpolatedZeroCurve / HazardRateCurve
+def LOAD_SNAPSHOT(path):
+    with np.load(path, allow_pickle=False) as snapshot:
+        arrays = {name: snapshot[name] for name in snapshot.files}
+
+    quote = None
+    if 'quote' in arrays:
+        quote = FRAME(arrays.pop('quote'))
+        quote['Maturity'] = quote['Maturity'].values.astype('datetime64[D]').astype(object)
+
+    return RESTORE_CURVE(arrays), quote
+
+if __name__ == "__main__":
+    import pandas as pd
+    from SWAP_CURVE import GET_QUOTE, SWAP_CURVE
+    from CURVE_QUERY import DISCOUNT_FACTORS
+
+    # Today's Date
+    todays_date = datetime.date(2020, 10, 9)
+
+    # End-of-Day Build & Snapshot
+    quote = GET_QUOTE(todays_date)
+    curve = SWAP_CURVE(todays_date, quote)
+    SAVE_SNAPSHOT(r'./USDIRS_20201009.npz', curve, quote)
+
+    # Warm Start from the Snapshot
+    warm_curve, warm_quote = LOAD_SNAPSHOT(r'./USDIRS_20201009.npz')
+
+    grid = pd.date_range(todays_date, curve.maxDate().to_date(), freq='D')
+    identical = np.array_equal(DISCOUNT_FACTORS(grid, curve), DISCOUNT_FACTORS(grid, warm_curve))
+    print("Bit-identical Discount Factors = {}".format(identical))
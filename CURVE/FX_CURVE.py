@@ -6,139 +6,41 @@ import seaborn as sns
 sns.set()
 
 import QuantLib as ql
-import xlwings as xw
+from QUOTE_SOURCE import EXCEL_SOURCE
+from CACHE import QUOTES
+from CURVE_REGISTRY import REGISTERED_CURVE
+from LIVE_CURVE import USD_CONVENTIONS, KRW_CONVENTIONS, LIVE_YIELD_CURVE
+from CURVE_QUERY import DISCOUNT_FACTORS, ZERO_RATES, FORWARD_RATES, CURVE_TABLE
 
-# Get Quote from Excel File
+# Quote Source (Excel by default, set a COLUMNAR_SOURCE to run headless)
+QUOTE_SOURCE = EXCEL_SOURCE(r'./FX_CURVE.xlsx', {'USD': ('USDIRS', 'A1:D25'),
+                                                 'KRW': ('KRWCCS', 'A1:D15')})
+
+def SET_QUOTE_SOURCE(source):
+    global QUOTE_SOURCE
+    QUOTE_SOURCE = source
+
+# Get Quote from Quote Source (through the shared quote cache)
 def GET_QUOTE(today, ticker):
-    
-    # Import Data from Excel
-    xw.App(visible=False)   
-    wb = xw.Book(r'./FX_CURVE.xlsx')
-    
-    if ticker == 'USD':
-        sht = wb.sheets('USDIRS')
-        curve = sht.range('A1:D25').options(pd.DataFrame).value
-        
-    elif ticker == 'KRW':
-        sht = wb.sheets('KRWCCS')
-        curve = sht.range('A1:D15').options(pd.DataFrame).value
-    
-    wb.close()
-    
-    # Pre-process DataFrame
-    curve['DaysToMaturity'] = np.nan
-    curve['Maturity'] = pd.to_datetime(curve['Maturity']).dt.date
-    
-    for tenor in curve.index:
-        curve.loc[tenor, 'DaysToMaturity'] = (curve.loc[tenor, 'Maturity'] - today).days
-    
-    return curve
+    return QUOTES.QUOTE(QUOTE_SOURCE, today, ticker)
+
+# Construct Live USD IRS Curve (owns its quotes, see LIVE_CURVE)
+@REGISTERED_CURVE('USDIRS', USD_CONVENTIONS)
+def LIVE_USDIRS_CURVE(today, quote):
+    return LIVE_YIELD_CURVE(today, quote, USD_CONVENTIONS)
+
+# Construct Live KRW CCS Curve
+@REGISTERED_CURVE('KRWCCS', KRW_CONVENTIONS)
+def LIVE_KRWCCS_CURVE(today, quote):
+    return LIVE_YIELD_CURVE(today, quote, KRW_CONVENTIONS)
 
 # Construct USD IRS Curve
 def USDIRS_CURVE(today, quote):
-    
-    # Divide DataFrame into 3 Parts
-    depo = quote[quote['InstType'] == 'CASH']
-    futures = quote[quote['InstType'] == 'FUTURE']
-    swap = quote[quote['InstType'] == 'SWAP']
-
-    # Set Evaluation Date
-    todays_date = ql.Date(today.day, today.month, today.year)
-    ql.Settings.instance().evaluationDate = todays_date
-    
-    # Market Conventions
-    calendar = ql.UnitedStates()
-    dayCounter = ql.Actual360()
-    convention = ql.ModifiedFollowing
-    settlementDays = 2
-    frequency = ql.Semiannual
-        
-    # Build Rate Helpers
-    # 1. Deposit Rate Helper
-    depositHelpers = [ql.DepositRateHelper(ql.QuoteHandle(ql.SimpleQuote(rate / 100)),
-                                           ql.Period(int(day), ql.Days),
-                                           settlementDays,
-                                           calendar,
-                                           convention,
-                                           False,
-                                           dayCounter)
-                      for day, rate in zip(depo['DaysToMaturity'], depo['Market.Mid'])]
-    
-    # 2. Futures Rate Helper
-    futuresHelpers = []
-    for i, price in enumerate(futures['Market.Mid']):
-        iborStartDate = ql.Date(futures['Maturity'][i].day,
-                                futures['Maturity'][i].month,
-                                futures['Maturity'][i].year)
-        
-        futuresHelper = ql.FuturesRateHelper(ql.QuoteHandle(ql.SimpleQuote(price)),
-                                             iborStartDate,
-                                             3,
-                                             calendar,
-                                             convention,
-                                             False,
-                                             dayCounter)
-        futuresHelpers.append(futuresHelper)
-    
-    # 3. Swap Rate Helper
-    swapHelpers = [ql.SwapRateHelper(ql.QuoteHandle(ql.SimpleQuote(rate / 100)),
-                                     ql.Period(int(day), ql.Days),
-                                     calendar,
-                                     frequency,
-                                     convention,
-                                     dayCounter,
-                                     ql.Euribor3M())
-                   for day, rate in zip(swap['DaysToMaturity'], swap['Market.Mid'])]
-    
-    # Curve Construction
-    helpers = depositHelpers + futuresHelpers + swapHelpers
-    depoFuturesSwapCurve = ql.PiecewiseLinearZero(todays_date, helpers, dayCounter)
-        
-    return depoFuturesSwapCurve
+    return LIVE_USDIRS_CURVE(today, quote).curve
 
+# Construct KRW CCS Curve
 def KRWCCS_CURVE(today, quote):
-    
-    # Divide DataFrame into 3 Parts
-    depo = quote[quote['InstType'] == 'CASH']
-    swap = quote[quote['InstType'] == 'SWAP']
-
-    # Set Evaluation Date
-    todays_date = ql.Date(today.day, today.month, today.year)
-    ql.Settings.instance().evaluationDate = todays_date
-    
-    # Market Conventions
-    calendar = ql.SouthKorea()
-    dayCounter = ql.Actual365Fixed()
-    convention = ql.ModifiedFollowing
-    settlementDays = 2
-    frequency = ql.Semiannual
-        
-    # Build Rate Helpers
-    # 1. Deposit Rate Helper
-    depositHelpers = [ql.DepositRateHelper(ql.QuoteHandle(ql.SimpleQuote(rate / 100)),
-                                           ql.Period(int(day), ql.Days),
-                                           settlementDays,
-                                           calendar,
-                                           convention,
-                                           False,
-                                           dayCounter)
-                      for day, rate in zip(depo['DaysToMaturity'], depo['Market.Mid'])]
-    
-    # 2. Swap Rate Helper
-    swapHelpers = [ql.SwapRateHelper(ql.QuoteHandle(ql.SimpleQuote(rate / 100)),
-                                     ql.Period(int(day), ql.Days),
-                                     calendar,
-                                     frequency,
-                                     convention,
-                                     dayCounter,
-                                     ql.Euribor3M())
-                   for day, rate in zip(swap['DaysToMaturity'], swap['Market.Mid'])]
-    
-    # Curve Construction
-    helpers = depositHelpers + swapHelpers
-    depoFuturesSwapCurve = ql.PiecewiseLinearZero(todays_date, helpers, dayCounter)
-        
-    return depoFuturesSwapCurve
+    return LIVE_KRWCCS_CURVE(today, quote).curve
 
 def DISCOUNT_FACTOR(date, curve):
     date = ql.Date(date.day, date.month, date.year)
@@ -179,14 +81,9 @@ if __name__ == "__main__":
     curve = USDIRS_CURVE(todays_date, quote)  
     
     # Calculate Discount Factor / Zero Rate / Forward Rate
-    quote['discount factor'] = np.nan
-    quote['zero rate'] = np.nan
-    quote['forward rate'] = np.nan
-    
-    for tenor, date in zip(quote.index, quote['Maturity']):
-        quote.loc[tenor, 'discount factor'] = DISCOUNT_FACTOR(date, curve)
-        quote.loc[tenor, 'zero rate'] = ZERO_RATE(date, curve) * 100
-        quote.loc[tenor, 'forward rate'] = FORWARD_RATE(date, curve) * 100
+    quote['discount factor'] = DISCOUNT_FACTORS(quote['Maturity'], curve)
+    quote['zero rate'] = ZERO_RATES(quote['Maturity'], curve) * 100
+    quote['forward rate'] = FORWARD_RATES(quote['Maturity'], curve) * 100
         
     # Print the Result
     print(quote[['discount factor', 'zero rate', 'forward rate']])
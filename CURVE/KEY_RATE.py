@@ -0,0 +1,37 @@
+import datetime
+import pandas as pd
+
+# Key-rate (per pillar) Par Deltas by Bumping each Live Quote in Place
+def DELTA_LADDER(npv, curves, basis_point=0.0001):
+    # npv : NPV of an instrument built on the live curves' handles, reused for every bump
+    # curves : {curve name : LIVE_CURVE}
+    rows = []
+    for name, curve in curves.items():
+        values = curve.VALUES()
+        for tenor in curve.quotes:
+            with curve.BUMP(tenor, basis_point):
+                up = npv()
+            with curve.BUMP(tenor, -basis_point):
+                down = npv()
+            rows.append((name, tenor, values[tenor], up, down, (up - down) / 2))
+
+    ladder = pd.DataFrame(rows, columns=['curve', 'tenor', 'quote', 'up', 'down', 'delta'])
+
+    return ladder.set_index(['curve', 'tenor'])
+
+
+if __name__ == "__main__":
+    import QuantLib as ql
+    from SWAP_CURVE import GET_QUOTE, LIVE_SWAP_CURVE
+
+    # Today's Date
+    todays_date = datetime.date(2020, 10, 9)
+
+    # 10Y Zero Coupon Bond on the Live Curve
+    live_curve = LIVE_SWAP_CURVE(todays_date, GET_QUOTE(todays_date))
+    maturity = ql.Date(9, 10, 2030)
+    npv = lambda: 10000000 * live_curve.curve.discount(maturity)
+
+    ladder = DELTA_LADDER(npv, {'USD': live_curve})
+    print(ladder)
+    print("Total Delta = {}".format(round(ladder['delta'].sum(), 4)))
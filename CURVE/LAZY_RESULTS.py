@@ -0,0 +1,66 @@
+from PRICING_CONTEXT import PRICING_CONTEXT
+from CURVE_REGISTRY import REGISTRY
+
+# Stamp of one Market Input : live curves by version and quote values, quotes by value, others by identity
+def MARKET_STAMP(value):
+    # Evaluation date moves, temporary relinks and bumps restored on exit leave the stamp unchanged
+    live = REGISTRY.LIVE(value)
+    if live is not None:
+        value = live[1]
+    if hasattr(value, 'quotes') and hasattr(value, 'version'):
+        return id(value), value.version, tuple(quote.value() for quote in value.quotes.values())
+    if hasattr(value, 'setValue'):
+        return id(value), value.value()
+
+    return id(value)
+
+# Pricing Results computed on first access and cached until the market moves
+class LAZY_RESULTS():
+    # result name -> function of the instrument computing it
+    RESULTS = {}
+
+    # market inputs : assigning one, a quote setValue or a live curve update drops the cache
+    MARKET = ()
+
+    # valuation date attribute (datetime.date or ql.Date)
+    DATE = 'date'
+
+    def __getattr__(self, name):
+        # Result names never live in the instance dictionary, so every access checks the market stamp
+        results = type(self).RESULTS
+        if name not in results or name == 'cache':
+            raise AttributeError("'{}' object has no attribute '{}'".format(type(self).__name__, name))
+
+        cache = self.__dict__.setdefault('cache', {})
+        stamp = self.STAMP()
+        if name in cache and cache[name][0] == stamp:
+            return cache[name][1]
+
+        # Priced on the instrument's own date (trades of other dates may have moved it since construction),
+        # and results may be requested in any order, so none may leave the evaluation date moved (THETA)
+        with PRICING_CONTEXT(getattr(self, type(self).DATE)):
+            value = results[name](self)
+
+        cache[name] = (stamp, value)
+
+        return value
+
+    def __setattr__(self, name, value):
+        if name in self.MARKET:
+            self.INVALIDATE()
+        super().__setattr__(name, value)
+
+    def STAMP(self):
+        return tuple(MARKET_STAMP(self.__dict__.get(name)) for name in type(self).MARKET)
+
+    def INVALIDATE(self):
+        self.__dict__.get('cache', {}).clear()
+
+    def CACHED(self):
+        # Names of the results cached on the current market
+        stamp = self.STAMP()
+        return [name for name, (cached, _) in self.__dict__.get('cache', {}).items() if cached == stamp]
+
+    def COMPUTE(self, names):
+        # Batch request for a subset of results, e.g. COMPUTE(['npv', 'delta'])
+        return {name: getattr(self, name) for name in names}
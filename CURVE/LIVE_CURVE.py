@@ -0,0 +1,200 @@
+import datetime
+from contextlib import contextmanager
+import pandas as pd
+import QuantLib as ql
+from PRICING_CONTEXT import SET_EVALUATION_DATE
+
+# Market Conventions
+USD_CONVENTIONS = {'calendar': ql.UnitedStates(),
+                   'day_counter': ql.Actual360(),
+                   'convention': ql.ModifiedFollowing,
+                   'settlement_days': 2,
+                   'frequency': ql.Semiannual,
+                   'index': ql.Euribor3M,
+                   'instruments': ('CASH', 'FUTURE', 'SWAP')}
+
+KRW_CONVENTIONS = {'calendar': ql.SouthKorea(),
+                   'day_counter': ql.Actual365Fixed(),
+                   'convention': ql.ModifiedFollowing,
+                   'settlement_days': 2,
+                   'frequency': ql.Semiannual,
+                   'index': ql.Euribor3M,
+                   'instruments': ('CASH', 'SWAP')}
+
+CDS_CONVENTIONS = {'calendar': ql.UnitedStates(),
+                   'day_counter': ql.Actual360(),
+                   'convention': ql.ModifiedFollowing,
+                   'settlement_days': 2,
+                   'frequency': ql.Quarterly,
+                   'date_generation': ql.DateGeneration.CDS,
+                   'recovery_rate': 0.4,
+                   'tenors': (ql.Period(6, ql.Months),
+                              ql.Period(1, ql.Years),
+                              ql.Period(2, ql.Years),
+                              ql.Period(3, ql.Years),
+                              ql.Period(4, ql.Years),
+                              ql.Period(5, ql.Years),
+                              ql.Period(7, ql.Years),
+                              ql.Period(10, ql.Years))}
+
+# Curve that owns its market quotes, indexed by tenor
+class LIVE_CURVE():
+    def __init__(self, today):
+        self.date = today
+        self.todays_date = ql.Date(today.day, today.month, today.year)
+
+        # tenor -> SimpleQuote / market unit scale (% = 100, bp = 10000, futures price = 1)
+        self.quotes = {}
+        self.scales = {}
+        self.version = 0
+
+    def QUOTE(self, tenor, value, scale):
+        quote = ql.SimpleQuote(value / scale)
+        self.quotes[tenor] = quote
+        self.scales[tenor] = scale
+        return ql.QuoteHandle(quote)
+
+    def VALUES(self):
+        # Current quotes in market units (same units as 'Market.Mid')
+        return pd.Series({tenor: quote.value() * self.scales[tenor] for tenor, quote in self.quotes.items()},
+                         name='Market.Mid')
+
+    def UPDATE(self, changes):
+        # changes : {tenor : new market quote}, the curve re-bootstraps lazily on next use
+        for tenor, value in dict(changes).items():
+            self.quotes[tenor].setValue(value / self.scales[tenor])
+        self.version += 1
+
+    @contextmanager
+    def BUMP(self, tenor, size):
+        # size in rate terms (1bp = 0.0001), restored on exit; futures are quoted as 100 - rate
+        # tenor=None bumps every quote together (parallel shift)
+        tenors = list(self.quotes) if tenor is None else [tenor]
+        values = {tenor: self.quotes[tenor].value() for tenor in tenors}
+
+        for tenor, value in values.items():
+            shift = -size * 100 if self.scales[tenor] == 1 else size
+            self.quotes[tenor].setValue(value + shift)
+        try:
+            yield self
+        finally:
+            for tenor, value in values.items():
+                self.quotes[tenor].setValue(value)
+
+# Live Yield Curve : Deposit / Futures / Swap Helpers on a PiecewiseLinearZero
+class LIVE_YIELD_CURVE(LIVE_CURVE):
+    def __init__(self, today, quote, conventions):
+        super().__init__(today)
+        self.conventions = conventions
+        self.quote = quote
+
+        # Set Evaluation Date
+        SET_EVALUATION_DATE(self.todays_date)
+
+        # Market Conventions
+        calendar = conventions['calendar']
+        dayCounter = conventions['day_counter']
+        convention = conventions['convention']
+        settlementDays = conventions['settlement_days']
+        frequency = conventions['frequency']
+        instruments = conventions['instruments']
+
+        # Divide DataFrame into 3 Parts
+        depo = quote[quote['InstType'] == 'CASH']
+        futures = quote[quote['InstType'] == 'FUTURE']
+        swap = quote[quote['InstType'] == 'SWAP']
+
+        # Build Rate Helpers
+        # 1. Deposit Rate Helper
+        depositHelpers = [ql.DepositRateHelper(self.QUOTE(tenor, rate, 100),
+                                               ql.Period(int(day), ql.Days),
+                                               settlementDays,
+                                               calendar,
+                                               convention,
+                                               False,
+                                               dayCounter)
+                          for tenor, day, rate in zip(depo.index, depo['DaysToMaturity'], depo['Market.Mid'])]
+
+        # 2. Futures Rate Helper
+        futuresHelpers = []
+        if 'FUTURE' in instruments:
+            for tenor, maturity, price in zip(futures.index, futures['Maturity'], futures['Market.Mid']):
+                iborStartDate = ql.Date(maturity.day, maturity.month, maturity.year)
+
+                futuresHelper = ql.FuturesRateHelper(self.QUOTE(tenor, price, 1),
+                                                     iborStartDate,
+                                                     3,
+                                                     calendar,
+                                                     convention,
+                                                     False,
+                                                     dayCounter)
+                futuresHelpers.append(futuresHelper)
+
+        # 3. Swap Rate Helper
+        swapHelpers = [ql.SwapRateHelper(self.QUOTE(tenor, rate, 100),
+                                         ql.Period(int(day), ql.Days),
+                                         calendar,
+                                         frequency,
+                                         convention,
+                                         dayCounter,
+                                         conventions['index']())
+                       for tenor, day, rate in zip(swap.index, swap['DaysToMaturity'], swap['Market.Mid'])]
+
+        # Curve Construction
+        self.helpers = depositHelpers + futuresHelpers + swapHelpers
+        self.curve = ql.PiecewiseLinearZero(self.todays_date, self.helpers, dayCounter)
+        self.handle = ql.YieldTermStructureHandle(self.curve)
+
+    def COPY(self):
+        # Private curve on the current quotes and the same reference date, for pricing on another date :
+        # a bootstrapped curve keeps the pillars of the first other date it is evaluated on
+        quote = self.quote.copy()
+        values = self.VALUES()
+        quote.loc[values.index, 'Market.Mid'] = values
+
+        return LIVE_YIELD_CURVE(self.date, quote, self.conventions)
+
+# Live Hazard Curve : Spread CDS Helpers on a PiecewiseFlatHazardRate
+class LIVE_HAZARD_CURVE(LIVE_CURVE):
+    def __init__(self, today, cds_quote, discount_curve, conventions=CDS_CONVENTIONS):
+        super().__init__(today)
+        self.conventions = conventions
+
+        # Set Evaluation Date
+        SET_EVALUATION_DATE(self.todays_date)
+
+        # Market Conventions
+        self.discount_handle = ql.YieldTermStructureHandle(discount_curve)
+
+        self.helpers = [ql.SpreadCdsHelper(self.QUOTE(name, spread, 10000),
+                                           tenor,
+                                           conventions['settlement_days'],
+                                           conventions['calendar'],
+                                           conventions['frequency'],
+                                           conventions['convention'],
+                                           conventions['date_generation'],
+                                           conventions['day_counter'],
+                                           conventions['recovery_rate'],
+                                           self.discount_handle)
+                        for name, spread, tenor in zip(cds_quote.index, cds_quote['Market.Mid'], conventions['tenors'])]
+
+        self.curve = ql.PiecewiseFlatHazardRate(self.todays_date,
+                                                self.helpers,
+                                                conventions['day_counter'])
+        self.handle = ql.DefaultProbabilityTermStructureHandle(self.curve)
+
+
+if __name__ == "__main__":
+    from SWAP_CURVE import GET_QUOTE
+
+    # Today's Date
+    todays_date = datetime.date(2020, 10, 9)
+
+    # Build Live Curve
+    live_curve = LIVE_YIELD_CURVE(todays_date, GET_QUOTE(todays_date), USD_CONVENTIONS)
+    maturity = ql.Date(9, 10, 2030)
+    print("10Y Discount Factor = {}".format(live_curve.curve.discount(maturity)))
+
+    # Intraday Tick : 10Y swap +5bp, re-bootstrapped lazily on the next query
+    live_curve.UPDATE({'10Y': live_curve.VALUES()['10Y'] + 0.05})
+    print("10Y Discount Factor = {}".format(live_curve.curve.discount(maturity)))
@@ -0,0 +1,95 @@
+import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+import QuantLib as ql
+
+# The evaluation date is process-wide in QuantLib : every write, and every pricing that reads it, holds this lock
+LOCK = threading.RLock()
+
+def QL_DATE(date):
+    if isinstance(date, ql.Date):
+        return date
+    return ql.Date(date.day, date.month, date.year)
+
+# Set the Evaluation Date (curve builders and instruments go through here instead of writing Settings directly)
+def SET_EVALUATION_DATE(date):
+    with LOCK:
+        ql.Settings.instance().evaluationDate = QL_DATE(date)
+
+# Pricing Context : an evaluation date and the market objects built under it
+class PRICING_CONTEXT():
+    def __init__(self, date):
+        # date : datetime.date or ql.Date
+        self.date = QL_DATE(date)
+        self.objects = {}
+        self.saved = []
+
+    def __enter__(self):
+        # Held until exit, so no other thread moves the date while this context builds or prices
+        LOCK.acquire()
+        settings = ql.Settings.instance()
+        self.saved.append(settings.evaluationDate)
+        settings.evaluationDate = self.date
+
+        return self
+
+    def __exit__(self, *exc):
+        try:
+            ql.Settings.instance().evaluationDate = self.saved.pop()
+        finally:
+            LOCK.release()
+
+        return False
+
+    def BUILD(self, name, builder, *args, **kwargs):
+        # Market object built once under this context's date, e.g. BUILD('USD', SWAP_CURVE, today, quote)
+        with self:
+            if name not in self.objects:
+                self.objects[name] = builder(*args, **kwargs)
+            return self.objects[name]
+
+    def RUN(self, function, *args, **kwargs):
+        # Objects built by other contexts re-bootstrap against this date while it runs
+        with self:
+            return function(self, *args, **kwargs)
+
+    def SHIFTED(self, days):
+        # Context on a later date sharing this one's market objects (theta, roll-down)
+        context = PRICING_CONTEXT(self.date + ql.Period(days, ql.Days))
+        context.objects = self.objects
+
+        return context
+
+# Run Independent Contexts from a Thread Pool : [(context, function, args)] -> results in job order
+def RUN_CONTEXTS(jobs, max_workers=None):
+    # QuantLib work is serialised by the lock, only work done outside the contexts overlaps
+    with ThreadPoolExecutor(max_workers) as pool:
+        futures = [pool.submit(context.RUN, function, *args) for context, function, args in jobs]
+        return [future.result() for future in futures]
+
+
+if __name__ == "__main__":
+    from SWAP_CURVE import GET_QUOTE, SWAP_CURVE
+
+    # IRS on T and T+1, each date pricing on its own curve
+    def SWAP_NPV(context, today):
+        curve = context.BUILD('USD', SWAP_CURVE, today, GET_QUOTE(today))
+        handle = ql.YieldTermStructureHandle(curve)
+        index = ql.USDLibor(ql.Period(3, ql.Months), handle)
+        schedule = ql.MakeSchedule(ql.Date(19, 10, 2020), ql.Date(19, 10, 2022), ql.Period(3, ql.Months))
+        swap = ql.VanillaSwap(ql.VanillaSwap.Payer, 10000000, schedule, 0.00218, ql.Actual360(),
+                              schedule, index, 0.0, ql.Actual360())
+        swap.setPricingEngine(ql.DiscountingSwapEngine(handle))
+        return swap.NPV()
+
+    dates = [datetime.date(2020, 10, 9), datetime.date(2020, 10, 10)]
+    sequential = [PRICING_CONTEXT(today).RUN(SWAP_NPV, today) for today in dates]
+
+    ql.Settings.instance().evaluationDate = ql.Date(1, 1, 2020)
+    jobs = [(PRICING_CONTEXT(today), SWAP_NPV, (today,)) for today in dates for _ in range(4)]
+    threaded = RUN_CONTEXTS(jobs, max_workers=4)
+
+    for today, npv in zip(dates, sequential):
+        print("{} : NPV = {:.4f}".format(today, npv))
+    print("Max Threaded Difference = {:.2e}".format(max(abs(npv - sequential[i // 4]) for i, npv in enumerate(threaded))))
+    print("Evaluation Date Restored = {}".format(ql.Settings.instance().evaluationDate))
@@ -0,0 +1,171 @@
+import os
+import sys
+import datetime
+import importlib
+import numpy as np
+import pandas as pd
+
+# Pre-process Raw Quote DataFrame
+def PREPROCESS(curve, today):
+    curve = curve.copy()
+    maturity = pd.to_datetime(curve['Maturity']).values.astype('datetime64[D]')
+
+    curve['Maturity'] = maturity.astype(object)
+    curve['DaysToMaturity'] = (maturity - np.datetime64(today, 'D')).astype(float)
+
+    return curve
+
+# Quote DataFrame -> NumPy Record Array (first field is the index)
+def RECORDS(curve):
+    curve = curve.rename_axis(curve.index.name or 'Tenor')
+    columns = {curve.index.name: curve.index.to_series()}
+    columns.update(curve.items())
+
+    fields = []
+    for name, values in columns.items():
+        if name == 'Maturity':
+            fields.append((name, 'datetime64[D]'))
+        elif pd.api.types.is_numeric_dtype(values):
+            fields.append((name, 'f8'))
+        else:
+            fields.append((name, 'U{}'.format(max(values.astype(str).str.len().max(), 1))))
+
+    table = np.empty(len(curve), dtype=fields)
+    for name, values in columns.items():
+        if name == 'Maturity':
+            table[name] = pd.to_datetime(values).values.astype('datetime64[D]')
+        else:
+            table[name] = values.values
+
+    return table
+
+# NumPy Record Array -> Quote DataFrame
+def FRAME(table):
+    index = pd.Index(table[table.dtype.names[0]], name=table.dtype.names[0])
+    return pd.DataFrame({name: table[name] for name in table.dtype.names[1:]}, index=index)
+
+# Quote Source 1 - Excel Workbook (Windows / macOS only)
+class EXCEL_SOURCE():
+    def __init__(self, path, sheets):
+        # sheets : {ticker : (sheet name, cell range)}
+        self.path = path
+        self.sheets = sheets
+
+    def LOCATION(self, today, ticker):
+        return os.path.abspath(self.path), self.sheets[ticker][0]
+
+    def READ(self, today, ticker):
+        # xlwings is only needed when quotes actually come from Excel
+        import xlwings as xw
+
+        sheet, cells = self.sheets[ticker]
+
+        xw.App(visible=False)
+        wb = xw.Book(self.path)
+        sht = wb.sheets(sheet)
+        curve = sht.range(cells).options(pd.DataFrame).value
+        wb.close()
+
+        return curve
+
+# Quote Source 2 - Local Columnar Store keyed by (date, ticker)
+class COLUMNAR_SOURCE():
+    def __init__(self, path, fmt='npy'):
+        # fmt : 'npy' (memory-mapped NumPy record file) or 'parquet' (needs pyarrow)
+        if fmt not in ('npy', 'parquet'):
+            raise ValueError("fmt must be 'npy' or 'parquet'")
+
+        self.path = path
+        self.fmt = fmt
+
+    def FILE(self, today, ticker):
+        return os.path.join(self.path, ticker, today.strftime('%Y%m%d') + '.' + self.fmt)
+
+    def LOCATION(self, today, ticker):
+        return os.path.abspath(self.FILE(today, ticker)), ticker
+
+    def DATES(self, ticker):
+        folder = os.path.join(self.path, ticker)
+        if not os.path.isdir(folder):
+            return []
+
+        suffix = '.' + self.fmt
+        dates = [datetime.datetime.strptime(name[:-len(suffix)], '%Y%m%d').date()
+                 for name in os.listdir(folder) if name.endswith(suffix)]
+
+        return sorted(dates)
+
+    def READ(self, today, ticker):
+        file = self.FILE(today, ticker)
+
+        if self.fmt == 'parquet':
+            return pd.read_parquet(file)
+
+        return FRAME(np.load(file, mmap_mode='r'))
+
+    def WRITE(self, today, ticker, curve):
+        file = self.FILE(today, ticker)
+        os.makedirs(os.path.dirname(file), exist_ok=True)
+
+        # Only raw market columns are stored, DaysToMaturity is derived on read
+        curve = curve.drop(columns=['DaysToMaturity'], errors='ignore')
+        curve = curve.rename_axis(curve.index.name or 'Tenor')
+
+        if self.fmt == 'parquet':
+            curve.to_parquet(file)
+            return file
+
+        table = RECORDS(curve)
+        np.save(file, table)
+
+        return file
+
+# Quote Source 3 - In-memory Snapshot keyed by (date, ticker), picklable to worker processes
+class FRAME_SOURCE():
+    def __init__(self, tables=None):
+        # tables : {(date, ticker) : NumPy record array}
+        self.tables = dict(tables or {})
+
+    def LOCATION(self, today, ticker):
+        # Not a file : the quote cache keys on the snapshot itself and never sees it change
+        return '<snapshot {}>'.format(id(self)), ticker
+
+    def DATES(self, ticker):
+        return sorted(date for date, name in self.tables if name == ticker)
+
+    def READ(self, today, ticker):
+        return FRAME(self.tables[(today, ticker)])
+
+    def WRITE(self, today, ticker, curve):
+        curve = curve.drop(columns=['DaysToMaturity'], errors='ignore')
+        self.tables[(today, ticker)] = RECORDS(curve)
+
+# Curve Modules reading a Quote Source (handed to worker processes)
+CURVE_MODULES = ('SWAP_CURVE', 'FX_CURVE', 'CDS_CURVE')
+
+def QUOTE_SOURCES():
+    return {name: sys.modules[name].QUOTE_SOURCE for name in CURVE_MODULES if name in sys.modules}
+
+def SET_QUOTE_SOURCES(sources):
+    for name, source in sources.items():
+        importlib.import_module(name).SET_QUOTE_SOURCE(source)
+
+
+if __name__ == "__main__":
+
+    # Today's Date
+    todays_date = datetime.date(2020, 10, 9)
+
+    # Load Excel Export into the Columnar Store
+    curve = pd.read_csv(r'./Data.csv', index_col=0, usecols=range(4))
+    source = COLUMNAR_SOURCE(r'./QUOTES')
+    source.WRITE(todays_date, 'USD', curve)
+
+    # CDS_CURVE's Quotes (CSV exports of ../CDS/Data.xlsb)
+    cds_date = datetime.date(2020, 12, 11)
+    source.WRITE(cds_date, 'USD', pd.read_csv(r'../CDS/USDIRS.csv', index_col=0))
+    source.WRITE(cds_date, 'ROKCDS', pd.read_csv(r'../CDS/ROKCDS.csv', index_col=0))
+
+    # Read Back (memory-mapped)
+    quote = PREPROCESS(source.READ(todays_date, 'USD'), todays_date)
+    print(quote)
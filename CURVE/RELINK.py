@@ -0,0 +1,46 @@
+import datetime
+import importlib
+from contextlib import contextmanager
+import QuantLib as ql
+
+# Relink Handles to Scenario Curves / Quotes, restoring the Base Links on Exit
+@contextmanager
+def RELINKED(*links):
+    # links : (relinkable handle, scenario curve or quote) pairs
+    base = [(handle, handle.currentLink()) for handle, _ in links]
+
+    for handle, target in links:
+        handle.linkTo(target)
+    try:
+        yield
+    finally:
+        for handle, target in base:
+            handle.linkTo(target)
+
+
+# One Rule for the two SWIG Modules : market objects (curves, quotes, spreads and the relinkable handles holding them)
+# are QuantLib everywhere, QuantExt builds only what QuantLib lacks (the CCS / FXF instruments and engines, which take
+# QuantLib handles) and casts what those return. Handles are therefore only ever relinked to QuantLib objects.
+
+# SWIG Module that built an Object : cashflows of QuantExt legs are cast with QuantExt's own helpers
+def OWNER(obj):
+    # QuantExt is only imported for objects it created
+    return importlib.import_module(type(obj).__module__.split('.')[0])
+
+
+if __name__ == "__main__":
+    from SWAP_CURVE import GET_QUOTE, SWAP_CURVE
+
+    # Today's Date
+    todays_date = datetime.date(2020, 10, 9)
+    curve = SWAP_CURVE(todays_date, GET_QUOTE(todays_date))
+
+    # Scenario : Parallel +1bp on a Handle shared by every Instrument
+    curve_handle = ql.RelinkableYieldTermStructureHandle(curve)
+    up_curve = ql.ZeroSpreadedTermStructure(ql.YieldTermStructureHandle(curve), ql.QuoteHandle(ql.SimpleQuote(0.0001)))
+
+    maturity = ql.Date(9, 10, 2030)
+    print("Base 10Y Discount Factor = {}".format(curve_handle.discount(maturity)))
+    with RELINKED((curve_handle, up_curve)):
+        print("+1bp 10Y Discount Factor = {}".format(curve_handle.discount(maturity)))
+    print("Restored 10Y Discount Factor = {}".format(curve_handle.discount(maturity)))
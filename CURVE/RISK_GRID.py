@@ -0,0 +1,132 @@
+import multiprocessing
+import numpy as np
+import pandas as pd
+import QuantLib as ql
+from QUOTE_SOURCE import QUOTE_SOURCES, SET_QUOTE_SOURCES
+from CURVE_SNAPSHOT import SNAPSHOT_ARRAYS, RESTORE_CURVE
+
+# Trade held by each Worker Process (QuantLib objects cannot be pickled)
+TRADE = None
+
+# Parallel Zero Shifts on a Base Curve, built once per shift
+def SHIFTED_CURVES(curve, shifts):
+    curve_handle = ql.YieldTermStructureHandle(curve)
+    return [curve if shift == 0 else
+            ql.ZeroSpreadedTermStructure(curve_handle, ql.QuoteHandle(ql.SimpleQuote(shift)))
+            for shift in shifts]
+
+# Current Market of a Trade : curve nodes and FX spot (curves relinked or spot set after construction included)
+def TRADE_MARKET(trade):
+    for name in ('usd_curve', 'krw_curve'):
+        if not hasattr(getattr(trade, name), 'nodes'):
+            raise ValueError('{} has no nodes to send to worker processes, price the grid with processes=1'.format(name))
+
+    return {'usd_curve': SNAPSHOT_ARRAYS(trade.usd_curve),
+            'krw_curve': SNAPSHOT_ARRAYS(trade.krw_curve),
+            'fx_spot': trade.fx_spot}
+
+# Worker Start-up : rebuild the trade from its constructor arguments once, then put it on the sender's market
+def INIT_WORKER(cls, args, sources, market):
+    global TRADE
+    SET_QUOTE_SOURCES(sources)
+    TRADE = cls(*args)
+    TRADE.usd_curve = RESTORE_CURVE(market['usd_curve'])
+    TRADE.krw_curve = RESTORE_CURVE(market['krw_curve'])
+    TRADE.fx_spot = market['fx_spot']
+
+# (usd shift x krw shift) NPV Slice for one FX Shock, all on the trade's built instrument
+def GRID_SLICE(trade, fx_shock, usd_shifts, krw_shifts):
+    usd_curves = SHIFTED_CURVES(trade.usd_curve, usd_shifts)
+    krw_curves = SHIFTED_CURVES(trade.krw_curve, krw_shifts)
+    fx_spot = trade.fx_spot * (1 + fx_shock)
+
+    return np.array([[trade.PRICING(usd_curve, krw_curve, fx_spot) for krw_curve in krw_curves]
+                     for usd_curve in usd_curves])
+
+def WORKER_SLICE(args):
+    i, fx_shock, usd_shifts, krw_shifts = args
+    return i, GRID_SLICE(TRADE, fx_shock, usd_shifts, krw_shifts)
+
+# (fx shock x usd shift x krw shift) NPV Cube of a CCS / FXF
+def NPV_CUBE(trade, fx_shocks, usd_shifts, krw_shifts, processes=1):
+    # fx_shocks : relative spot moves (0.01 = 1%), usd / krw shifts : parallel zero shifts (0.0001 = 1bp)
+    # processes : 1 prices on the trade itself, None / n > 1 on a pool (None = one worker per CPU)
+    cube = np.empty((len(fx_shocks), len(usd_shifts), len(krw_shifts)))
+
+    if processes == 1:
+        for i, fx_shock in enumerate(fx_shocks):
+            cube[i] = GRID_SLICE(trade, fx_shock, usd_shifts, krw_shifts)
+        return cube
+
+    # Each worker builds the trade once on the current market (restored curve nodes) and evaluates whole FX slices on it
+    tasks = [(i, fx_shock, list(usd_shifts), list(krw_shifts)) for i, fx_shock in enumerate(fx_shocks)]
+    initargs = (type(trade), trade.args, QUOTE_SOURCES(), TRADE_MARKET(trade))
+
+    with multiprocessing.Pool(processes, initializer=INIT_WORKER, initargs=initargs) as pool:
+        for i, values in pool.imap_unordered(WORKER_SLICE, tasks):
+            cube[i] = values
+
+    return cube
+
+# Long-format Cube with P&L against the Unshocked NPV
+def GRID_FRAME(cube, fx_shocks, usd_shifts, krw_shifts):
+    index = pd.MultiIndex.from_product([fx_shocks, usd_shifts, krw_shifts], names=['fx shock', 'usd shift', 'krw shift'])
+    frame = pd.DataFrame({'npv': cube.ravel()}, index=index)
+    frame['pnl'] = frame['npv'] - frame.loc[(0, 0, 0), 'npv']
+
+    return frame
+
+# Steps around the Unshocked Point of one Grid Axis
+def GRID_STEPS(name, axis):
+    axis = list(axis)
+    if 0 not in axis or axis.index(0) in (0, len(axis) - 1):
+        raise ValueError('{} must contain 0 with a shock on each side'.format(name))
+
+    centre = axis.index(0)
+    up, down = axis[centre + 1], -axis[centre - 1]
+    if up <= 0 or down <= 0:
+        raise ValueError('{} must be sorted in increasing order'.format(name))
+
+    return centre, up, down
+
+# Deltas, Gammas and Cross-gammas at the Unshocked Point
+def GRID_GREEKS(cube, fx_shocks, usd_shifts, krw_shifts):
+    """
+    Three-point differences on the actual neighbouring shocks, so uneven grids
+    (e.g. [-0.02, 0, 0.01]) are exact up to second order like even ones.
+
+    Results are derivatives per unit of each axis: deltas per 1.0 relative
+    spot move / 1.0 zero shift, gammas and cross-gammas per unit squared.
+    Multiply by the bump size to compare with the bump pairs, e.g.
+    fx_delta * 0.01 with FXF.FX_DELTA and usd_delta * 0.0001 with USD_IR_DELTA.
+    """
+    steps = [GRID_STEPS(name, axis) for name, axis in (('fx_shocks', fx_shocks),
+                                                        ('usd_shifts', usd_shifts),
+                                                        ('krw_shifts', krw_shifts))]
+    centre = [c for c, _, _ in steps]
+
+    def V(*moves):
+        return cube[tuple(c + m for c, m in zip(centre, moves))]
+
+    def UNIT(axis, move):
+        return tuple(move if i == axis else 0 for i in range(3))
+
+    greeks = {'npv': V(0, 0, 0)}
+    names = ('fx', 'usd', 'krw')
+
+    for axis, (name, (_, up, down)) in enumerate(zip(names, steps)):
+        v_up, v_down, v_0 = V(*UNIT(axis, 1)), V(*UNIT(axis, -1)), V(0, 0, 0)
+        greeks[name + '_delta'] = (down ** 2 * v_up - up ** 2 * v_down - (down ** 2 - up ** 2) * v_0) / (up * down * (up + down))
+        greeks[name + '_gamma'] = 2 * (down * v_up - (up + down) * v_0 + up * v_down) / (up * down * (up + down))
+
+    for a, b in ((0, 1), (0, 2), (1, 2)):
+        _, a_up, a_down = steps[a]
+        _, b_up, b_down = steps[b]
+
+        def CORNER(a_move, b_move):
+            return V(*(a_move if i == a else b_move if i == b else 0 for i in range(3)))
+
+        cross = CORNER(1, 1) - CORNER(1, -1) - CORNER(-1, 1) + CORNER(-1, -1)
+        greeks['{}_{}_cross_gamma'.format(names[a], names[b])] = cross / ((a_up + a_down) * (b_up + b_down))
+
+    return pd.Series(greeks)
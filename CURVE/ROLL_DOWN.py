@@ -0,0 +1,109 @@
+import datetime
+import pandas as pd
+import QuantLib as ql
+from RELINK import RELINKED
+from PRICING_CONTEXT import PRICING_CONTEXT
+
+# Roll-down Modes
+#  'forward' : forwards (and hazard rates) stay put on calendar dates, the curve is seen from a later date
+#  'zero'    : zero rates (and hazard rates) stay put by time to maturity, node dates move with the date
+MODES = ('forward', 'zero')
+
+# Freeze a Bootstrapped Curve on its Nodes (helpers re-bootstrap when the evaluation date moves)
+def FROZEN_CURVE(curve):
+    dates, values = zip(*curve.nodes())
+
+    if hasattr(curve, 'survivalProbability'):
+        return ql.HazardRateCurve(list(dates), list(values), curve.dayCounter())
+
+    return ql.ZeroCurve(list(dates), list(values), curve.dayCounter(), ql.NullCalendar(), ql.Linear(), ql.Continuous, ql.Annual)
+
+# Today's Curve Rolled forward by days
+def ROLLED_CURVE(curve, days=1, mode='forward'):
+    if mode not in MODES:
+        raise ValueError("mode must be 'forward' or 'zero'")
+
+    frozen = FROZEN_CURVE(curve)
+    dates, values = zip(*frozen.nodes())
+    rolled_date = dates[0] + days
+
+    if mode == 'zero':
+        # Same node values, node dates shifted by days
+        dates = [date + days for date in dates]
+        if hasattr(frozen, 'survivalProbability'):
+            return ql.HazardRateCurve(dates, list(values), frozen.dayCounter())
+        return ql.ZeroCurve(dates, list(values), frozen.dayCounter(), ql.NullCalendar(), ql.Linear(), ql.Continuous, ql.Annual)
+
+    if hasattr(frozen, 'survivalProbability'):
+        # Survival from the rolled date : same hazard rates on the remaining nodes
+        dates = [rolled_date] + [date for date in dates if date > rolled_date]
+        return ql.HazardRateCurve(dates, [frozen.hazardRate(date) for date in dates], frozen.dayCounter())
+
+    return ql.ImpliedTermStructure(ql.YieldTermStructureHandle(frozen), rolled_date)
+
+# Theta of a Book in one Extra Valuation Pass on Rolled Curves
+def BOOK_THETA(book, days=1, mode='forward'):
+    # book : {name : instrument} or [instrument], each exposing LINKS() -> [(relinkable handle, curve)]
+    trades = book if isinstance(book, dict) else dict(enumerate(book))
+    links = {name: trade.LINKS() for name, trade in trades.items()}
+
+    # Trades grouped by the reference date of their curves, each date priced and rolled in its own context
+    groups = {}
+    for name, trade_links in links.items():
+        dates = {curve.referenceDate().serialNumber() for _, curve in trade_links}
+        if len(dates) != 1:
+            raise ValueError('{} prices on curves of different dates'.format(name))
+        groups.setdefault(dates.pop(), []).append(name)
+
+    npv_t0, npv_t1 = {}, {}
+    for serial, names in sorted(groups.items()):
+        context = PRICING_CONTEXT(ql.Date(serial))
+
+        with context:
+            # Each curve is rolled once however many trades use it, from its nodes on its own date
+            rolled = {}
+            for name in names:
+                for _, curve in links[name]:
+                    if id(curve) not in rolled:
+                        rolled[id(curve)] = ROLLED_CURVE(curve, days, mode)
+
+            for name in names:
+                with RELINKED(*links[name]):
+                    npv_t0[name] = trades[name].instrument.NPV()
+
+        with context.SHIFTED(days):
+            for name in names:
+                with RELINKED(*[(handle, rolled[id(curve)]) for handle, curve in links[name]]):
+                    npv_t1[name] = trades[name].instrument.NPV()
+
+    table = pd.DataFrame({'npv': pd.Series(npv_t0), 'rolled npv': pd.Series(npv_t1)}).loc[list(trades)]
+    table['theta'] = table['rolled npv'] - table['npv']
+
+    return table
+
+
+if __name__ == "__main__":
+    from SWAP_CURVE import GET_QUOTE, SWAP_CURVE
+
+    # Today's Date
+    todays_date = datetime.date(2020, 10, 9)
+    curve = SWAP_CURVE(todays_date, GET_QUOTE(todays_date))
+
+    # 5Y Discount Factor under each Roll-down Mode
+    maturity = ql.Date(9, 10, 2025)
+    print("Today 5Y Discount Factor = {}".format(curve.discount(maturity)))
+    for mode in MODES:
+        print("Rolled ({}) 5Y Discount Factor = {}".format(mode, ROLLED_CURVE(curve, 1, mode).discount(maturity)))
+
+    # Book Theta across Instrument Classes sharing LINKS() / instrument
+    from IRS import IRS
+    from FRA_v2 import FRA
+    effective_date = datetime.date(2020, 10, 19)
+    book = {'irs': IRS(todays_date, effective_date, datetime.date(2022, 10, 19), 0.00218, 10000000, ql.VanillaSwap.Payer),
+            'fra': FRA(todays_date, curve, effective_date, datetime.date(2020, 12, 15), 'Long', 0.0022, 10000000)}
+    print(BOOK_THETA(book))
+
+    # Trades booked on another date are rolled from their own curve and date
+    book['irs (T-1)'] = IRS(todays_date - datetime.timedelta(days=1), effective_date, datetime.date(2022, 10, 19),
+                            0.00218, 10000000, ql.VanillaSwap.Payer)
+    print(BOOK_THETA(book))
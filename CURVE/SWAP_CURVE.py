@@ -6,88 +6,31 @@ import seaborn as sns
 sns.set()
 
 import QuantLib as ql
-import xlwings as xw
+from QUOTE_SOURCE import EXCEL_SOURCE
+from CACHE import QUOTES
+from CURVE_REGISTRY import REGISTERED_CURVE
+from LIVE_CURVE import USD_CONVENTIONS, LIVE_YIELD_CURVE
+from CURVE_QUERY import DISCOUNT_FACTORS, ZERO_RATES, FORWARD_RATES, CURVE_TABLE
 
-# Get Quote from Excel File
+# Quote Source (Excel by default, set a COLUMNAR_SOURCE to run headless)
+QUOTE_SOURCE = EXCEL_SOURCE(r'./Data.xlsx', {'USD': ('Sheet1', 'A1:D25')})
+
+def SET_QUOTE_SOURCE(source):
+    global QUOTE_SOURCE
+    QUOTE_SOURCE = source
+
+# Get Quote from Quote Source (through the shared quote cache)
 def GET_QUOTE(today):
-    
-    # Import Data from Excel
-    xw.App(visible=False)
-    wb = xw.Book(r'./Data.xlsx')
-    sht = wb.sheets('Sheet1')
-    curve = sht.range('A1:D25').options(pd.DataFrame).value
-    wb.close()
-    
-    # Pre-process DataFrame
-    curve['DaysToMaturity'] = np.nan
-    curve['Maturity'] = pd.to_datetime(curve['Maturity']).dt.date
-    
-    for tenor in curve.index:
-        curve.loc[tenor, 'DaysToMaturity'] = (curve.loc[tenor, 'Maturity'] - today).days
-    
-    return curve
+    return QUOTES.QUOTE(QUOTE_SOURCE, today, 'USD')
+
+# Construct Live IRS Curve (owns its quotes, see LIVE_CURVE)
+@REGISTERED_CURVE('USDIRS', USD_CONVENTIONS)
+def LIVE_SWAP_CURVE(today, quote):
+    return LIVE_YIELD_CURVE(today, quote, USD_CONVENTIONS)
 
 # Construct IRS Curve
 def SWAP_CURVE(today, quote):
-    
-    # Divide DataFrame into 3 Parts
-    depo = quote[quote['InstType'] == 'CASH']
-    futures = quote[quote['InstType'] == 'FUTURE']
-    swap = quote[quote['InstType'] == 'SWAP']
-
-    # Set Evaluation Date
-    todays_date = ql.Date(today.day, today.month, today.year)
-    ql.Settings.instance().evaluationDate = todays_date
-    
-    # Market Conventions
-    calendar = ql.UnitedStates()
-    dayCounter = ql.Actual360()
-    convention = ql.ModifiedFollowing
-    settlementDays = 2
-    frequency = ql.Semiannual
-        
-    # Build Rate Helpers
-    # 1. Deposit Rate Helper
-    depositHelpers = [ql.DepositRateHelper(ql.QuoteHandle(ql.SimpleQuote(rate / 100)),
-                                           ql.Period(int(day), ql.Days),
-                                           settlementDays,
-                                           calendar,
-                                           convention,
-                                           False,
-                                           dayCounter)
-                      for day, rate in zip(depo['DaysToMaturity'], depo['Market.Mid'])]
-    
-    # 2. Futures Rate Helper
-    futuresHelpers = []
-    for i, price in enumerate(futures['Market.Mid']):
-        iborStartDate = ql.Date(futures['Maturity'][i].day,
-                                futures['Maturity'][i].month,
-                                futures['Maturity'][i].year)
-        
-        futuresHelper = ql.FuturesRateHelper(ql.QuoteHandle(ql.SimpleQuote(price)),
-                                             iborStartDate,
-                                             3,
-                                             calendar,
-                                             convention,
-                                             False,
-                                             dayCounter)
-        futuresHelpers.append(futuresHelper)
-    
-    # 3. Swap Rate Helper
-    swapHelpers = [ql.SwapRateHelper(ql.QuoteHandle(ql.SimpleQuote(rate / 100)),
-                                     ql.Period(int(day), ql.Days),
-                                     calendar,
-                                     frequency,
-                                     convention,
-                                     dayCounter,
-                                     ql.Euribor3M())
-                   for day, rate in zip(swap['DaysToMaturity'], swap['Market.Mid'])]
-    
-    # Curve Construction
-    helpers = depositHelpers + futuresHelpers + swapHelpers
-    depoFuturesSwapCurve = ql.PiecewiseLinearZero(todays_date, helpers, dayCounter)
-        
-    return depoFuturesSwapCurve
+    return LIVE_SWAP_CURVE(today, quote).curve
 
 def DISCOUNT_FACTOR(date, curve):
     date = ql.Date(date.day, date.month, date.year)
@@ -128,14 +71,9 @@ if __name__ == "__main__":
     curve = SWAP_CURVE(todays_date, quote)  
     
     # Calculate Discount Factor / Zero Rate / Forward Rate
-    quote['discount factor'] = np.nan
-    quote['zero rate'] = np.nan
-    quote['forward rate'] = np.nan
-    
-    for tenor, date in zip(quote.index, quote['Maturity']):
-        quote.loc[tenor, 'discount factor'] = DISCOUNT_FACTOR(date, curve)
-        quote.loc[tenor, 'zero rate'] = ZERO_RATE(date, curve) * 100
-        quote.loc[tenor, 'forward rate'] = FORWARD_RATE(date, curve) * 100
+    quote['discount factor'] = DISCOUNT_FACTORS(quote['Maturity'], curve)
+    quote['zero rate'] = ZERO_RATES(quote['Maturity'], curve) * 100
+    quote['forward rate'] = FORWARD_RATES(quote['Maturity'], curve) * 100
         
     # Print the Result
     print(quote[['discount factor', 'zero rate', 'forward rate']])
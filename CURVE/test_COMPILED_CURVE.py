@@ -0,0 +1,48 @@
+import os
+import sys
+import datetime
+import pandas as pd
+import pytest
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'CDS'))
+
+from QUOTE_SOURCE import COLUMNAR_SOURCE, QUOTE_SOURCES, SET_QUOTE_SOURCES
+from COMPILED_CURVE import COMPILE_CURVE, COMPILED_YIELD_CURVE, COMPILED_HAZARD_CURVE, PARITY, TOLERANCE
+import SWAP_CURVE
+import CDS_CURVE
+
+TODAY = datetime.date(2020, 10, 9)
+CDS_DATE = datetime.date(2020, 12, 11)
+
+# Columnar Store with the CSV Exports of the Excel Quotes (no Excel needed)
+@pytest.fixture(scope='module')
+def source(tmp_path_factory):
+    source = COLUMNAR_SOURCE(str(tmp_path_factory.mktemp('QUOTES')))
+    source.WRITE(TODAY, 'USD', pd.read_csv(os.path.join(HERE, 'Data.csv'), index_col=0, usecols=range(4)))
+    source.WRITE(CDS_DATE, 'USD', pd.read_csv(os.path.join(HERE, '..', 'CDS', 'USDIRS.csv'), index_col=0))
+    source.WRITE(CDS_DATE, 'ROKCDS', pd.read_csv(os.path.join(HERE, '..', 'CDS', 'ROKCDS.csv'), index_col=0))
+
+    saved = QUOTE_SOURCES()
+    SET_QUOTE_SOURCES({'SWAP_CURVE': source, 'CDS_CURVE': source})
+    yield source
+    SET_QUOTE_SOURCES(saved)
+
+def test_yield_curve_parity(source):
+    curve = SWAP_CURVE.SWAP_CURVE(TODAY, SWAP_CURVE.GET_QUOTE(TODAY))
+    assert isinstance(COMPILE_CURVE(curve), COMPILED_YIELD_CURVE)
+
+    errors = PARITY(curve)
+    assert set(errors) == {'discount factor', 'zero rate', 'forward rate'}
+    for name, error in errors.items():
+        assert error < TOLERANCE, name
+
+def test_hazard_curve_parity(source):
+    discount_curve = CDS_CURVE.SWAP_CURVE(CDS_DATE, CDS_CURVE.GET_IRS_QUOTE(CDS_DATE))
+    curve = CDS_CURVE.CDS_CURVE(CDS_DATE, CDS_CURVE.GET_CDS_QUOTE(CDS_DATE), discount_curve)
+    assert isinstance(COMPILE_CURVE(curve), COMPILED_HAZARD_CURVE)
+
+    errors = PARITY(curve)
+    assert set(errors) == {'survival probability', 'default probability', 'hazard rate'}
+    for name, error in errors.items():
+        assert error < TOLERANCE, name
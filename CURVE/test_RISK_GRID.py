@@ -0,0 +1,131 @@
+import os
+import sys
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+import QuantLib as ql
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'CCS'))
+sys.path.insert(0, os.path.join(HERE, '..', 'FXF'))
+
+from QUOTE_SOURCE import COLUMNAR_SOURCE, QUOTE_SOURCES, SET_QUOTE_SOURCES
+from CURVE_SNAPSHOT import SNAPSHOT_ARRAYS, RESTORE_CURVE
+from RELINK import RELINKED
+from RISK_GRID import NPV_CUBE, GRID_GREEKS
+import FX_CURVE
+
+TODAY = datetime.date(2020, 10, 9)
+FX_SPOT = 1153.30
+
+# Columnar Store with the CSV Exports of the Excel Quotes (the CCS demo prices a day earlier)
+@pytest.fixture(scope='module')
+def source(tmp_path_factory):
+    source = COLUMNAR_SOURCE(str(tmp_path_factory.mktemp('QUOTES')))
+    for today in (TODAY - datetime.timedelta(days=1), TODAY):
+        source.WRITE(today, 'USD', pd.read_csv(os.path.join(HERE, 'Data.csv'), index_col=0, usecols=range(4)))
+        source.WRITE(today, 'KRW', pd.read_csv(os.path.join(HERE, 'KRWCCS.csv'), index_col=0))
+
+    saved = QUOTE_SOURCES()
+    SET_QUOTE_SOURCES({'FX_CURVE': source})
+    yield source
+    SET_QUOTE_SOURCES(saved)
+
+# QuantLib-only FX Forward with the FXF grid interface and bump pairs (QuantExt may not be installed)
+class FORWARD():
+    def __init__(self, todays_date, maturity_date, fx_spot, fx_forward, usd_notional):
+        self.args = (todays_date, maturity_date, fx_spot, fx_forward, usd_notional)
+        self.usd_curve = FX_CURVE.USDIRS_CURVE(todays_date, FX_CURVE.GET_QUOTE(todays_date, 'USD'))
+        self.krw_curve = FX_CURVE.KRWCCS_CURVE(todays_date, FX_CURVE.GET_QUOTE(todays_date, 'KRW'))
+        self.fx_spot = fx_spot
+
+        self.usd_curve_handle = ql.RelinkableYieldTermStructureHandle(self.usd_curve)
+        self.krw_curve_handle = ql.RelinkableYieldTermStructureHandle(self.krw_curve)
+        self.fx_spot_handle = ql.RelinkableQuoteHandle(ql.SimpleQuote(fx_spot))
+
+        self.maturity = ql.Date(maturity_date.day, maturity_date.month, maturity_date.year)
+        self.usd_notional, self.krw_notional = usd_notional, usd_notional * fx_forward
+
+    def PRICING(self, usd_curve, krw_curve, fx_spot):
+        with RELINKED((self.usd_curve_handle, usd_curve),
+                      (self.krw_curve_handle, krw_curve),
+                      (self.fx_spot_handle, ql.SimpleQuote(fx_spot))):
+            return (self.usd_notional * self.usd_curve_handle.discount(self.maturity) * self.fx_spot_handle.value()
+                    - self.krw_notional * self.krw_curve_handle.discount(self.maturity))
+
+    def FX_DELTA(self):
+        up = self.PRICING(self.usd_curve, self.krw_curve, self.fx_spot * 1.01)
+        down = self.PRICING(self.usd_curve, self.krw_curve, self.fx_spot * 0.99)
+        return (up - down) / 2
+
+    def CURVE_DELTA(self, name):
+        base = {'usd': self.usd_curve, 'krw': self.krw_curve}
+        handle = ql.YieldTermStructureHandle(base[name])
+        npv = []
+        for shift in (0.0001, -0.0001):
+            curves = dict(base, **{name: ql.ZeroSpreadedTermStructure(handle, ql.QuoteHandle(ql.SimpleQuote(shift)))})
+            npv.append(self.PRICING(curves['usd'], curves['krw'], self.fx_spot))
+        return (npv[0] - npv[1]) / 2
+
+@pytest.fixture
+def trade(source):
+    return FORWARD(TODAY, datetime.date(2021, 10, 9), FX_SPOT, 1152.32, 10000000)
+
+def test_greeks_match_bump_pairs(trade):
+    fx_shocks, ir_shifts = [-0.01, 0, 0.01], [-0.0001, 0, 0.0001]
+    greeks = GRID_GREEKS(NPV_CUBE(trade, fx_shocks, ir_shifts, ir_shifts), fx_shocks, ir_shifts, ir_shifts)
+
+    assert greeks['npv'] == pytest.approx(trade.PRICING(trade.usd_curve, trade.krw_curve, trade.fx_spot), rel=1e-12)
+    assert greeks['fx_delta'] * 0.01 == pytest.approx(trade.FX_DELTA(), rel=1e-12)
+    assert greeks['usd_delta'] * 0.0001 == pytest.approx(trade.CURVE_DELTA('usd'), rel=1e-12)
+    assert greeks['krw_delta'] * 0.0001 == pytest.approx(trade.CURVE_DELTA('krw'), rel=1e-12)
+
+def test_uneven_grid_greeks(trade):
+    # The NPV is linear in spot, so the FX delta is exact on any grid
+    fx_shocks, ir_shifts = [-0.02, 0, 0.01], [-0.002, 0, 0.001]
+    greeks = GRID_GREEKS(NPV_CUBE(trade, fx_shocks, ir_shifts, ir_shifts), fx_shocks, ir_shifts, ir_shifts)
+
+    assert greeks['fx_delta'] * 0.01 == pytest.approx(trade.FX_DELTA(), rel=1e-9)
+    assert greeks['fx_gamma'] == pytest.approx(0, abs=1e-3 * abs(greeks['fx_delta']))
+    assert greeks['usd_delta'] * 0.0001 == pytest.approx(trade.CURVE_DELTA('usd'), rel=1e-5)
+    assert greeks['krw_delta'] * 0.0001 == pytest.approx(trade.CURVE_DELTA('krw'), rel=1e-5)
+
+def test_unsorted_grid_raises(trade):
+    with pytest.raises(ValueError):
+        GRID_GREEKS(np.zeros((3, 3, 3)), [0.01, 0, -0.01], [-1, 0, 1], [-1, 0, 1])
+
+def test_pool_matches_serial_on_current_market(trade):
+    # Market moved after construction : workers rebuilding from the constructor arguments alone would miss it
+    arrays = SNAPSHOT_ARRAYS(trade.krw_curve)
+    arrays['values'] = arrays['values'] + 0.001
+    trade.krw_curve = RESTORE_CURVE(arrays)
+    trade.fx_spot = FX_SPOT * 1.01
+
+    fx_shocks, ir_shifts = [-0.01, 0, 0.01], [-0.0001, 0, 0.0001]
+    serial = NPV_CUBE(trade, fx_shocks, ir_shifts, ir_shifts)
+    pooled = NPV_CUBE(trade, fx_shocks, ir_shifts, ir_shifts, processes=2)
+
+    np.testing.assert_allclose(pooled, serial, rtol=1e-12)
+
+# The QuantExt trades against their own bump pairs
+@pytest.mark.parametrize('name', ['FXF', 'CCS'])
+def test_quantext_greeks_match_bump_pairs(source, name):
+    pytest.importorskip('QuantExt')
+    if name == 'FXF':
+        from FXF import FXF
+        trade = FXF(TODAY, datetime.date(2021, 10, 9), FX_SPOT, 1152.32, 10000000, 'Long')
+        fx_bump, deltas = 0.01, (trade.fx_delta, trade.usd_ir_delta, trade.krw_ir_delta)
+    else:
+        from CCS import CCS
+        trade = CCS(TODAY - datetime.timedelta(days=1), datetime.date(2020, 11, 26), datetime.date(2025, 11, 26),
+                    0.0009746, 1133.85, 10000000, 'Long')
+        fx_bump, deltas = 0.0001, (trade.fx_delta, trade.usd_curve_delta, trade.krw_curve_delta)
+
+    fx_shocks, ir_shifts = [-fx_bump, 0, fx_bump], [-0.0001, 0, 0.0001]
+    greeks = GRID_GREEKS(trade.RISK_GRID(fx_shocks, ir_shifts, ir_shifts), fx_shocks, ir_shifts, ir_shifts)
+
+    assert greeks['npv'] == pytest.approx(trade.npv, rel=1e-12)
+    assert greeks['fx_delta'] * fx_bump == pytest.approx(deltas[0], rel=1e-9)
+    assert greeks['usd_delta'] * 0.0001 == pytest.approx(deltas[1], rel=1e-9)
+    assert greeks['krw_delta'] * 0.0001 == pytest.approx(deltas[2], rel=1e-9)
@@ -1,13 +1,25 @@
 import datetime
 import QuantLib as ql
 from SWAP_CURVE import GET_QUOTE, SWAP_CURVE
+from LAZY_RESULTS import LAZY_RESULTS
+from RELINK import RELINKED
 
-class FRA():
-    def __init__(self, todays_date, effective_date, maturity_date, position, fra_rate, notional):
+class FRA(LAZY_RESULTS):
+    # Pricing Results (computed on first access, see LAZY_RESULTS)
+    RESULTS = {'npv': lambda self: self.PRICING(self.curve),
+               'dv01': lambda self: self.DV01(),
+               'theta': lambda self: self.THETA()}
+    MARKET = ('date', 'curve')
+    # Curve and handle shared by the trades of a book group (see PORTFOLIO/BOOK)
+    SHARED = ('curve', 'curve_handle')
+    
+    def __init__(self, todays_date, effective_date, maturity_date, position, fra_rate, notional, market=None):
+        # Constructor Arguments (to rebuild the trade in worker processes)
+        self.args = (todays_date, effective_date, maturity_date, position, fra_rate, notional)
         
         # Initial Setup 1 : Date & Curve
         self.date = todays_date
-        self.curve = self.CURVE(self.date)
+        self.curve = self.CURVE(self.date) if market is None else market.curve
         
         # Initial Setup 2 : Instruments Info
         self.effective_date = ql.Date(effective_date.day, effective_date.month, effective_date.year)
@@ -18,17 +30,18 @@ class FRA():
             self.position = ql.Position.Short
         self.fra_rate = fra_rate
         self.notional = notional
-
-        # Pricing Results
-        self.npv = self.PRICING(self.curve)
-        self.dv01 = self.DV01()
-        self.theta = self.THETA()
+        
+        # Instrument built once on a relinkable handle, scenarios only relink it
+        if market is None:
+            self.curve_handle = ql.RelinkableYieldTermStructureHandle(self.curve)
+        else:
+            self.curve_handle = market.curve_handle
+        self.instrument = self.INSTRUMENT(self.curve_handle)
         
     def CURVE(self, date):
         return SWAP_CURVE(date, GET_QUOTE(date))
     
-    def PRICING(self, curve):
-        curve_handle = ql.YieldTermStructureHandle(curve)
+    def INSTRUMENT(self, curve_handle):
         libor = ql.USDLibor(ql.Period(3, ql.Months), curve_handle)
         # Pricing FRA
         fra = ql.ForwardRateAgreement(self.effective_date,
@@ -39,10 +52,19 @@ class FRA():
                                       libor,
                                       curve_handle)
         
-        npv = fra.NPV()
+        return fra
+    
+    def PRICING(self, curve):
+        # Relink to the scenario curve, only the NPV is recalculated
+        with RELINKED((self.curve_handle, curve)):
+            npv = self.instrument.NPV()
         
         return npv
     
+    def LINKS(self):
+        # Relinkable handles with the curves they price on (see ROLL_DOWN.BOOK_THETA)
+        return [(self.curve_handle, self.curve)]
+    
     def DV01(self):
         curve_handle = ql.YieldTermStructureHandle(self.curve)
         
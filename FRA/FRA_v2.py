@@ -1,14 +1,19 @@
 import datetime
 import QuantLib as ql
 from SWAP_CURVE import GET_QUOTE, SWAP_CURVE
+from RELINK import RELINKED
+from ROLL_DOWN import ROLLED_CURVE
+from CURVE_REGISTRY import REGISTRY
+from PRICING_CONTEXT import PRICING_CONTEXT, SET_EVALUATION_DATE
 
 class FRA():
     def __init__(self, date, curve, effective_date, maturity_date, position, fra_rate, notional):
         
         # Initial Setup 1 : Date & Curve
         self.date = ql.Date(date.day, date.month, date.year)
-        ql.Settings.instance().evaluationDate = self.date
-        self.curve_handle = ql.YieldTermStructureHandle(curve)
+        SET_EVALUATION_DATE(self.date)
+        self.curve = curve
+        self.curve_handle = ql.RelinkableYieldTermStructureHandle(curve)
         
         # Initial Setup 2 : Instruments Info
         self.effective_date = ql.Date(effective_date.day, effective_date.month, effective_date.year)
@@ -20,60 +25,76 @@ class FRA():
         self.fra_rate = fra_rate
         self.notional = notional
         self.libor = ql.USDLibor(ql.Period(3, ql.Months), self.curve_handle)
+        
+        # FRA built once, scenarios only relink the curve handle (instrument : name used by BOOK_THETA / SCENARIO)
+        self.fra = ql.ForwardRateAgreement(self.effective_date,
+                                           self.maturity_date,
+                                           self.position,
+                                           self.fra_rate,
+                                           self.notional,
+                                           self.libor,
+                                           self.curve_handle)
+        self.instrument = self.fra
 
         # Pricing Results
-        self.npv = self.PRICING(self.curve)
+        self.npv = self.PRICING()
         self.dv01 = self.DV01()
         self.theta = self.THETA()
     
     def PRICING(self):
         # Pricing FRA
-        fra = ql.ForwardRateAgreement(self.effective_date,
-                                      self.maturity_date,
-                                      self.position,
-                                      self.fra_rate,
-                                      self.notional,
-                                      self.libor,
-                                      self.curve_handle)
-        
-        npv = fra.NPV()
+        npv = self.fra.NPV()
         
         return npv
     
+    def LINKS(self):
+        # Relinkable handles with the curves they price on (see ROLL_DOWN.BOOK_THETA)
+        return [(self.curve_handle, self.curve)]
+    
     def DV01(self):
         # 1bp
         basis_point = 0.0001
         
+        # Spreads sit on the base curve, never on the relinkable handle itself
+        base_handle = ql.YieldTermStructureHandle(self.curve)
+        
         # FRA price when 1bp up
-        up_curve = ql.ZeroSpreadedTermStructure(self.curve_handle, ql.QuoteHandle(ql.SimpleQuote(basis_point)))
-        up_curve_handle = ql.YieldTermStructureHandle(up_curve)
-        self.curve_handle = up_curve_handle
-        up_fra = self.PRICING()
+        up_curve = ql.ZeroSpreadedTermStructure(base_handle, ql.QuoteHandle(ql.SimpleQuote(basis_point)))
+        with RELINKED((self.curve_handle, up_curve)):
+            up_fra = self.PRICING()
 
         # FRA price when 1bp down
-        down_curve = ql.ZeroSpreadedTermStructure(self.curve_handle, ql.QuoteHandle(ql.SimpleQuote(-basis_point)))
-        down_curve_handle = ql.YieldTermStructureHandle(down_curve)
-        self.curve_handle = down_curve_handle
-        down_fra = self.PRICING()
-        
-        original_curve = ql.ZeroSpreadedTermStructure(self.curve_handle, ql.QuoteHandle(ql.SimpleQuote(basis_point)))
-        original_curve_handle = ql.YieldTermStructureHandle(original_curve)
-        self.curve_handle = original_curve_handle
+        down_curve = ql.ZeroSpreadedTermStructure(base_handle, ql.QuoteHandle(ql.SimpleQuote(-basis_point)))
+        with RELINKED((self.curve_handle, down_curve)):
+            down_fra = self.PRICING()
         
         # DV01
         dv01 = (up_fra - down_fra) / 2
         
         return dv01
     
-    def THETA(self):
+    def THETA(self, mode=None):
+        # mode None : same quotes on the next date, 'forward' / 'zero' : today's curve rolled down (see ROLL_DOWN)
         price_t0 = self.PRICING()
         print(price_t0)
         
-        ql.Settings.instance().evaluationDate = self.date + ql.Period(1, ql.Days)
-        price_t1 = self.PRICING()
-        print(price_t1)
+        # Tomorrow's curve built on today's date (the curve passed in is shared with other trades, and would keep
+        # tomorrow's pillars after the date moves back if it were evaluated there itself)
+        with PRICING_CONTEXT(self.date):
+            if mode is None:
+                # Private copy re-bootstrapped on tomorrow's helpers
+                live = REGISTRY.LIVE(self.curve)
+                if live is None or not hasattr(live[1], 'COPY'):
+                    raise ValueError("THETA on the same quotes needs a curve from a registered builder (SWAP_CURVE), "
+                                     "use mode='forward' or 'zero'")
+                curve_t1 = live[1].COPY().curve
+            else:
+                curve_t1 = ROLLED_CURVE(self.curve, 1, mode)
         
-        ql.Settings.instance().evaluationDate = self.date
+        with PRICING_CONTEXT(self.date + ql.Period(1, ql.Days)):
+            with RELINKED((self.curve_handle, curve_t1)):
+                price_t1 = self.PRICING()
+        print(price_t1)
         
         return price_t1 - price_t0
     
@@ -93,6 +114,7 @@ if __name__ == "__main__":
     
     # Build FRA object
     fra = FRA(todays_date,
+              curve,
               effective_date,
               maturity_date,
               position,
@@ -102,4 +124,5 @@ if __name__ == "__main__":
     print("Price = {}".format(round(fra.npv, 4)))
     print("DV01 = {}".format(round(fra.dv01, 4)))
     print("Theta = {}".format(round(fra.theta, 4)))
+    print("Roll-down Theta = {}".format(round(fra.THETA('forward'), 4)))
     
\ No newline at end of file
@@ -1,14 +1,34 @@
 import datetime
 import QuantExt as qe
-from SWAP_CURVE import GET_QUOTE, USDIRS_CURVE, KRWCCS_CURVE
+import QuantLib as ql
+from FX_CURVE import GET_QUOTE, USDIRS_CURVE, KRWCCS_CURVE, LIVE_USDIRS_CURVE, LIVE_KRWCCS_CURVE
+from KEY_RATE import DELTA_LADDER
+from LAZY_RESULTS import LAZY_RESULTS
+from RELINK import RELINKED
+from RISK_GRID import NPV_CUBE, GRID_FRAME, GRID_GREEKS
 
-class FXF():
-    def __init__(self, todays_date, maturity_date, fx_spot, fx_forward, usd_notional, position):
+class FXF(LAZY_RESULTS):
+    # Pricing Results (computed on first access, see LAZY_RESULTS)
+    RESULTS = {'npv': lambda self: self.PRICING(self.usd_curve, self.krw_curve, self.fx_spot),
+               'fx_delta': lambda self: self.FX_DELTA(),
+               'usd_ir_delta': lambda self: self.USD_IR_DELTA(),
+               'krw_ir_delta': lambda self: self.KRW_IR_DELTA(),
+               'theta': lambda self: self.THETA()}
+    MARKET = ('date', 'usd_curve', 'krw_curve', 'fx_spot')
+    # Curves, handles and engine shared by the trades of a book group (see PORTFOLIO/BOOK)
+    SHARED = ('usd_curve', 'krw_curve', 'usd_curve_handle', 'krw_curve_handle', 'fx_spot_handle', 'engine')
+    
+    def __init__(self, todays_date, maturity_date, fx_spot, fx_forward, usd_notional, position, market=None):
+        # Constructor Arguments (to rebuild the trade in worker processes)
+        self.args = (todays_date, maturity_date, fx_spot, fx_forward, usd_notional, position)
         
         # Initial Setup 1 - Date / Curves / FX Spot
         self.date = todays_date
-        self.usd_curve = self.USD_CURVE(self.date)
-        self.krw_curve = self.KRW_CURVE(self.date)
+        if market is None:
+            self.usd_curve = self.USD_CURVE(self.date)
+            self.krw_curve = self.KRW_CURVE(self.date)
+        else:
+            self.usd_curve, self.krw_curve = market.usd_curve, market.krw_curve
         self.fx_spot = fx_spot
         
         # Initial Setup 2 - Instrument Info
@@ -24,12 +44,22 @@ class FXF():
         else:
             self.payCcy1 = False
         
-        # Pricing Results
-        self.npv = self.PRICING(self.usd_curve, self.krw_curve, self.fx_spot)
-        self.fx_delta = self.FX_DELTA()
-        self.usd_ir_delta = self.USD_IR_DELTA()
-        self.krw_ir_delta = self.KRW_IR_DELTA()
-        self.theta = self.THETA()
+        # Instrument built once on relinkable handles, scenarios only relink them
+        # (market objects and their handles are QuantLib, only the instrument and engine are QuantExt, see RELINK)
+        if market is None:
+            self.usd_curve_handle = ql.RelinkableYieldTermStructureHandle(self.usd_curve)
+            self.krw_curve_handle = ql.RelinkableYieldTermStructureHandle(self.krw_curve)
+            self.fx_spot_handle = ql.RelinkableQuoteHandle(ql.SimpleQuote(self.fx_spot))
+            # To-do : Dual Curve Import
+            self.engine = qe.DiscountingFxForwardEngine(self.krw,
+                                                        self.krw_curve_handle,
+                                                        self.usd,
+                                                        self.usd_curve_handle,
+                                                        self.fx_spot_handle)
+        else:
+            self.usd_curve_handle, self.krw_curve_handle = market.usd_curve_handle, market.krw_curve_handle
+            self.fx_spot_handle, self.engine = market.fx_spot_handle, market.engine
+        self.instrument = self.INSTRUMENT(self.usd_curve_handle, self.krw_curve_handle, self.fx_spot_handle)
         
     def USD_CURVE(self, date):
         return USDIRS_CURVE(date, GET_QUOTE(date, 'USD'))
@@ -37,11 +67,10 @@ class FXF():
     def KRW_CURVE(self, date):
         return KRWCCS_CURVE(date, GET_QUOTE(date, 'KRW'))
         
-    def PRICING(self, usd_curve, krw_curve, fx_spot):   
-        usd_curve_handle = qe.YieldTermStructureHandle(usd_curve)
-        krw_curve_handle = qe.YieldTermStructureHandle(krw_curve)
-        fx_spot_handle = qe.QuoteHandle(qe.SimpleQuote(fx_spot))
-        
+    def LIVE_CURVES(self, date):
+        return LIVE_USDIRS_CURVE(date, GET_QUOTE(date, 'USD')), LIVE_KRWCCS_CURVE(date, GET_QUOTE(date, 'KRW'))
+    
+    def INSTRUMENT(self, usd_curve_handle, krw_curve_handle, fx_spot_handle):
         fxf = qe.FxForward(self.krw_notional,
                            self.krw,
                            self.usd_notional,
@@ -49,18 +78,23 @@ class FXF():
                            self.maturity_date,
                            self.payCcy1)
 
-        # To-do : Dual Curve Import
-        engine = qe.DiscountingFxForwardEngine(self.krw,
-                                               krw_curve_handle,
-                                               self.usd,
-                                               usd_curve_handle,
-                                               fx_spot_handle)
-        
-        fxf.setPricingEngine(engine)
+        fxf.setPricingEngine(self.engine)
 
-        npv = fxf.NPV()
+        return fxf
+        
+    def PRICING(self, usd_curve, krw_curve, fx_spot):   
+        # Relink to the scenario curves / spot, only the NPV is recalculated
+        with RELINKED((self.usd_curve_handle, usd_curve),
+                      (self.krw_curve_handle, krw_curve),
+                      (self.fx_spot_handle, ql.SimpleQuote(fx_spot))):
+            npv = self.instrument.NPV()
         
         return npv
+    
+    def LINKS(self):
+        # Relinkable handles with the curves they price on (see ROLL_DOWN.BOOK_THETA)
+        return [(self.usd_curve_handle, self.usd_curve),
+                (self.krw_curve_handle, self.krw_curve)]
 
     def FX_DELTA(self):
         
@@ -78,17 +112,17 @@ class FXF():
         return fx_delta
     
     def USD_IR_DELTA(self):
-        curve_handle = qe.YieldTermStructureHandle(self.usd_curve)
+        curve_handle = ql.YieldTermStructureHandle(self.usd_curve)
         
         # 1bp
         basis_point = 0.0001
         
         # FRA price when 1bp up
-        up_curve = qe.ZeroSpreadedTermStructure(curve_handle, qe.QuoteHandle(qe.SimpleQuote(basis_point)))
+        up_curve = ql.ZeroSpreadedTermStructure(curve_handle, ql.QuoteHandle(ql.SimpleQuote(basis_point)))
         up_fxf = self.PRICING(up_curve, self.krw_curve, self.fx_spot)
         
         # FRA price when 1bp down
-        down_curve = qe.ZeroSpreadedTermStructure(curve_handle, qe.QuoteHandle(qe.SimpleQuote(-basis_point)))
+        down_curve = ql.ZeroSpreadedTermStructure(curve_handle, ql.QuoteHandle(ql.SimpleQuote(-basis_point)))
         down_fxf = self.PRICING(down_curve, self.krw_curve, self.fx_spot)
 
         # USD Curve Delta
@@ -96,23 +130,36 @@ class FXF():
         return delta
     
     def KRW_IR_DELTA(self):
-        curve_handle = qe.YieldTermStructureHandle(self.krw_curve)
+        curve_handle = ql.YieldTermStructureHandle(self.krw_curve)
         
         # 1bp
         basis_point = 0.0001
         
         # FRA price when 1bp up
-        up_curve = qe.ZeroSpreadedTermStructure(curve_handle, qe.QuoteHandle(qe.SimpleQuote(basis_point)))
+        up_curve = ql.ZeroSpreadedTermStructure(curve_handle, ql.QuoteHandle(ql.SimpleQuote(basis_point)))
         up_fxf = self.PRICING(self.usd_curve, up_curve, self.fx_spot)
         
         # FRA price when 1bp down
-        down_curve = qe.ZeroSpreadedTermStructure(curve_handle, qe.QuoteHandle(qe.SimpleQuote(-basis_point)))
+        down_curve = ql.ZeroSpreadedTermStructure(curve_handle, ql.QuoteHandle(ql.SimpleQuote(-basis_point)))
         down_fxf = self.PRICING(self.usd_curve, down_curve, self.fx_spot)
 
         # KRW Curve Delta
         delta = (up_fxf - down_fxf) / 2
         return delta
     
+    def KEY_RATE_DELTA(self):
+        # Forward built once on both live curves, each pillar bumped in place
+        usd_curve, krw_curve = self.LIVE_CURVES(self.date)
+        with RELINKED((self.usd_curve_handle, usd_curve.curve),
+                      (self.krw_curve_handle, krw_curve.curve)):
+            ladder = DELTA_LADDER(self.instrument.NPV, {'USD': usd_curve, 'KRW': krw_curve})
+        
+        return ladder
+    
+    def RISK_GRID(self, fx_shocks, usd_shifts, krw_shifts, processes=1):
+        # NPV cube over FX spot shocks x USD shifts x KRW shifts on the built instrument
+        return NPV_CUBE(self, fx_shocks, usd_shifts, krw_shifts, processes)
+    
     def THETA(self):
         price_t0 = self.PRICING(self.usd_curve, self.krw_curve, self.fx_spot)
         usd_curve_t1 = self.USD_CURVE(self.date + datetime.timedelta(days=1))
@@ -153,4 +200,14 @@ if __name__ == "__main__":
     print("FX Delta = {}".format(round(fxf.fx_delta, 4)))
     print("USD IR Delta = {}".format(round(fxf.usd_ir_delta, 4)))
     print("KRW IR Delta = {}".format(round(fxf.krw_ir_delta, 4)))
-    print("Theta = {}".format(round(fxf.theta, 4)))
\ No newline at end of file
+    print("Theta = {}".format(round(fxf.theta, 4)))
+    
+    # Key-rate Delta Ladder
+    print(fxf.KEY_RATE_DELTA())
+    
+    # Joint FX / Rates Risk Grid
+    fx_shocks = [-0.1, -0.05, -0.01, 0, 0.01, 0.05, 0.1]
+    ir_shifts = [-0.005, -0.001, -0.0001, 0, 0.0001, 0.001, 0.005]
+    cube = fxf.RISK_GRID(fx_shocks, ir_shifts, ir_shifts)
+    print(GRID_GREEKS(cube, fx_shocks, ir_shifts, ir_shifts))
+    print(GRID_FRAME(cube, fx_shocks, ir_shifts, ir_shifts).xs(0, level='krw shift')['pnl'].unstack())
\ No newline at end of file
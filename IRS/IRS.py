@@ -1,13 +1,27 @@
 import datetime
 import QuantLib as ql
-from SWAP_CURVE import GET_QUOTE, SWAP_CURVE
+from SWAP_CURVE import GET_QUOTE, SWAP_CURVE, LIVE_SWAP_CURVE
+from KEY_RATE import DELTA_LADDER
+from ANALYTIC_DELTA import ANALYTIC_LADDER
+from LAZY_RESULTS import LAZY_RESULTS
+from RELINK import RELINKED
 
-class IRS():
-    def __init__(self, date, effective_date, maturity_date, irs_rate, notional, position, spread=0.0):
+class IRS(LAZY_RESULTS):
+    # Pricing Results (computed on first access, see LAZY_RESULTS)
+    RESULTS = {'npv': lambda self: self.PRICING(self.curve),
+               'delta': lambda self: self.DELTA(),
+               'theta': lambda self: self.THETA()}
+    MARKET = ('date', 'curve')
+    # Curve, handle and engine shared by the trades of a book group (see PORTFOLIO/BOOK)
+    SHARED = ('curve', 'curve_handle', 'engine')
+    
+    def __init__(self, date, effective_date, maturity_date, irs_rate, notional, position, spread=0.0, market=None):
+        # Constructor Arguments (to rebuild the trade in worker processes)
+        self.args = (date, effective_date, maturity_date, irs_rate, notional, position, spread)
         
         # Initial Setup 1 : Date & Curve
         self.date = date
-        self.curve = self.CURVE(self.date)
+        self.curve = self.CURVE(self.date) if market is None else market.curve
         
         # Initial Setup 2 : Instrument Info
         self.effective_date = ql.Date(effective_date.day, effective_date.month, effective_date.year)
@@ -22,18 +36,21 @@ class IRS():
         self.spread = spread
         self.position = position
         
-        # Pricing Results
-        self.npv = self.PRICING(self.curve)
-        self.delta = self.DELTA()
-        self.theta = self.THETA()
+        # Instrument built once on a relinkable handle, scenarios only relink it
+        if market is None:
+            self.curve_handle = ql.RelinkableYieldTermStructureHandle(self.curve)
+            self.engine = ql.DiscountingSwapEngine(self.curve_handle)
+        else:
+            self.curve_handle, self.engine = market.curve_handle, market.engine
+        self.instrument = self.INSTRUMENT(self.curve_handle)
         
     def CURVE(self, date):
         return SWAP_CURVE(date, GET_QUOTE(date))
     
-    def PRICING(self, curve):
-        # Yield Term-structure
-        curve_handle = ql.YieldTermStructureHandle(curve)
-        
+    def LIVE_CURVE(self, date):
+        return LIVE_SWAP_CURVE(date, GET_QUOTE(date))
+    
+    def INSTRUMENT(self, curve_handle):
         # USD 3M LIBOR
         float_index = ql.USDLibor(ql.Period(3, ql.Months), curve_handle)
         
@@ -69,12 +86,20 @@ class IRS():
                              self.day_counter)
 
         # Pricing Engine
-        swapEngine = ql.DiscountingSwapEngine(curve_handle)  
-        irs.setPricingEngine(swapEngine)
+        irs.setPricingEngine(self.engine)
         
-        npv = irs.NPV()
+        return irs
+    
+    def PRICING(self, curve):
+        # Relink to the scenario curve, only the NPV is recalculated
+        with RELINKED((self.curve_handle, curve)):
+            npv = self.instrument.NPV()
         
         return npv
+    
+    def LINKS(self):
+        # Relinkable handles with the curves they price on (see ROLL_DOWN.BOOK_THETA)
+        return [(self.curve_handle, self.curve)]
         
     
     def DELTA(self):
@@ -96,6 +121,28 @@ class IRS():
         
         return dv01
     
+    def KEY_RATE_DELTA(self):
+        # Swap relinked to the live curve, each pillar bumped in place
+        live_curve = self.LIVE_CURVE(self.date)
+        with RELINKED((self.curve_handle, live_curve.curve)):
+            ladder = DELTA_LADDER(self.instrument.NPV, {'USD': live_curve})
+        
+        return ladder
+    
+    def ANALYTIC_DELTA(self):
+        # Cashflow zero exposures bucketed to the curve pillars, no repricing
+        live_curve = self.LIVE_CURVE(self.date)
+        
+        # Payer pays the fixed leg (leg 0) and receives the floating leg (leg 1)
+        sign = 1 if self.position == ql.VanillaSwap.Payer else -1
+        legs = [(self.instrument.fixedLeg(), -sign, 'USD'),
+                (self.instrument.floatingLeg(), sign, 'USD')]
+        
+        with RELINKED((self.curve_handle, live_curve.curve)):
+            ladder = ANALYTIC_LADDER(legs, {'USD': live_curve})
+        
+        return ladder
+    
     def THETA(self):
         price_t0 = self.PRICING(self.CURVE(self.date))
         price_t1 = self.PRICING(self.CURVE(self.date + datetime.timedelta(days=1)))
@@ -124,4 +171,19 @@ if __name__ == "__main__":
     
     print("Price = {}".format(round(irs.npv, 4)))
     print("Delta = {}".format(round(irs.delta, 4)))
-    print("Theta = {}".format(round(irs.theta, 4)))
\ No newline at end of file
+    print("Theta = {}".format(round(irs.theta, 4)))
+    
+    # Key-rate Delta Ladder : Bump-and-reprice vs Analytic
+    ladder = irs.KEY_RATE_DELTA()
+    ladder['analytic'] = irs.ANALYTIC_DELTA()['delta']
+    print(ladder[['quote', 'delta', 'analytic']])
+    print("Max Difference = {:.3e}".format((ladder['delta'] - ladder['analytic']).abs().max()))    
+    # Trades on T and T+2 built in either order : each prices on its own date
+    later_date = todays_date + datetime.timedelta(days=2)
+    alone = irs.npv
+    later = IRS(later_date, effective_date, maturity_date, irs_rate, notional, position)
+    later_alone = later.npv
+    for order in ((todays_date, later_date), (later_date, todays_date)):
+        trades = {date: IRS(date, effective_date, maturity_date, irs_rate, notional, position) for date in order}
+        print("Built {} first : Difference = {:.3e}".format(order[0], max(abs(trades[todays_date].npv - alone),
+                                                                      abs(trades[later_date].npv - later_alone))))
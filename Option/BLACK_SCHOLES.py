@@ -0,0 +1,139 @@
+import time
+import numpy as np
+import QuantLib as ql
+from scipy.special import ndtr
+
+# Standard Normal Density
+def NPDF(x):
+    return np.exp(-0.5 * x * x) / np.sqrt(2 * np.pi)
+
+# Year Fractions to Expiry with a QuantLib Day Counter (one SWIG call per distinct expiry)
+def YEAR_FRACTIONS(valuation_date, expiry_dates, day_count=ql.ActualActual(ql.ActualActual.ISDA)):
+    # expiry_dates : ql.Date / datetime.date / numpy datetime64 values
+    expiry_dates = np.asarray(expiry_dates, dtype=object if isinstance(expiry_dates[0], ql.Date) else 'datetime64[D]')
+    dates, inverse = np.unique(expiry_dates, return_inverse=True)
+
+    if dates.dtype != object:
+        dates = [ql.Date(str(date), '%Y-%m-%d') for date in dates]
+
+    times = np.array([day_count.yearFraction(valuation_date, date) for date in dates])
+
+    return times[inverse].reshape(expiry_dates.shape)
+
+# Black-Scholes Price & Greeks of European Options (AnalyticEuropeanEngine on flat continuous curves)
+def BLACK_SCHOLES(option_types, strikes, times, spots, vols, rates, dividends):
+    # option_types : ql.Option.Call (1) / ql.Option.Put (-1), every input is an array or a scalar (broadcast)
+    w, K, t, S, sigma, r, q = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in
+                                                     (option_types, strikes, times, spots, vols, rates, dividends)])
+
+    # Expired options (expiry on or before the valuation date) are worth nothing, like QuantLib
+    alive = t > 0
+    t = np.where(alive, t, 1.0)
+
+    discount = np.exp(-r * t)
+    dividend_discount = np.exp(-q * t)
+    stdev = sigma * np.sqrt(t)
+
+    # No variance (zero vol) : d1 = d2 = +/-inf off the forward, 0 at it, and no density (as QuantLib's BlackCalculator
+    #  sets them, though its greeks come out NaN), so the option is its discounted intrinsic value with zero gamma and vega
+    riskless = stdev < np.finfo(float).eps
+    stdev = np.where(riskless, 0.0, stdev)
+
+    moneyness = np.log(S / K) + (r - q + 0.5 * sigma * sigma) * t
+    with np.errstate(divide='ignore', invalid='ignore'):
+        d1 = np.where(moneyness == 0, 0.0, moneyness / stdev)
+    d2 = d1 - stdev
+
+    N1 = ndtr(w * d1)
+    N2 = ndtr(w * d2)
+    n1 = np.where(riskless, 0.0, NPDF(d1))
+
+    npv = w * (S * dividend_discount * N1 - K * discount * N2)
+    delta = w * dividend_discount * N1
+    gamma = dividend_discount * n1 / (S * np.where(riskless, 1.0, stdev))
+    vega = S * dividend_discount * n1 * np.sqrt(t)
+    rho = w * K * t * discount * N2
+    theta = r * npv - (r - q) * S * delta - 0.5 * sigma * sigma * S * S * gamma
+
+    results = {'npv': npv,
+               'delta': delta,
+               'gamma': gamma,
+               'theta': theta,
+               'theta_per_day': theta / 365.0,
+               'vega': vega,
+               'rho': rho}
+
+    return {name: np.where(alive, value, 0.0) for name, value in results.items()}
+
+# Option Chain from Expiry Dates, on the day count of European_Option.py (Actual/Actual ISDA)
+def EUROPEAN_CHAIN(valuation_date, option_types, strikes, expiry_dates, spots, vols, rates, dividends,
+                   day_count=ql.ActualActual(ql.ActualActual.ISDA)):
+    times = YEAR_FRACTIONS(valuation_date, expiry_dates, day_count)
+    return BLACK_SCHOLES(option_types, strikes, times, spots, vols, rates, dividends)
+
+
+if __name__ == "__main__":
+
+    valuationDate = ql.Date(20, 11, 2020)
+    ql.Settings.instance().evaluationDate = valuationDate
+
+    calendar = ql.SouthKorea()
+    dayCount = ql.ActualActual(ql.ActualActual.ISDA)
+
+    # Random Chain around the European_Option.py Market
+    rng = np.random.default_rng(0)
+    size = 200
+    option_types = rng.choice([ql.Option.Call, ql.Option.Put], size)
+    strikes = rng.uniform(200, 340, size)
+    expiry_dates = [valuationDate + int(days) for days in rng.integers(1, 1000, size)]
+    spots = rng.uniform(250, 290, size)
+    vols = rng.uniform(0.05, 0.6, size)
+    rates = rng.uniform(-0.005, 0.05, size)
+    dividends = rng.uniform(0.0, 0.03, size)
+
+    results = EUROPEAN_CHAIN(valuationDate, option_types, strikes, expiry_dates, spots, vols, rates, dividends, dayCount)
+
+    # Parity against AnalyticEuropeanEngine on the script's Quote / Term-Structure setup
+    underlying_qt = ql.SimpleQuote(0.0)
+    dividend_qt = ql.SimpleQuote(0.0)
+    riskfreerate_qt = ql.SimpleQuote(0.0)
+    volatility_qt = ql.SimpleQuote(0.0)
+
+    r_ts = ql.FlatForward(valuationDate, ql.QuoteHandle(riskfreerate_qt), dayCount)
+    d_ts = ql.FlatForward(valuationDate, ql.QuoteHandle(dividend_qt), dayCount)
+    v_ts = ql.BlackConstantVol(valuationDate, calendar, ql.QuoteHandle(volatility_qt), dayCount)
+
+    process = ql.BlackScholesMertonProcess(ql.QuoteHandle(underlying_qt),
+                                           ql.YieldTermStructureHandle(d_ts),
+                                           ql.YieldTermStructureHandle(r_ts),
+                                           ql.BlackVolTermStructureHandle(v_ts))
+    engine = ql.AnalyticEuropeanEngine(process)
+
+    greeks = {'npv': 'NPV', 'delta': 'delta', 'gamma': 'gamma', 'theta_per_day': 'thetaPerDay', 'vega': 'vega', 'rho': 'rho'}
+    errors = {name: 0.0 for name in greeks}
+    for i in range(size):
+        underlying_qt.setValue(spots[i])
+        dividend_qt.setValue(dividends[i])
+        riskfreerate_qt.setValue(rates[i])
+        volatility_qt.setValue(vols[i])
+
+        option = ql.VanillaOption(ql.PlainVanillaPayoff(int(option_types[i]), strikes[i]), ql.EuropeanExercise(expiry_dates[i]))
+        option.setPricingEngine(engine)
+
+        for name, method in greeks.items():
+            errors[name] = max(errors[name], abs(getattr(option, method)() - results[name][i]))
+
+    print('Max Abs Difference vs AnalyticEuropeanEngine')
+    for name, error in errors.items():
+        print('  {} = {:.3e}'.format(name, error))
+
+    # 1M Options in One Call
+    size = 1000000
+    expiry_dates = np.datetime64('2020-11-20') + rng.integers(1, 1000, size)
+    start = time.time()
+    results = EUROPEAN_CHAIN(valuationDate,
+                             rng.choice([ql.Option.Call, ql.Option.Put], size),
+                             rng.uniform(200, 340, size),
+                             expiry_dates,
+                             270.48, 0.13, 0.01, 0.0, dayCount)
+    print('1M Options Priced in {:.2f}s'.format(time.time() - start))
@@ -0,0 +1,181 @@
+import time
+import numpy as np
+import QuantLib as ql
+from scipy.special import ndtr
+from BLACK_SCHOLES import NPDF, YEAR_FRACTIONS, BLACK_SCHOLES
+
+# Solver Status per Quote
+CONVERGED = 0
+BELOW_INTRINSIC = 1
+ABOVE_UPPER_BOUND = 2
+EXPIRED = 3
+NO_CONVERGENCE = 4
+
+STATUS = {CONVERGED: 'converged',
+          BELOW_INTRINSIC: 'below intrinsic',
+          ABOVE_UPPER_BOUND: 'above upper bound',
+          EXPIRED: 'expired',
+          NO_CONVERGENCE: 'no convergence'}
+
+# Undiscounted Black Price of an Out-of-the-money Option in Total Standard Deviation
+def OTM_BLACK(w, F, K, stdev):
+    d1 = np.log(F / K) / stdev + 0.5 * stdev
+    d2 = d1 - stdev
+    return w * (F * ndtr(w * d1) - K * ndtr(w * d2)), d1, d2
+
+# Rational Initial Guess (Corrado-Miller) for the Total Standard Deviation, from the call price
+def INITIAL_GUESS(F, K, call):
+    half = call - 0.5 * (F - K)
+    root = np.sqrt(np.maximum(half * half - (F - K) ** 2 / np.pi, 0.0))
+    stdev = np.sqrt(2 * np.pi) / (F + K) * (half + root)
+
+    # Deep out-of-the-money quotes can give a non-positive guess : start from the moneyness instead
+    fallback = np.sqrt(2 * np.abs(np.log(F / K))) + 0.1
+    return np.where(stdev > 1e-4, stdev, fallback)
+
+# Batch Implied Volatility of European Options (bracketed Halley iteration with per-quote masks)
+def IMPLIED_VOL(prices, option_types, strikes, times, spots, rates, dividends,
+                tolerance=1e-10, max_iterations=50, max_vol=10.0):
+    # option_types : ql.Option.Call (1) / ql.Option.Put (-1), every input is an array or a scalar (broadcast)
+    price, w, K, t, S, r, q = np.broadcast_arrays(*[np.asarray(value, dtype=float) for value in
+                                                     (prices, option_types, strikes, times, spots, rates, dividends)])
+    shape = price.shape
+    price, w, K, t, S, r, q = [value.ravel() for value in (price, w, K, t, S, r, q)]
+
+    vol = np.full(price.shape, np.nan)
+    status = np.full(price.shape, NO_CONVERGENCE)
+    iterations = np.zeros(price.shape, dtype=int)
+
+    # Arbitrage Bounds on the undiscounted price
+    status[t <= 0] = EXPIRED
+    alive = t > 0
+    t = np.where(alive, t, 1.0)
+
+    F = S * np.exp((r - q) * t)
+    undiscounted = price * np.exp(r * t)
+    intrinsic = np.maximum(w * (F - K), 0.0)
+    upper = np.where(w > 0, F, K)
+
+    status[alive & (undiscounted < intrinsic * (1 - 1e-12))] = BELOW_INTRINSIC
+    status[alive & (undiscounted >= upper)] = ABOVE_UPPER_BOUND
+
+    # A price on the intrinsic value has zero volatility
+    flat = (status == NO_CONVERGENCE) & (undiscounted <= intrinsic)
+    vol[flat] = 0.0
+    status[flat] = CONVERGED
+
+    # Solve on the out-of-the-money side (puts below the forward, calls above) to keep precision
+    active = np.flatnonzero(status == NO_CONVERGENCE)
+    F, K, t, w = F[active], K[active], t[active], w[active]
+    call = undiscounted[active] + np.where(w > 0, 0.0, F - K)
+    otm_w = np.where(K >= F, 1.0, -1.0)
+    target = call - np.where(otm_w > 0, 0.0, F - K)
+
+    stdev = INITIAL_GUESS(F, K, call)
+    lower = np.zeros(active.shape)
+    higher = np.full(active.shape, max_vol * np.sqrt(t))
+    stdev = np.clip(stdev, 1e-8, higher * (1 - 1e-12))
+    todo = np.ones(active.shape, dtype=bool)
+
+    for iteration in range(1, max_iterations + 1):
+        index = np.flatnonzero(todo)
+        if len(index) == 0:
+            break
+
+        s = stdev[index]
+        model, d1, d2 = OTM_BLACK(otm_w[index], F[index], K[index], s)
+        error = model - target[index]
+
+        # Bracket kept around the root : the price increases with the standard deviation
+        lower[index] = np.where(error < 0, s, lower[index])
+        higher[index] = np.where(error > 0, s, higher[index])
+        solved = np.abs(error) <= tolerance * target[index]
+
+        # Halley step on the log price, which stays well scaled for deep out-of-the-money quotes
+        vega = F[index] * NPDF(d1)
+        volga = vega * d1 * d2 / s
+        with np.errstate(divide='ignore', invalid='ignore', over='ignore'):
+            f = np.log(model / target[index])
+            f1 = vega / model
+            f2 = volga / model - f1 * f1
+            step = f / f1 / (1 - 0.5 * f * f2 / (f1 * f1))
+        updated = s - step
+
+        # Steps leaving the bracket (or undefined with vanishing vega) fall back to bisection
+        outside = ~np.isfinite(updated) | (updated < lower[index]) | (updated > higher[index])
+        updated = np.where(outside, 0.5 * (lower[index] + higher[index]), updated)
+        updated = np.where(solved, s, updated)
+        stdev[index] = updated
+        iterations[active[index]] = iteration
+
+        done = solved | (np.abs(updated - s) <= tolerance * s)
+        todo[index[done]] = False
+
+    converged = ~todo
+    vol[active[converged]] = stdev[converged] / np.sqrt(t[converged])
+    status[active[converged]] = CONVERGED
+
+    return {'vol': vol.reshape(shape),
+            'status': status.reshape(shape),
+            'iterations': iterations.reshape(shape)}
+
+# Implied Volatilities of an Option Chain from Expiry Dates
+def IMPLIED_VOL_CHAIN(valuation_date, prices, option_types, strikes, expiry_dates, spots, rates, dividends,
+                      day_count=ql.ActualActual(ql.ActualActual.ISDA), **kwargs):
+    times = YEAR_FRACTIONS(valuation_date, expiry_dates, day_count)
+    return IMPLIED_VOL(prices, option_types, strikes, times, spots, rates, dividends, **kwargs)
+
+# Count of Quotes per Solver Status
+def FAILURES(status):
+    codes, counts = np.unique(status, return_counts=True)
+    return {STATUS[code]: int(count) for code, count in zip(codes, counts) if code != CONVERGED}
+
+
+if __name__ == "__main__":
+
+    valuationDate = ql.Date(20, 11, 2020)
+    ql.Settings.instance().evaluationDate = valuationDate
+    dayCount = ql.ActualActual(ql.ActualActual.ISDA)
+
+    # European_Option.py Quote : one solve through QuantLib and through the batch solver
+    underlying_qt = ql.SimpleQuote(270.48)
+    volatility_qt = ql.SimpleQuote(0.13)
+    r_ts = ql.FlatForward(valuationDate, 0.01, dayCount)
+    d_ts = ql.FlatForward(valuationDate, 0.0, dayCount)
+    v_ts = ql.BlackConstantVol(valuationDate, ql.SouthKorea(), ql.QuoteHandle(volatility_qt), dayCount)
+    process = ql.BlackScholesMertonProcess(ql.QuoteHandle(underlying_qt),
+                                           ql.YieldTermStructureHandle(d_ts),
+                                           ql.YieldTermStructureHandle(r_ts),
+                                           ql.BlackVolTermStructureHandle(v_ts))
+
+    expiryDate = ql.Date(12, 12, 2021)
+    option = ql.VanillaOption(ql.PlainVanillaPayoff(ql.Option.Call, 272), ql.EuropeanExercise(expiryDate))
+    option.setPricingEngine(ql.AnalyticEuropeanEngine(process))
+
+    mkt_price = 21.0
+    print('QuantLib Implied Volatility = ', option.impliedVolatility(mkt_price, process))
+    print('Batch Implied Volatility = ',
+          IMPLIED_VOL_CHAIN(valuationDate, mkt_price, ql.Option.Call, 272, [expiryDate], 270.48, 0.01, 0.0)['vol'][0])
+
+    # 1M Quote Panel : round trip through the vectorised pricer, with a few broken quotes
+    rng = np.random.default_rng(0)
+    size = 1000000
+    option_types = rng.choice([ql.Option.Call, ql.Option.Put], size)
+    strikes = rng.uniform(150, 400, size)
+    times = YEAR_FRACTIONS(valuationDate, np.datetime64('2020-11-20') + rng.integers(7, 1500, size), dayCount)
+    vols = rng.uniform(0.05, 1.0, size)
+
+    prices = BLACK_SCHOLES(option_types, strikes, times, 270.48, vols, 0.01, 0.0)['npv']
+    prices[:100] = -1.0
+    prices[100:200] = 1e6
+
+    start = time.time()
+    result = IMPLIED_VOL(prices, option_types, strikes, times, 270.48, 0.01, 0.0)
+    print('1M Implied Vols Solved in {:.2f}s'.format(time.time() - start))
+
+    solved = result['status'] == CONVERGED
+    # Quotes with no vega left at double precision cannot pin the vol down, compare on the rest
+    priced = solved & (BLACK_SCHOLES(option_types, strikes, times, 270.48, vols, 0.01, 0.0)['vega'] > 1e-6)
+    print('Max Abs Vol Error = {:.3e}'.format(np.abs(result['vol'][priced] - vols[priced]).max()))
+    print('Max Iterations = {}'.format(result['iterations'].max()))
+    print('Failures = {}'.format(FAILURES(result['status'])))
@@ -0,0 +1,165 @@
+import time
+import numpy as np
+import QuantLib as ql
+from BLACK_SCHOLES import YEAR_FRACTIONS, BLACK_SCHOLES
+from IMPLIED_VOL import IMPLIED_VOL, FAILURES, CONVERGED
+
+# Strike x Expiry Volatility Surface behind one Relinkable Handle
+class VOL_SURFACE():
+    def __init__(self, valuation_date, calendar, expiry_dates, strikes, vols, day_count=ql.ActualActual(ql.ActualActual.ISDA)):
+        # vols : (strike x expiry) grid of Black volatilities
+        self.valuation_date = valuation_date
+        self.calendar = calendar
+        self.expiry_dates = list(expiry_dates)
+        self.strikes = np.array(strikes, dtype=float)
+        self.vols = np.array(vols, dtype=float)
+        self.day_count = day_count
+
+        if self.vols.shape != (len(self.strikes), len(self.expiry_dates)):
+            raise ValueError("vols must be a (strike x expiry) grid")
+
+        # Surface times with the t = 0 column of zero variance, as in BlackVarianceSurface
+        self.times = np.concatenate([[0.0], YEAR_FRACTIONS(valuation_date, self.expiry_dates, day_count)])
+
+        # Every process and option is built on this handle and sees each rebuilt surface
+        self.handle = ql.RelinkableBlackVolTermStructureHandle()
+        self.version = 0
+        self.BUILD()
+
+    def BUILD(self):
+        # Flat smile beyond the strike grid (QuantLib defaults to linear extrapolation of variance)
+        self.surface = ql.BlackVarianceSurface(self.valuation_date, self.calendar, self.expiry_dates,
+                                               self.strikes.tolist(), ql.Matrix(self.vols.tolist()), self.day_count,
+                                               ql.BlackVarianceSurface.ConstantExtrapolation,
+                                               ql.BlackVarianceSurface.ConstantExtrapolation)
+        self.surface.enableExtrapolation()
+        self.handle.linkTo(self.surface)
+        self.version += 1
+
+    def UPDATE(self, changes):
+        # changes : {(strike, expiry date) : vol}, grid points moved in place then one relink
+        for (strike, expiry_date), vol in changes.items():
+            i = int(np.flatnonzero(self.strikes == strike)[0])
+            j = self.expiry_dates.index(expiry_date)
+            self.vols[i, j] = vol
+        self.BUILD()
+
+    def SET_VOLS(self, vols):
+        # Whole grid moved at once (e.g. a new end-of-day snap)
+        self.vols[:] = vols
+        self.BUILD()
+
+    def PROCESS(self, underlying_handle, dividend_handle, riskfree_handle):
+        # One process shared by the whole chain
+        return ql.BlackScholesMertonProcess(underlying_handle, dividend_handle, riskfree_handle, self.handle)
+
+    def INDEX(self, strikes, times):
+        # Interpolation Index of a Chain : grid cells and weights, computed once per chain
+        strikes = np.clip(np.asarray(strikes, dtype=float), self.strikes[0], self.strikes[-1])
+        times = np.asarray(times, dtype=float)
+        last = self.times[-1]
+        clamped = np.minimum(times, last)
+
+        i = np.clip(np.searchsorted(self.strikes, strikes, side='right') - 1, 0, len(self.strikes) - 2)
+        j = np.clip(np.searchsorted(self.times, clamped, side='right') - 1, 0, len(self.times) - 2)
+        strike_weight = (strikes - self.strikes[i]) / (self.strikes[i + 1] - self.strikes[i])
+        time_weight = (clamped - self.times[j]) / (self.times[j + 1] - self.times[j])
+
+        # Beyond the last expiry the variance grows with time at the last volatility
+        scale = np.where(times > last, times / last, 1.0)
+
+        return i, j, strike_weight, time_weight, scale, times
+
+    def VARIANCES(self, index):
+        # Bilinear in (strike, time) on variances, as BlackVarianceSurface with constant strike extrapolation
+        i, j, strike_weight, time_weight, scale, _ = index
+        variances = np.concatenate([np.zeros((len(self.strikes), 1)), self.vols ** 2 * self.times[1:]], axis=1)
+
+        return scale * ((1 - strike_weight) * (1 - time_weight) * variances[i, j] +
+                        strike_weight * (1 - time_weight) * variances[i + 1, j] +
+                        (1 - strike_weight) * time_weight * variances[i, j + 1] +
+                        strike_weight * time_weight * variances[i + 1, j + 1])
+
+    def VOLS(self, index):
+        times = index[5]
+        with np.errstate(divide='ignore', invalid='ignore'):
+            return np.where(times > 0, np.sqrt(self.VARIANCES(index) / times), 0.0)
+
+# Surface Snapped from a (strike x expiry) Grid of Option Prices through the Batch Implied Vol Solver
+def IMPLIED_SURFACE(valuation_date, calendar, expiry_dates, strikes, prices, option_types, spot, rate, dividend,
+                    day_count=ql.ActualActual(ql.ActualActual.ISDA)):
+    times = YEAR_FRACTIONS(valuation_date, expiry_dates, day_count)
+    result = IMPLIED_VOL(prices, option_types, np.asarray(strikes, dtype=float)[:, None], times, spot, rate, dividend)
+
+    if (result['status'] != CONVERGED).any():
+        raise ValueError("implied vol failures on the surface grid : {}".format(FAILURES(result['status'])))
+
+    return VOL_SURFACE(valuation_date, calendar, expiry_dates, strikes, result['vol'], day_count)
+
+
+if __name__ == "__main__":
+
+    valuationDate = ql.Date(20, 11, 2020)
+    ql.Settings.instance().evaluationDate = valuationDate
+
+    calendar = ql.SouthKorea()
+    dayCount = ql.ActualActual(ql.ActualActual.ISDA)
+
+    # Market of European_Option.py
+    spot, dividend, riskfreerate = 270.48, 0.0, 0.01
+    underlying_qt = ql.SimpleQuote(spot)
+    u_qhd = ql.QuoteHandle(underlying_qt)
+    d_thd = ql.YieldTermStructureHandle(ql.FlatForward(valuationDate, dividend, dayCount))
+    r_thd = ql.YieldTermStructureHandle(ql.FlatForward(valuationDate, riskfreerate, dayCount))
+
+    # Smile Grid snapped from option prices
+    expiry_dates = [calendar.advance(valuationDate, ql.Period(months, ql.Months)) for months in (1, 2, 3, 6, 9, 12, 18, 24)]
+    strikes = np.linspace(200, 340, 15)
+    times = YEAR_FRACTIONS(valuationDate, expiry_dates, dayCount)
+    moneyness = np.log(strikes / spot)[:, None]
+    smile = 0.13 + 0.25 * moneyness ** 2 / np.sqrt(times) - 0.05 * moneyness
+    prices = BLACK_SCHOLES(ql.Option.Call, strikes[:, None], times, spot, smile, riskfreerate, dividend)['npv']
+    surface = IMPLIED_SURFACE(valuationDate, calendar, expiry_dates, strikes, prices, ql.Option.Call,
+                              spot, riskfreerate, dividend, dayCount)
+
+    # Chain on one Shared Process
+    rng = np.random.default_rng(0)
+    size = 2000
+    option_types = rng.choice([ql.Option.Call, ql.Option.Put], size)
+    chain_strikes = rng.uniform(180, 360, size)
+    chain_dates = [valuationDate + int(days) for days in rng.integers(1, 1000, size)]
+    chain_times = YEAR_FRACTIONS(valuationDate, chain_dates, dayCount)
+
+    engine = ql.AnalyticEuropeanEngine(surface.PROCESS(u_qhd, d_thd, r_thd))
+    options = []
+    for option_type, strike, expiry_date in zip(option_types, chain_strikes, chain_dates):
+        option = ql.VanillaOption(ql.PlainVanillaPayoff(int(option_type), strike), ql.EuropeanExercise(expiry_date))
+        option.setPricingEngine(engine)
+        options.append(option)
+
+    # Interpolation index is computed once, the vectorised chain is repriced from it after every move
+    index = surface.INDEX(chain_strikes, chain_times)
+
+    def COMPARE():
+        start = time.time()
+        npv = np.array([option.NPV() for option in options])
+        quantlib_time = time.time() - start
+
+        start = time.time()
+        vectorised = BLACK_SCHOLES(option_types, chain_strikes, chain_times, spot, surface.VOLS(index),
+                                   riskfreerate, dividend)['npv']
+        vectorised_time = time.time() - start
+
+        print('Max Abs Difference = {:.3e} (QuantLib {:.3f}s, vectorised {:.4f}s)'.format(
+            np.abs(npv - vectorised).max(), quantlib_time, vectorised_time))
+        return npv
+
+    npv_t0 = COMPARE()
+
+    # Market Move : one surface point and a whole-grid shift, no option or process rebuilt
+    surface.UPDATE({(strikes[7], expiry_dates[3]): surface.vols[7, 3] + 0.02})
+    npv_t1 = COMPARE()
+    print('Options repriced by the point move = {}'.format(int((np.abs(npv_t1 - npv_t0) > 1e-12).sum())))
+
+    surface.SET_VOLS(surface.vols + 0.01)
+    COMPARE()
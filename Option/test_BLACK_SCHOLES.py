@@ -0,0 +1,39 @@
+import numpy as np
+import pytest
+import QuantLib as ql
+
+from BLACK_SCHOLES import BLACK_SCHOLES
+
+VALUATION_DATE = ql.Date(20, 11, 2020)
+EXPIRY_DATE = ql.Date(22, 11, 2021)
+SPOT = 270.48
+
+# AnalyticEuropeanEngine NPV on the European_Option.py Quote / Term-Structure setup (its greeks are NaN at zero vol)
+def ENGINE_NPV(option_type, strike, vol, rate, dividend):
+    ql.Settings.instance().evaluationDate = VALUATION_DATE
+    day_count = ql.ActualActual(ql.ActualActual.ISDA)
+    process = ql.BlackScholesMertonProcess(ql.QuoteHandle(ql.SimpleQuote(SPOT)),
+                                           ql.YieldTermStructureHandle(ql.FlatForward(VALUATION_DATE, dividend, day_count)),
+                                           ql.YieldTermStructureHandle(ql.FlatForward(VALUATION_DATE, rate, day_count)),
+                                           ql.BlackVolTermStructureHandle(ql.BlackConstantVol(VALUATION_DATE, ql.SouthKorea(),
+                                                                                              vol, day_count)))
+    option = ql.VanillaOption(ql.PlainVanillaPayoff(option_type, strike), ql.EuropeanExercise(EXPIRY_DATE))
+    option.setPricingEngine(ql.AnalyticEuropeanEngine(process))
+
+    return day_count.yearFraction(VALUATION_DATE, EXPIRY_DATE), option.NPV()
+
+# Zero Vol : discounted intrinsic value, on and off the forward (no NaN at the money)
+@pytest.mark.parametrize('option_type', [ql.Option.Call, ql.Option.Put])
+@pytest.mark.parametrize('strike', [250.0, SPOT, 290.0])
+@pytest.mark.parametrize('rate, dividend', [(0.0, 0.0), (0.01, 0.0), (0.01, 0.03)])
+def test_zero_vol(option_type, strike, rate, dividend):
+    time, npv = ENGINE_NPV(option_type, strike, 0.0, rate, dividend)
+    results = BLACK_SCHOLES(option_type, strike, time, SPOT, 0.0, rate, dividend)
+    limits = BLACK_SCHOLES(option_type, strike, time, SPOT, 1e-8, rate, dividend)
+
+    for name, value in results.items():
+        assert not np.isnan(value), name
+    assert results['npv'] == pytest.approx(npv, abs=1e-10)
+    for name in ('delta', 'theta', 'rho'):
+        assert results[name] == pytest.approx(limits[name], abs=1e-6), name
+    assert results['gamma'] == 0.0 and results['vega'] == 0.0
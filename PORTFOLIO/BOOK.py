@@ -0,0 +1,184 @@
+import os
+import time
+import datetime
+from types import SimpleNamespace
+import numpy as np
+import pandas as pd
+import QuantLib as ql
+from PRICING_CONTEXT import PRICING_CONTEXT
+
+# Trade File Columns (one row per trade, unused fields left empty)
+#  trade_id, type ('IRS', 'FRA', 'CCS', 'FXF', 'CDS'), date, effective_date, maturity_date,
+#  rate (IRS / FRA / CCS fixed rate, CDS spread in bp), notional (USD notional for CCS / FXF), position,
+#  spread (IRS float spread), fx_spot, fx_forward, ticker (CDS reference name)
+#  position : 'Payer' / 'Receiver' for IRS, 'Long' / 'Short' otherwise
+DATE_COLUMNS = ('date', 'effective_date', 'maturity_date')
+
+# Instrument Class per Trade Type (CCS / FXF need QuantExt, imported only for books holding them)
+def TRADE_CLASS(trade_type):
+    if trade_type == 'IRS':
+        from IRS import IRS
+        return IRS
+    if trade_type == 'FRA':
+        from FRA import FRA
+        return FRA
+    if trade_type == 'CCS':
+        from CCS import CCS
+        return CCS
+    if trade_type == 'FXF':
+        from FXF import FXF
+        return FXF
+    if trade_type == 'CDS':
+        from CDS import CDS
+        return CDS
+
+    raise ValueError("unknown trade type {}".format(trade_type))
+
+# Constructor Arguments of a Trade Row
+def TRADE_ARGS(trade):
+    trade_type = trade['type']
+
+    if trade_type == 'IRS':
+        position = ql.VanillaSwap.Payer if trade['position'] == 'Payer' else ql.VanillaSwap.Receiver
+        spread = 0.0 if pd.isna(trade.get('spread', np.nan)) else trade['spread']
+        return (trade['date'], trade['effective_date'], trade['maturity_date'], trade['rate'], trade['notional'], position, spread)
+    if trade_type == 'FRA':
+        return (trade['date'], trade['effective_date'], trade['maturity_date'], trade['position'], trade['rate'], trade['notional'])
+    if trade_type == 'CCS':
+        return (trade['date'], trade['effective_date'], trade['maturity_date'], trade['rate'], trade['fx_spot'], trade['notional'], trade['position'])
+    if trade_type == 'FXF':
+        return (trade['date'], trade['maturity_date'], trade['fx_spot'], trade['fx_forward'], trade['notional'], trade['position'])
+    if trade_type == 'CDS':
+        return (trade['date'], trade['maturity_date'], trade['rate'], trade['notional'], trade['position'], trade['ticker'])
+
+    raise ValueError("unknown trade type {}".format(trade_type))
+
+# Trades sharing Curves, Handles and an Engine : same type and date (same spot for FX, same name for CDS)
+def GROUP_KEY(trade):
+    if trade['type'] in ('CCS', 'FXF'):
+        return trade['type'], trade['date'], trade['fx_spot']
+    if trade['type'] == 'CDS':
+        return trade['type'], trade['date'], trade['ticker']
+    return trade['type'], trade['date']
+
+# Read a Trade File (CSV or Parquet)
+def READ_BOOK(path):
+    if os.path.splitext(path)[1] == '.parquet':
+        book = pd.read_parquet(path)
+    else:
+        book = pd.read_csv(path)
+
+    for column in DATE_COLUMNS:
+        if column in book:
+            book[column] = pd.to_datetime(book[column]).dt.date
+
+    return book.set_index('trade_id')
+
+# Trade Rows as Constructor Arguments, grouped by the market they price on (file order within a group)
+def GROUPS(book):
+    return GROUP_ROWS(book.to_dict('index'))
+
+def GROUP_ROWS(rows):
+    # rows : {trade id : {column : value}}, as read from a trade file or sent as JSON
+    groups = {}
+    for trade_id, trade in rows.items():
+        groups.setdefault(GROUP_KEY(trade), []).append((trade_id, TRADE_ARGS(trade)))
+
+    return groups
+
+# Build one Group : the first trade builds the market (curves, handles, engine) unless one is given
+def BUILD_GROUP(trade_type, group, market=None):
+    # group : [(trade id, constructor arguments)]
+    cls = TRADE_CLASS(trade_type)
+    trades = {}
+    for trade_id, args in group:
+        trades[trade_id] = cls(*args, market=market)
+        if market is None:
+            market = SimpleNamespace(**{name: getattr(trades[trade_id], name) for name in cls.SHARED})
+
+    return trades, market
+
+# Result Names a Trade Type computes : an unknown name is an error, never a column of NaN
+def CHECK_RESULTS(trade_type, results):
+    available = TRADE_CLASS(trade_type).RESULTS
+    unknown = [name for name in results if name not in available]
+    if unknown:
+        raise ValueError("{} has no result {} (available : {})".format(trade_type, ', '.join(unknown), ', '.join(available)))
+
+# Results of one Group, valued in a context on the group's date (groups of other dates may have moved it)
+def GROUP_RESULTS(trades, date, results=('npv',)):
+    if trades:
+        CHECK_RESULTS(type(next(iter(trades.values()))).__name__, results)
+
+    # Errors raised while computing a result propagate
+    with PRICING_CONTEXT(date):
+        return [{name: getattr(trade, name) for name in results} for trade in trades.values()]
+
+# Build every Trade of a Book, one market per group
+def BUILD_BOOK(book):
+    trades = {}
+    for key, group in GROUPS(book).items():
+        trades.update(BUILD_GROUP(key[0], group)[0])
+
+    return trades
+
+# Price a Book Group by Group
+def PRICE_BOOK(book, results=('npv',)):
+    # book : trade file path or DataFrame from READ_BOOK, results : result names every trade type in the book computes
+    if isinstance(book, str):
+        book = READ_BOOK(book)
+    for trade_type in book['type'].unique():
+        CHECK_RESULTS(trade_type, results)
+
+    build_seconds = pricing_seconds = 0.0
+    trade_ids, rows = [], []
+    for key, group in GROUPS(book).items():
+        start = time.time()
+        trades, _ = BUILD_GROUP(key[0], group)
+        built = time.time()
+        rows += GROUP_RESULTS(trades, key[1], results)
+        trade_ids += list(trades)
+        build_seconds += built - start
+        pricing_seconds += time.time() - built
+
+    # Back in trade file order
+    table = pd.DataFrame(rows, index=pd.Index(trade_ids, name=book.index.name)).loc[book.index]
+    table.insert(0, 'type', book['type'])
+    table.attrs = {'build_seconds': build_seconds,
+                   'pricing_seconds': pricing_seconds,
+                   'trades_per_sec': len(table) / max(build_seconds + pricing_seconds, 1e-12)}
+
+    return table
+
+if __name__ == "__main__":
+
+    # Today's Date
+    todays_date = datetime.date(2020, 10, 9)
+
+    # Sample Trade File : USD swaps and FRAs on today's curve
+    rng = np.random.default_rng(0)
+    size = 2000
+    effective_date = datetime.date(2020, 10, 19)
+    years = rng.integers(1, 11, size)
+    fra_months = rng.integers(1, 4, size)
+    is_irs = rng.random(size) < 0.7
+
+    book = pd.DataFrame({'trade_id': ['T{:05d}'.format(i) for i in range(size)],
+                         'type': np.where(is_irs, 'IRS', 'FRA'),
+                         'date': todays_date,
+                         'effective_date': effective_date,
+                         'maturity_date': [datetime.date(2020 + int(year), 10, 19) if irs else
+                                           (pd.Timestamp(effective_date) + pd.DateOffset(months=3 * int(months))).date()
+                                           for irs, year, months in zip(is_irs, years, fra_months)],
+                         'rate': np.round(rng.uniform(0.001, 0.01, size), 5),
+                         'notional': rng.choice([1000000, 5000000, 10000000], size),
+                         'position': np.where(is_irs, rng.choice(['Payer', 'Receiver'], size), rng.choice(['Long', 'Short'], size)),
+                         'spread': 0.0})
+    book.to_csv(r'./BOOK.csv', index=False)
+
+    # Load and Price
+    table = PRICE_BOOK(r'./BOOK.csv')
+    print(table.groupby('type')['npv'].agg(['count', 'sum']))
+    print("Build {:.2f}s, Pricing {:.2f}s, {:.0f} trades/sec".format(table.attrs['build_seconds'],
+                                                                      table.attrs['pricing_seconds'],
+                                                                      table.attrs['trades_per_sec']))
@@ -0,0 +1,126 @@
+import os
+import time
+import datetime
+import importlib
+import multiprocessing
+import numpy as np
+import pandas as pd
+from QUOTE_SOURCE import FRAME_SOURCE, SET_QUOTE_SOURCES
+from BOOK import READ_BOOK, GROUPS, BUILD_GROUP, GROUP_RESULTS, CHECK_RESULTS
+
+# Quotes each Trade Type prices on : (curve module, ticker), None stands for the trade's own ticker
+QUOTES_NEEDED = {'IRS': [('SWAP_CURVE', 'USD')],
+                 'FRA': [('SWAP_CURVE', 'USD')],
+                 'CCS': [('FX_CURVE', 'USD'), ('FX_CURVE', 'KRW')],
+                 'FXF': [('FX_CURVE', 'USD'), ('FX_CURVE', 'KRW')],
+                 'CDS': [('CDS_CURVE', 'USD'), ('CDS_CURVE', None)]}
+
+# Group markets built by each Worker Process, kept across batches
+MARKETS = {}
+RESULTS = ('npv',)
+
+# Market Snapshot of a Book : every quote it needs, read once from the current sources
+def MARKET_SNAPSHOT(book, days=0):
+    # days : extra calendar days of quotes after each valuation date (1 for theta)
+    snapshot = {}
+    for (trade_type, date, ticker) in book[['type', 'date']].assign(ticker=book.get('ticker')).drop_duplicates().itertuples(index=False):
+        for name, quote_ticker in QUOTES_NEEDED[trade_type]:
+            module = importlib.import_module(name)
+            source = snapshot.setdefault(name, FRAME_SOURCE())
+            quote_ticker = quote_ticker or ticker
+
+            for day in range(days + 1):
+                today = date + datetime.timedelta(days=day)
+                if (today, quote_ticker) in source.tables:
+                    continue
+                try:
+                    quote = module.QUOTE_SOURCE.READ(today, quote_ticker)
+                except (OSError, KeyError) as error:
+                    if day == 0:
+                        raise
+                    # Missing here, theta would fail in a worker and abort every batch
+                    raise KeyError("no {} quotes on {} for theta of the {} trades dated {}".format(
+                        quote_ticker, today, trade_type, date)) from error
+                source.WRITE(today, quote_ticker, quote)
+
+    return snapshot
+
+# Deterministic Batches : groups in book order, cut into contiguous runs of batch_size trades
+def BATCHES(book, batch_size=500):
+    batches, batch, size = [], [], 0
+    for key, group in GROUPS(book).items():
+        while group:
+            take = group[:batch_size - size]
+            batch.append((key, take))
+            size += len(take)
+            group = group[len(take):]
+            if size == batch_size:
+                batches.append(batch)
+                batch, size = [], 0
+    if batch:
+        batches.append(batch)
+
+    return batches
+
+# Worker Start-up : quotes from the snapshot, curves are rebuilt locally on first use
+def INIT_WORKER(snapshot, results):
+    global RESULTS
+    SET_QUOTE_SOURCES(snapshot)
+    MARKETS.clear()
+    RESULTS = results
+
+# Price one Batch : [(group key, [(trade id, constructor arguments)])] -> (trade ids, result rows)
+def PRICE_BATCH(batch):
+    trade_ids, rows = [], []
+    for key, group in batch:
+        trades, MARKETS[key] = BUILD_GROUP(key[0], group, MARKETS.get(key))
+        rows += GROUP_RESULTS(trades, key[1], RESULTS)
+        trade_ids += list(trades)
+
+    return trade_ids, rows
+
+# Stream Results Batch by Batch (in batch order) from a Process Pool
+def EXECUTE(book, results=('npv',), processes=None, batch_size=500, snapshot=None):
+    # book : trade file path or DataFrame from READ_BOOK
+    if isinstance(book, str):
+        book = READ_BOOK(book)
+    for trade_type in book['type'].unique():
+        CHECK_RESULTS(trade_type, results)
+    if snapshot is None:
+        snapshot = MARKET_SNAPSHOT(book, days=1 if 'theta' in results else 0)
+
+    batches = BATCHES(book, batch_size)
+    with multiprocessing.Pool(processes, initializer=INIT_WORKER, initargs=(snapshot, tuple(results))) as pool:
+        for trade_ids, rows in pool.imap(PRICE_BATCH, batches):
+            yield pd.DataFrame(rows, index=pd.Index(trade_ids, name=book.index.name))
+
+# Price a Book over a Process Pool
+def PRICE_PARALLEL(book, results=('npv',), processes=None, batch_size=500):
+    if isinstance(book, str):
+        book = READ_BOOK(book)
+
+    start = time.time()
+    snapshot = MARKET_SNAPSHOT(book, days=1 if 'theta' in results else 0)
+    table = pd.concat(list(EXECUTE(book, results, processes, batch_size, snapshot))).loc[book.index]
+    seconds = time.time() - start
+
+    table.insert(0, 'type', book['type'])
+    table.attrs = {'seconds': seconds, 'trades_per_sec': len(table) / max(seconds, 1e-12)}
+
+    return table
+
+
+if __name__ == "__main__":
+    from BOOK import PRICE_BOOK
+
+    # Trade File written by BOOK.py
+    book = READ_BOOK(r'./BOOK.csv')
+    book = pd.concat([book.rename(index=lambda trade_id: '{}-{}'.format(trade_id, i)) for i in range(10)])
+
+    table = PRICE_BOOK(book)
+    print("1 Process : {:.0f} trades/sec".format(table.attrs['trades_per_sec']))
+
+    for processes in sorted({2, 4, os.cpu_count()}):
+        parallel = PRICE_PARALLEL(book, processes=processes)
+        print("{} Processes : {:.0f} trades/sec, max difference {:.2e}".format(
+            processes, parallel.attrs['trades_per_sec'], np.abs(parallel['npv'] - table['npv']).max()))
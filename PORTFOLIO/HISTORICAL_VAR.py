@@ -0,0 +1,87 @@
+import datetime
+import pandas as pd
+from Analytics import Tail
+from SCENARIO import MARKET, QUOTE_MOVES, SCENARIO_PNL, SCENARIO_STREAM
+
+# History Format : {curve name : function(date) -> quote frame, 'FX' : spot series indexed by date}
+#  curve name : registry name of the curve ('USDIRS', 'KRWCCS', 'CDS'), as in SCENARIO
+#  Each day's move (quotes at t1 less quotes at t0) is replayed on today's curves
+
+# Day-over-day Historical Scenarios, generated lazily (only the previous day's quotes are held)
+def HISTORICAL_SCENARIOS(market, history, dates):
+    names = [name for name in history if name != 'FX']
+    for name in names:
+        if name not in market:
+            raise ValueError("{} has no curve in the portfolio".format(name))
+
+    fx_spots = history.get('FX')
+    previous = None
+
+    for today in dates:
+        try:
+            quotes = {name: history[name](today) for name in names}
+            fx_spot = None if fx_spots is None else fx_spots[pd.Timestamp(today)]
+        # Missing quotes (holidays) : the next move runs from the last available date
+        except (OSError, KeyError):
+            continue
+
+        if previous is not None:
+            quotes_t0, fx_spot_t0 = previous
+            # A curve name shared by several curves (CDS tickers) moves them all with its history
+            scenario = {name: QUOTE_MOVES(market[name][0], quotes_t0[name], quotes[name]) for name in names}
+            if fx_spot is not None:
+                scenario['FX'] = fx_spot / fx_spot_t0 - 1
+            yield today, scenario
+
+        previous = quotes, fx_spot
+
+# Full-revaluation P&L per Historical Day
+def HISTORICAL_PNL(portfolio, history, dates, processes=None, stream=False, chunksize=16):
+    # stream=False : (day x trade) P&L frame, stream=True : book P&L series only
+    # Pooled runs match processes=1 to POOL_TOLERANCE of notional (see SCENARIO), not bit for bit
+    scenarios = HISTORICAL_SCENARIOS(MARKET(portfolio), history, dates)
+
+    if not stream:
+        return SCENARIO_PNL(portfolio, dict(scenarios), processes)
+
+    pnl = {}
+    for names, values in SCENARIO_STREAM(portfolio, scenarios, processes, chunksize):
+        pnl.update(zip(names, values.sum(axis=1)))
+
+    return pd.Series(pnl, name='pnl')
+
+# Tail Risk of a Book P&L Series
+def VAR_REPORT(pnl, capital, percentile=99):
+    # capital : book capital turning the P&L into returns for the drawdown
+    if isinstance(pnl, pd.DataFrame):
+        pnl = pnl.sum(axis=1)
+
+    tail = Tail()
+    result = {"{}% VaR".format(percentile): tail.VaR(pnl, percentile),
+              "{}% CVaR".format(percentile): tail.CVaR(pnl, percentile),
+              "Maximum Drawdown": tail.maximum_drawdown(pnl / capital)}
+
+    return pd.Series(result)
+
+
+if __name__ == "__main__":
+    import QuantLib as ql
+    from SWAP_CURVE import GET_QUOTE
+    from IRS import IRS
+
+    # Today's Date
+    todays_date = datetime.date(2020, 10, 9)
+
+    # Book
+    portfolio = {'IRS 2Y Payer': IRS(todays_date, datetime.date(2020, 10, 19), datetime.date(2022, 10, 19),
+                                     0.00218, 10000000, ql.VanillaSwap.Payer),
+                 'IRS 10Y Receiver': IRS(todays_date, datetime.date(2020, 10, 19), datetime.date(2030, 10, 19),
+                                         0.0068, 10000000, ql.VanillaSwap.Receiver)}
+
+    # One Year of Daily USD Swap Quote Moves
+    dates = [date.date() for date in pd.bdate_range(todays_date - datetime.timedelta(days=365), todays_date)]
+    history = {'USDIRS': GET_QUOTE}
+
+    pnl = HISTORICAL_PNL(portfolio, history, dates, stream=True)
+    print(pnl.describe())
+    print(VAR_REPORT(pnl, capital=20000000))
@@ -0,0 +1,152 @@
+import json
+import time
+import asyncio
+import datetime
+import numpy as np
+import pandas as pd
+from BOOK import READ_BOOK
+from PRICING_SERVICE import READ_MESSAGE, WRITE_MESSAGE, PERCENTILES
+
+# Book (READ_BOOK) -> JSON Trade Rows : dates as ISO strings, empty fields left out
+def TRADE_RECORDS(book):
+    records = []
+    for trade_id, trade in book.to_dict('index').items():
+        record = {'trade_id': trade_id.item() if isinstance(trade_id, np.generic) else trade_id}
+        for name, value in trade.items():
+            if not isinstance(value, str) and pd.isna(value):
+                continue
+            if isinstance(value, datetime.date):
+                value = value.isoformat()
+            elif isinstance(value, np.generic):
+                value = value.item()
+            record[name] = value
+        records.append(record)
+
+    return records
+
+# Client of a PRICING_SERVICE over one keep-alive connection
+class PRICING_CLIENT():
+    def __init__(self, host='127.0.0.1', port=8765, path=None):
+        # path : Unix socket path of the service, used instead of host / port when given
+        self.host = host
+        self.port = port
+        self.path = path
+        self.reader = self.writer = None
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.CLOSE()
+
+    async def OPEN(self):
+        if self.path is not None:
+            self.reader, self.writer = await asyncio.open_unix_connection(self.path)
+        else:
+            self.reader, self.writer = await asyncio.open_connection(self.host, self.port)
+
+    async def CLOSE(self):
+        if self.writer is not None:
+            self.writer.close()
+            await self.writer.wait_closed()
+            self.reader = self.writer = None
+
+    async def REQUEST(self, method, target, payload=None):
+        # -> (status, JSON body)
+        if self.writer is None:
+            await self.OPEN()
+
+        WRITE_MESSAGE(self.writer, '{} {} HTTP/1.1'.format(method, target), payload)
+        await self.writer.drain()
+        message = await READ_MESSAGE(self.reader)
+        if message is None:
+            raise ConnectionError("pricing service closed the connection")
+
+        start, _, body = message
+        return int(start.split()[1]), json.loads(body)
+
+    async def PRICE(self, book, results=('npv',)):
+        # book : DataFrame from READ_BOOK -> result table (an 'error' column lists trades that failed)
+        status, body = await self.REQUEST('POST', '/price', {'trades': TRADE_RECORDS(book), 'results': list(results)})
+        if status not in (200, 422):
+            raise RuntimeError("pricing service returned {} : {}".format(status, body.get('error')))
+
+        table = pd.DataFrame.from_dict(body['results'], orient='index', columns=list(results))
+        if body['errors']:
+            table = table.reindex(list(body['results']) + list(body['errors']))
+            table['error'] = pd.Series(body['errors'])
+
+        # Back in book order (JSON keys are strings)
+        table.index = table.index.map(dict((str(trade_id), trade_id) for trade_id in book.index))
+        return table.reindex(book.index).rename_axis(book.index.name)
+
+    async def STATS(self):
+        return (await self.REQUEST('GET', '/stats'))[1]
+
+    async def RELOAD(self):
+        return (await self.REQUEST('POST', '/reload'))[1]
+
+# Price a Book on a Running Service (blocking, for scripts and notebooks)
+def PRICE_REMOTE(book, results=('npv',), **address):
+    if isinstance(book, str):
+        book = READ_BOOK(book)
+
+    async def RUN():
+        async with PRICING_CLIENT(**address) as client:
+            return await client.PRICE(book, results)
+
+    return asyncio.run(RUN())
+
+# Load Test : concurrent clients, each sending requests of consecutive trades from the book
+async def LOAD(book, clients, requests, trades_per_request, results, seed, address):
+    records = TRADE_RECORDS(book)
+    size = min(trades_per_request, len(records))
+
+    async def CLIENT(k):
+        rng = np.random.default_rng(seed + k)
+        latencies = []
+        async with PRICING_CLIENT(**address) as client:
+            for _ in range(requests):
+                first = int(rng.integers(0, len(records) - size + 1))
+                payload = {'trades': records[first:first + size], 'results': list(results)}
+                start = time.perf_counter()
+                status, body = await client.REQUEST('POST', '/price', payload)
+                latencies.append(time.perf_counter() - start)
+                if status != 200:
+                    raise RuntimeError("pricing service returned {} : {}".format(status, body))
+        return latencies
+
+    start = time.perf_counter()
+    latencies = sum(await asyncio.gather(*[CLIENT(k) for k in range(clients)]), [])
+    seconds = time.perf_counter() - start
+
+    async with PRICING_CLIENT(**address) as client:
+        server = await client.STATS()
+
+    return {'requests': len(latencies),
+            'seconds': seconds,
+            'requests_per_sec': len(latencies) / seconds,
+            'trades_per_sec': len(latencies) * size / seconds,
+            'latency_ms': PERCENTILES(latencies),
+            'server': server}
+
+def LOAD_TEST(book, clients=32, requests=20, trades_per_request=5, results=('npv',), seed=0, **address):
+    if isinstance(book, str):
+        book = READ_BOOK(book)
+
+    return asyncio.run(LOAD(book, clients, requests, trades_per_request, results, seed, address))
+
+
+if __name__ == "__main__":
+
+    # Service started by PRICING_SERVICE.py, with BOOK.py's trade file warm
+    book = READ_BOOK(r'./BOOK.csv')
+
+    table = PRICE_REMOTE(book.iloc[:5])
+    print(table)
+
+    for clients in (1, 8, 32):
+        report = LOAD_TEST(book, clients=clients)
+        latency, server = report['latency_ms'], report['server']
+        print("{:>2} Clients : {:.0f} requests/sec, p50 {:.1f}ms, p99 {:.1f}ms, {:.1f} requests per pricing pass".format(
+            clients, report['requests_per_sec'], latency['p50'], latency['p99'], server['requests_per_pass']))
@@ -0,0 +1,319 @@
+import json
+import time
+import asyncio
+import numbers
+import datetime
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import QuantLib as ql
+from PRICING_CONTEXT import PRICING_CONTEXT, QL_DATE, SET_EVALUATION_DATE
+from QUOTE_SOURCE import COLUMNAR_SOURCE, CURVE_MODULES, SET_QUOTE_SOURCES
+from CACHE import QUOTES, LRU_CACHE
+from CURVE_REGISTRY import REGISTRY
+from BOOK import DATE_COLUMNS, READ_BOOK, GROUPS, GROUP_ROWS, BUILD_GROUP, GROUP_RESULTS, CHECK_RESULTS
+
+# Endpoints (JSON bodies, HTTP/1.1 keep-alive, over TCP or a Unix socket)
+#  POST /price  : {'trades' : [trade rows with the trade file columns of BOOK], 'results' : ['npv', ...]}
+#                 -> {'results' : {trade_id : {name : value}}, 'errors' : {trade_id : message}}
+#  GET  /stats  : request / pricing pass latency percentiles, batch sizes, resident markets, date moves, curve re-bootstraps
+#  POST /reload : drop resident markets, curves and quotes (after new quotes are published)
+REASONS = {200: 'OK', 400: 'Bad Request', 404: 'Not Found', 422: 'Unprocessable Entity', 500: 'Internal Server Error'}
+
+# HTTP Message : (start line, headers, body), None once the peer has closed the connection
+async def READ_MESSAGE(reader):
+    start = await reader.readline()
+    if not start:
+        return None
+
+    headers = {}
+    while True:
+        line = await reader.readline()
+        if line in (b'\r\n', b'\n', b''):
+            break
+        name, _, value = line.decode('latin-1').partition(':')
+        headers[name.strip().lower()] = value.strip()
+
+    body = await reader.readexactly(int(headers.get('content-length', 0)))
+
+    return start.decode('latin-1').strip(), headers, body
+
+def WRITE_MESSAGE(writer, start, payload=None, keep_alive=True):
+    body = b'' if payload is None else json.dumps(payload).encode()
+    head = [start,
+            'Content-Type: application/json',
+            'Content-Length: {}'.format(len(body)),
+            'Connection: {}'.format('keep-alive' if keep_alive else 'close')]
+    writer.write(('\r\n'.join(head) + '\r\n\r\n').encode('latin-1') + body)
+
+# Latency Percentiles in Milliseconds
+def PERCENTILES(seconds):
+    seconds = np.asarray(seconds, dtype=float)
+    if len(seconds) == 0:
+        return {'count': 0}
+
+    p50, p90, p99 = np.percentile(seconds, [50, 90, 99]) * 1000
+    return {'count': len(seconds), 'p50': float(p50), 'p90': float(p90), 'p99': float(p99), 'max': float(seconds.max() * 1000)}
+
+# Result Value as JSON (NaN -> null, arrays / frames as lists / dicts)
+def JSON_VALUE(value):
+    if isinstance(value, numbers.Number):
+        value = float(value)
+        return None if np.isnan(value) else value
+    if isinstance(value, (pd.Series, pd.DataFrame)):
+        return json.loads(value.to_json())
+    if isinstance(value, np.ndarray):
+        return value.tolist()
+
+    return str(value)
+
+# Request Body -> (groups of BOOK, trade ids in request order, result names)
+def PARSE(body):
+    # Rows are grouped as they come, a DataFrame per request would cost more than pricing a few trades
+    payload = json.loads(body)
+    rows = {}
+    for trade in payload['trades']:
+        trade = dict(trade)
+        trade_id = trade.pop('trade_id')
+        if trade_id in rows:
+            raise ValueError("duplicate trade_id {} in request".format(trade_id))
+        for column in DATE_COLUMNS:
+            if column in trade:
+                trade[column] = datetime.date.fromisoformat(trade[column])
+        rows[trade_id] = trade
+
+    results = payload.get('results', ['npv'])
+    if isinstance(results, str) or not all(isinstance(name, str) for name in results):
+        raise ValueError("results must be a list of result names")
+
+    groups = GROUP_ROWS(rows)
+    for trade_type in {key[0] for key in groups}:
+        CHECK_RESULTS(trade_type, results)
+
+    return groups, list(rows), tuple(results)
+
+# Long-lived Pricing Service : markets stay resident, concurrent requests share pricing passes
+class PRICING_SERVICE():
+    def __init__(self, window=0.002, max_batch=5000, history=10000, max_markets=64):
+        # window : seconds a pass waits for more requests, max_batch : trades per pass
+        self.window = window
+        self.max_batch = max_batch
+
+        # Group markets (curves, handles, engines) kept between requests, keyed as in BOOK.GROUP_KEY : least recently
+        # used ones are dropped past max_markets (CCS / FXF keys include the spot, so new keys keep arriving)
+        self.markets = LRU_CACHE(max_markets)
+
+        # One pricing thread : QuantLib state is process-wide, the event loop only does I/O
+        self.executor = ThreadPoolExecutor(1)
+        self.queue = None
+
+        self.latencies = deque(maxlen=history)
+        self.passes = deque(maxlen=history)
+        self.requests = 0
+        self.trades = 0
+        self.date_moves = 0
+
+    def PRICE(self, requests):
+        # requests : [(groups of one request, result names)] -> ({(request, trade id) : row}, {(request, trade id) : message})
+        merged, names = {}, {}
+        for i, (groups, results) in enumerate(requests):
+            for key, group in groups.items():
+                merged.setdefault(key, []).extend(((i, trade_id), args) for trade_id, args in group)
+                # Each group computes the results its own requests asked for
+                names.setdefault(key, {}).update(dict.fromkeys(results))
+
+        if not merged:
+            return {}, {}
+
+        dates = {}
+        for key in merged:
+            dates.setdefault(key[1], []).append(key)
+
+        # Every evaluation date move invalidates the resident curves, so groups are priced date by date, starting on
+        # the process's evaluation date when the pass has trades on it. The pass runs in a context, which sets the
+        # date back on exit : a book on the process's date moves nothing, any other date is moved to and back once
+        current = ql.Settings.instance().evaluationDate
+        ordered = sorted(dates, key=lambda date: QL_DATE(date) != current)
+
+        rows, errors = {}, {}
+        with PRICING_CONTEXT(ordered[0]):
+            for date in ordered:
+                SET_EVALUATION_DATE(date)
+                for key in dates[date]:
+                    group = merged[key]
+                    # A failing group only fails its own trades
+                    try:
+                        trades, market = BUILD_GROUP(key[0], group, self.markets.LOOKUP(key))
+                        self.markets.PUT(key, market)
+                        rows.update(zip(trades, GROUP_RESULTS(trades, key[1], tuple(names[key]))))
+                    except Exception as error:
+                        for trade_id, _ in group:
+                            errors[trade_id] = '{}: {}'.format(type(error).__name__, error)
+
+        path = [current] + [QL_DATE(date) for date in ordered] + [current]
+        self.date_moves += sum(a != b for a, b in zip(path, path[1:]))
+
+        return rows, errors
+
+    def WARM(self, book, results=('npv',)):
+        # book : trade file path or DataFrame, priced once so its markets are resident before serving
+        if isinstance(book, str):
+            book = READ_BOOK(book)
+
+        return self.PRICE([(GROUPS(book), results)])
+
+    def RELOAD(self):
+        self.markets.INVALIDATE()
+        REGISTRY.INVALIDATE_CURVE()
+        QUOTES.INVALIDATE()
+
+    async def SUBMIT(self, groups, trade_ids, results):
+        future = asyncio.get_running_loop().create_future()
+        await self.queue.put((groups, trade_ids, results, future))
+
+        return await future
+
+    async def BATCHER(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self.queue.get()]
+            size = len(batch[0][1])
+
+            # Requests queued during the previous pass, or arriving within the window, share this pass
+            deadline = loop.time() + self.window
+            while size < self.max_batch:
+                try:
+                    item = self.queue.get_nowait()
+                except asyncio.QueueEmpty:
+                    remaining = deadline - loop.time()
+                    if remaining <= 0:
+                        break
+                    try:
+                        item = await asyncio.wait_for(self.queue.get(), remaining)
+                    except asyncio.TimeoutError:
+                        break
+                batch.append(item)
+                size += len(item[1])
+
+            start = time.perf_counter()
+            try:
+                rows, errors = await loop.run_in_executor(self.executor, self.PRICE, [(item[0], item[2]) for item in batch])
+            except Exception as error:
+                for item in batch:
+                    if not item[3].done():
+                        item[3].set_exception(error)
+                continue
+            self.passes.append((time.perf_counter() - start, len(batch), size))
+
+            for i, (_, trade_ids, names, future) in enumerate(batch):
+                if future.done():
+                    continue
+                future.set_result(({trade_id: {name: JSON_VALUE(rows[(i, trade_id)][name]) for name in names}
+                                    for trade_id in trade_ids if (i, trade_id) in rows},
+                                   {trade_id: errors[(i, trade_id)] for trade_id in trade_ids if (i, trade_id) in errors}))
+
+    async def ROUTE(self, method, target, body):
+        loop = asyncio.get_running_loop()
+
+        if (method, target) == ('POST', '/price'):
+            # Parsing is offloaded too, large payloads would otherwise stall every connection
+            try:
+                groups, trade_ids, results = await loop.run_in_executor(None, PARSE, body)
+            except (ValueError, KeyError, TypeError) as error:
+                return 400, {'error': '{}: {}'.format(type(error).__name__, error)}
+
+            rows, errors = await self.SUBMIT(groups, trade_ids, results)
+            self.requests += 1
+            self.trades += len(trade_ids)
+
+            return (422 if errors else 200), {'results': {str(trade_id): row for trade_id, row in rows.items()},
+                                              'errors': {str(trade_id): error for trade_id, error in errors.items()}}
+
+        if (method, target) == ('GET', '/stats'):
+            return 200, self.STATS()
+
+        if (method, target) == ('POST', '/reload'):
+            await loop.run_in_executor(self.executor, self.RELOAD)
+            return 200, {'markets': len(self.markets.entries)}
+
+        return 404, {'error': 'no endpoint {} {}'.format(method, target)}
+
+    async def HANDLE(self, reader, writer):
+        try:
+            while True:
+                message = await READ_MESSAGE(reader)
+                if message is None:
+                    break
+                start, headers, body = message
+                method, target = start.split()[:2]
+                keep_alive = headers.get('connection', 'keep-alive').lower() != 'close'
+
+                received = time.perf_counter()
+                try:
+                    status, payload = await self.ROUTE(method, target, body)
+                except Exception as error:
+                    status, payload = 500, {'error': '{}: {}'.format(type(error).__name__, error)}
+                if target == '/price':
+                    self.latencies.append(time.perf_counter() - received)
+
+                WRITE_MESSAGE(writer, 'HTTP/1.1 {} {}'.format(status, REASONS[status]), payload, keep_alive)
+                await writer.drain()
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError, ValueError):
+            pass
+        finally:
+            writer.close()
+
+    def STATS(self):
+        passes = np.array(self.passes).reshape(-1, 3)
+        return {'requests': self.requests,
+                'trades': self.trades,
+                'passes': len(passes),
+                'requests_per_pass': float(passes[:, 1].mean()) if len(passes) else 0.0,
+                'trades_per_pass': float(passes[:, 2].mean()) if len(passes) else 0.0,
+                'latency_ms': PERCENTILES(self.latencies),
+                'pass_ms': PERCENTILES(passes[:, 0]),
+                'markets': self.markets.STATS(),
+                'date_moves': self.date_moves,
+                'curves': REGISTRY.STATS()}
+
+    async def START(self, host='127.0.0.1', port=8765, path=None):
+        # path : Unix socket path, served instead of host / port when given
+        self.queue = asyncio.Queue()
+        self.batcher = asyncio.get_running_loop().create_task(self.BATCHER())
+
+        if path is not None:
+            return await asyncio.start_unix_server(self.HANDLE, path)
+        return await asyncio.start_server(self.HANDLE, host, port)
+
+    async def SERVE(self, host='127.0.0.1', port=8765, path=None):
+        server = await self.START(host, port, path)
+        async with server:
+            await server.serve_forever()
+
+# Run a Service until interrupted, with the markets of a trade file resident
+def SERVE(host='127.0.0.1', port=8765, path=None, warm=None, **kwargs):
+    service = PRICING_SERVICE(**kwargs)
+    if warm is not None:
+        book = READ_BOOK(warm) if isinstance(warm, str) else warm
+        service.WARM(book)
+        # Passes set the date back when they finish : the process stays on the warm book's busiest date,
+        # so passes on that date move nothing
+        SET_EVALUATION_DATE(book['date'].mode()[0])
+
+    try:
+        asyncio.run(service.SERVE(host, port, path))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        service.executor.shutdown()
+
+
+if __name__ == "__main__":
+
+    # Quotes from the columnar store written by QUOTE_SOURCE.py, markets of BOOK.py's trade file kept warm
+    SET_QUOTE_SOURCES({name: COLUMNAR_SOURCE(r'./QUOTES') for name in CURVE_MODULES})
+    print("Serving on http://127.0.0.1:8765 (PRICING_CLIENT.py runs the load test)")
+    SERVE(warm=r'./BOOK.csv')
@@ -0,0 +1,172 @@
+import os
+import datetime
+import multiprocessing
+from itertools import islice
+from collections import deque
+from contextlib import contextmanager, ExitStack
+import numpy as np
+import pandas as pd
+import QuantLib as ql
+from QUOTE_SOURCE import QUOTE_SOURCES, SET_QUOTE_SOURCES
+from CURVE_REGISTRY import REGISTRY
+from RELINK import RELINKED
+from PRICING_CONTEXT import PRICING_CONTEXT
+
+# Portfolio held by each Worker Process (QuantLib objects cannot be pickled)
+PORTFOLIO = None
+
+# Pooled and in-process P&L agree to the bootstrap's accuracy, not bit for bit : each re-bootstrap starts from the
+#  nodes the previous scenario left, so how scenarios are chunked over processes moves the P&L by ~1e-11 of notional
+POOL_TOLERANCE = 1e-10
+
+# Scenario Format : {curve name : shock, 'FX' : relative spot shock}
+#  curve name : registry name of the curve ('USDIRS', 'KRWCCS', 'CDS')
+#  shock      : parallel shift in rate terms (0.0001 = 1bp) or {tenor : shift} for twists / historical moves
+
+def PARALLEL(shift, curves=('USDIRS', 'KRWCCS')):
+    return {name: shift for name in curves}
+
+def TWIST(live_curve, short_shift, long_shift):
+    # Shift moving linearly along the curve's pillars from short_shift to long_shift
+    return dict(zip(live_curve.quotes, np.linspace(short_shift, long_shift, len(live_curve.quotes))))
+
+def QUOTE_MOVES(live_curve, quote_t0, quote_t1):
+    # Historical move between two quote frames, as rate-term shifts per pillar
+    moves = quote_t1['Market.Mid'] - quote_t0['Market.Mid']
+    return {tenor: -move / 100 if live_curve.scales[tenor] == 1 else move / live_curve.scales[tenor]
+            for tenor, move in moves.items() if tenor in live_curve.quotes}
+
+# Live Curves behind a Portfolio, grouped by registry name
+def MARKET(portfolio):
+    market = {}
+    for trade in portfolio.values():
+        for _, curve in trade.LINKS():
+            live = REGISTRY.LIVE(curve)
+            if live is None:
+                raise ValueError('{} prices on a curve built outside the curve registry'.format(type(trade).__name__))
+
+            name, live_curve = live
+            curves = market.setdefault(name, [])
+            if all(live_curve is not other for other in curves):
+                curves.append(live_curve)
+
+    return market
+
+# Apply one Scenario to the shared Live Curves and FX Quotes, restored on exit
+@contextmanager
+def SHOCKED(scenario, market, portfolio):
+    with ExitStack() as stack:
+        for name, shock in scenario.items():
+            if name == 'FX':
+                continue
+            shifts = shock if isinstance(shock, dict) else {None: shock}
+            for live_curve in market.get(name, []):
+                for tenor, shift in shifts.items():
+                    stack.enter_context(live_curve.BUMP(tenor, shift))
+
+        if 'FX' in scenario:
+            # Only CCS / FXF carry an FX spot handle
+            links = [(trade.fx_spot_handle, ql.SimpleQuote(trade.fx_spot * (1 + scenario['FX'])))
+                     for trade in portfolio.values() if hasattr(trade, 'fx_spot_handle')]
+            stack.enter_context(RELINKED(*links))
+
+        yield
+
+# (scenario x trade) P&L in this Process : each scenario shocks the shared curves once
+def REVALUE(portfolio, scenarios):
+    market = MARKET(portfolio)
+    names = list(portfolio)
+
+    # Shocked curves re-bootstrap against the evaluation date, so pin it to the portfolio's date
+    with PRICING_CONTEXT(next(iter(portfolio.values())).LINKS()[0][1].referenceDate()):
+        base = np.array([portfolio[name].instrument.NPV() for name in names])
+        pnl = np.empty((len(scenarios), len(names)))
+        for i, scenario in enumerate(scenarios.values()):
+            with SHOCKED(scenario, market, portfolio):
+                pnl[i] = [portfolio[name].instrument.NPV() for name in names]
+
+    return pnl - base
+
+# Worker Start-up : rebuild the base market and portfolio once
+def INIT_WORKER(specs, sources):
+    global PORTFOLIO
+    SET_QUOTE_SOURCES(sources)
+    PORTFOLIO = {name: cls(*args) for name, (cls, args) in specs.items()}
+
+def WORKER_CHUNK(args):
+    i, scenarios = args
+    return i, REVALUE(PORTFOLIO, scenarios)
+
+def WORKER_STREAM(scenarios):
+    return list(scenarios), REVALUE(PORTFOLIO, scenarios)
+
+# Scenario P&L Matrix, scenarios sharded over a Process Pool
+def SCENARIO_PNL(portfolio, scenarios, processes=None):
+    # portfolio : {trade name : IRS / FRA / CCS / FXF / CDS}, scenarios : {scenario name : scenario}
+    names = list(scenarios)
+
+    if processes == 1:
+        pnl = REVALUE(portfolio, scenarios)
+    else:
+        # Deterministic contiguous chunks, a few per worker to even out the load
+        processes = processes or os.cpu_count()
+        chunks = np.array_split(np.arange(len(names)), min(len(names), processes * 4))
+        tasks = [(i, {names[j]: scenarios[names[j]] for j in chunk}) for i, chunk in enumerate(chunks)]
+        specs = {name: (type(trade), trade.args) for name, trade in portfolio.items()}
+
+        pnl = np.empty((len(names), len(portfolio)))
+        with multiprocessing.Pool(processes, initializer=INIT_WORKER, initargs=(specs, QUOTE_SOURCES())) as pool:
+            for i, values in pool.imap_unordered(WORKER_CHUNK, tasks):
+                pnl[chunks[i]] = values
+
+    return pd.DataFrame(pnl, index=names, columns=list(portfolio))
+
+# Scenario P&L in Order, chunk by chunk (scenarios may be a generator, only the P&L blocks are returned)
+def SCENARIO_STREAM(portfolio, scenarios, processes=None, chunksize=16):
+    # scenarios : iterable of (scenario name, scenario), yields (scenario names, (chunk x trade) P&L)
+    iterator = iter(scenarios)
+    chunks = iter(lambda: dict(islice(iterator, chunksize)), {})
+
+    if processes == 1:
+        for chunk in chunks:
+            yield list(chunk), REVALUE(portfolio, chunk)
+        return
+
+    # At most two chunks per worker in flight : pool.imap would draw the whole generator into its task queue
+    processes = processes or os.cpu_count()
+    specs = {name: (type(trade), trade.args) for name, trade in portfolio.items()}
+    with multiprocessing.Pool(processes, initializer=INIT_WORKER, initargs=(specs, QUOTE_SOURCES())) as pool:
+        pending = deque()
+        for chunk in chunks:
+            pending.append(pool.apply_async(WORKER_STREAM, (chunk,)))
+            if len(pending) == processes * 2:
+                yield pending.popleft().get()
+        while pending:
+            yield pending.popleft().get()
+
+
+if __name__ == "__main__":
+    from SWAP_CURVE import GET_QUOTE, LIVE_SWAP_CURVE
+    from IRS import IRS
+    from FRA import FRA
+
+    # Today's Date
+    todays_date = datetime.date(2020, 10, 9)
+
+    # Portfolio
+    portfolio = {'IRS 2Y Payer': IRS(todays_date, datetime.date(2020, 10, 19), datetime.date(2022, 10, 19),
+                                     0.00218, 10000000, ql.VanillaSwap.Payer),
+                 'IRS 10Y Receiver': IRS(todays_date, datetime.date(2020, 10, 19), datetime.date(2030, 10, 19),
+                                         0.0068, 10000000, ql.VanillaSwap.Receiver),
+                 'FRA 3x5 Long': FRA(todays_date, datetime.date(2020, 10, 19), datetime.date(2020, 12, 15),
+                                     'Long', 0.0022, 10000000)}
+
+    # Scenario Set : parallel shifts, a steepener and yesterday's move
+    live_curve = LIVE_SWAP_CURVE(todays_date, GET_QUOTE(todays_date))
+    scenarios = {'{:+d}bp'.format(bp): PARALLEL(bp * 0.0001, ('USDIRS',)) for bp in (-100, -50, -10, 10, 50, 100)}
+    scenarios['Steepener'] = {'USDIRS': TWIST(live_curve, -0.0010, 0.0025)}
+    scenarios['Historical 2020-10-08'] = {'USDIRS': QUOTE_MOVES(live_curve,
+                                                                GET_QUOTE(todays_date),
+                                                                GET_QUOTE(datetime.date(2020, 10, 8)))}
+
+    print(SCENARIO_PNL(portfolio, scenarios))
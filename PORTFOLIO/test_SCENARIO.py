@@ -0,0 +1,70 @@
+import os
+import sys
+import datetime
+import numpy as np
+import pandas as pd
+import pytest
+import QuantLib as ql
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(HERE, '..', 'CURVE'))
+sys.path.insert(0, os.path.join(HERE, '..', 'IRS'))
+
+from QUOTE_SOURCE import COLUMNAR_SOURCE, QUOTE_SOURCES, SET_QUOTE_SOURCES
+from SCENARIO import PARALLEL, TWIST, MARKET, SCENARIO_PNL, SCENARIO_STREAM, POOL_TOLERANCE
+from IRS import IRS
+
+TODAY = datetime.date(2020, 10, 9)
+NOTIONAL = 10000000
+
+# Columnar Store with the CSV Export of the Excel Quotes (no Excel needed)
+@pytest.fixture(scope='module')
+def source(tmp_path_factory):
+    source = COLUMNAR_SOURCE(str(tmp_path_factory.mktemp('QUOTES')))
+    source.WRITE(TODAY, 'USD', pd.read_csv(os.path.join(HERE, '..', 'CURVE', 'Data.csv'), index_col=0, usecols=range(4)))
+
+    saved = QUOTE_SOURCES()
+    SET_QUOTE_SOURCES({'SWAP_CURVE': source})
+    yield source
+    SET_QUOTE_SOURCES(saved)
+
+@pytest.fixture(scope='module')
+def portfolio(source):
+    return {'IRS 2Y Payer': IRS(TODAY, datetime.date(2020, 10, 19), datetime.date(2022, 10, 19),
+                                0.00218, NOTIONAL, ql.VanillaSwap.Payer),
+            'IRS 10Y Receiver': IRS(TODAY, datetime.date(2020, 10, 19), datetime.date(2030, 10, 19),
+                                    0.0068, NOTIONAL, ql.VanillaSwap.Receiver)}
+
+@pytest.fixture(scope='module')
+def scenarios(portfolio):
+    live_curve = MARKET(portfolio)['USDIRS'][0]
+    scenarios = {'{:+d}bp'.format(bp): PARALLEL(bp * 0.0001, ('USDIRS',)) for bp in range(-50, 55, 10)}
+    scenarios.update({'Twist {}'.format(i): {'USDIRS': TWIST(live_curve, -0.0001 * i, 0.0002 * i)} for i in range(1, 6)})
+    return scenarios
+
+def test_pool_matches_in_process(portfolio, scenarios):
+    serial = SCENARIO_PNL(portfolio, scenarios, processes=1)
+    pooled = SCENARIO_PNL(portfolio, scenarios, processes=2)
+
+    assert list(pooled.index) == list(serial.index)
+    np.testing.assert_allclose(pooled.values, serial.values, rtol=0, atol=POOL_TOLERANCE * NOTIONAL)
+
+def test_stream_matches_in_process(portfolio, scenarios):
+    serial = SCENARIO_PNL(portfolio, scenarios, processes=1)
+    names, blocks = zip(*SCENARIO_STREAM(portfolio, scenarios.items(), processes=2, chunksize=3))
+
+    assert sum(names, []) == list(serial.index)
+    np.testing.assert_allclose(np.vstack(blocks), serial.values, rtol=0, atol=POOL_TOLERANCE * NOTIONAL)
+
+def test_stream_draws_scenarios_lazily(portfolio, scenarios):
+    drawn = []
+    def GENERATOR():
+        for item in scenarios.items():
+            drawn.append(item[0])
+            yield item
+
+    # Two chunks per worker in flight when the first block comes back, not the whole generator
+    stream = SCENARIO_STREAM(portfolio, GENERATOR(), processes=2, chunksize=1)
+    next(stream)
+    assert len(drawn) == 4
+    stream.close()